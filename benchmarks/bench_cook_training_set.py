@@ -0,0 +1,45 @@
+"""
+Peak memory allocated by Base.cook_training_set, relative to the size of 
+the design matrix Z it returns. Temporary arrays are bounded by the 
+`working_memory` setting (in MiB), here set to 64.
+
+Run: python benchmarks/bench_cook_training_set.py
+"""
+import tracemalloc
+import numpy as np
+import nnetsauce as ns
+
+
+def bench(n_samples, n_features, n_hidden_features, n_clusters, row_sample):
+
+    np.random.seed(123)
+    X = np.random.rand(n_samples, n_features)
+    y = np.random.rand(n_samples)
+
+    obj = ns.BaseRegressor(
+        n_hidden_features=n_hidden_features,
+        n_clusters=n_clusters,
+        row_sample=row_sample,
+    )
+
+    tracemalloc.start()
+    _, Z = obj.cook_training_set(y=y, X=X)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / Z.nbytes
+
+
+if __name__ == "__main__":
+
+    ns.set_config(working_memory=64)
+
+    print("n_samples  n_hidden  n_clusters  row_sample  peak/Z.nbytes")
+    for n_samples, n_hidden_features in ((10000, 100), (10000, 1000), (100000, 200)):
+        for n_clusters in (0, 2):
+            for row_sample in (1, 0.5):
+                ratio = bench(n_samples, 10, n_hidden_features, n_clusters, row_sample)
+                print(
+                    f"{n_samples:9d}  {n_hidden_features:8d}  {n_clusters:10d}"
+                    f"  {row_sample:10.1f}  {ratio:13.2f}"
+                )
@@ -0,0 +1,59 @@
+"""
+GLMRegressor and GLMClassifier fitted by the 'sgd' and 'scd' optimizers, with
+finite-difference gradients (as before) and with the analytic gradients of
+`loss_and_grad`. Reports wall times and final training losses, for an
+increasing number of hidden nodes.
+
+Run: python benchmarks/bench_glm.py [n_hidden1 n_hidden2 ...]
+"""
+import sys
+import time
+import numpy as np
+import nnetsauce as ns
+from sklearn.datasets import load_wine, make_regression
+
+
+def bench(obj, X, y, analytic):
+    if analytic == False:  # the optimizer falls back to finite differences
+        obj.loss_and_grad = None
+    t0 = time.perf_counter()
+    obj.fit(X, y, verbose=0)
+    return time.perf_counter() - t0, obj.optimizer.results[2][-1]
+
+
+if __name__ == "__main__":
+
+    n_hiddens = [int(q) for q in sys.argv[1:]] or [10, 50, 100]
+
+    X, y = make_regression(n_samples=2000, n_features=10, random_state=1)
+    X2, y2 = load_wine(return_X_y=True)
+
+    print(
+        "model          optim  n_hidden  numerical (s)  analytic (s)"
+        "  numerical loss  analytic loss"
+    )
+    for cls, X_, y_ in (
+        (ns.GLMRegressor, X, y),
+        (ns.GLMClassifier, X2, y2),
+    ):
+        for type_optim in ("sgd", "scd"):
+            for n_hidden in n_hiddens:
+                res = [
+                    bench(
+                        cls(
+                            n_hidden_features=n_hidden,
+                            optimizer=ns.Optimizer(
+                                type_optim=type_optim, num_iters=20, verbose=0
+                            ),
+                        ),
+                        X_,
+                        y_,
+                        analytic,
+                    )
+                    for analytic in (False, True)
+                ]
+                print(
+                    f"{cls.__name__:14s} {type_optim:5s} {n_hidden:9d}"
+                    f" {res[0][0]:14.3f} {res[1][0]:13.3f}"
+                    f" {res[0][1]:15.4f} {res[1][1]:14.4f}"
+                )
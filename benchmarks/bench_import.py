@@ -0,0 +1,63 @@
+"""
+Wall time of `import nnetsauce` in a fresh interpreter, when JAX is
+installed, when it is not (simulated by blocking its import) and when it
+is imported eagerly, as nnetsauce used to do on Linux and macOS. Also
+reports whether JAX ends up in `sys.modules`.
+
+Run: python benchmarks/bench_import.py
+"""
+import subprocess
+import sys
+import numpy as np
+
+
+BLOCK_JAX = """
+import sys
+class BlockJax:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in ("jax", "jaxlib"):
+            raise ImportError("No module named " + name)
+sys.meta_path.insert(0, BlockJax())
+"""
+
+TIMED_IMPORT = """
+import time
+t0 = time.perf_counter()
+{pre}
+import nnetsauce
+print(time.perf_counter() - t0, "jax" in sys.modules)
+"""
+
+SCENARIOS = {
+    "jax installed": ("import sys", ""),
+    "jax not installed": (BLOCK_JAX, ""),
+    "jax imported eagerly": ("import sys", "import jax.numpy, jax.nn"),
+}
+
+
+def bench(setup, pre, n_repeats=7):
+
+    timings = []
+
+    for _ in range(n_repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", setup + TIMED_IMPORT.format(pre=pre)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(out[0]))
+
+    return np.median(timings), out[1]
+
+
+if __name__ == "__main__":
+
+    print("scenario                 median import (s)  jax loaded")
+    for name, (setup, pre) in SCENARIOS.items():
+        try:
+            timing, jax_loaded = bench(setup, pre)
+        except subprocess.CalledProcessError:  # e.g JAX really not installed
+            print(f"{name:24s} {'n/a':>17s}")
+            continue
+        print(f"{name:24s} {timing:17.3f}  {jax_loaded:>10s}")
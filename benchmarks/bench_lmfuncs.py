@@ -0,0 +1,64 @@
+"""
+Ridge coefficients and posterior covariance of `lmfuncs.beta_Sigma_hat_rvfl`,
+computed as before (explicit inverse of t(X)%*%X + lambda*I, then products)
+and from one Cholesky factorization (`lmfuncs.beta_inv_penalized_cov`).
+Reports wall times and the relative residual of the normal equations.
+
+Run: python benchmarks/bench_lmfuncs.py [p1 p2 ...]
+"""
+import sys
+import time
+import numpy as np
+from numpy import linalg as la
+from nnetsauce.utils import lmfuncs as lmf
+from nnetsauce.utils import matrixops as mo
+
+
+def inverse_path(X, y, s=0.1, sigma=0.05):
+    s2 = s ** 2
+    lambda_ = (sigma ** 2) / s2
+    Cn = la.inv(mo.crossprod(X) + lambda_ * np.eye(X.shape[1]))
+    beta_hat = np.dot(Cn, mo.crossprod(X, y))
+    Sigma_hat = s2 * (np.eye(X.shape[1]) - np.dot(Cn, mo.crossprod(X)))
+    return beta_hat, Sigma_hat
+
+
+def cholesky_path(X, y, s=0.1, sigma=0.05):
+    lambda_ = (sigma ** 2) / (s ** 2)
+    beta_hat, Cn = lmf.beta_inv_penalized_cov(X, y, lam=lambda_)
+    return beta_hat, (sigma ** 2) * Cn
+
+
+def residual(X, y, beta_hat, s=0.1, sigma=0.05):
+    lambda_ = (sigma ** 2) / (s ** 2)
+    Xty = mo.crossprod(X, y)
+    return la.norm(
+        mo.crossprod(X, np.dot(X, beta_hat)) + lambda_ * beta_hat - Xty
+    ) / la.norm(Xty)
+
+
+def bench(fun, X, y, n_repeats=3):
+    timings = []
+    for _ in range(n_repeats):
+        t0 = time.perf_counter()
+        res = fun(X, y)
+        timings.append(time.perf_counter() - t0)
+    return np.min(timings), res
+
+
+if __name__ == "__main__":
+
+    ps = [int(p) for p in sys.argv[1:]] or [500, 1000, 2000, 5000, 10000]
+
+    print("     p   inverse (s)  cholesky (s)  speedup  residual inv  residual chol")
+    for p in ps:
+        np.random.seed(123)
+        X = np.random.randn(p + 100, p)
+        y = np.random.randn(p + 100)
+        n_repeats = 3 if p <= 2000 else 1
+        t_inv, (beta_inv, _) = bench(inverse_path, X, y, n_repeats)
+        t_chol, (beta_chol, _) = bench(cholesky_path, X, y, n_repeats)
+        print(
+            f"{p:6d} {t_inv:13.3f} {t_chol:13.3f} {t_inv / t_chol:8.2f}"
+            f" {residual(X, y, beta_inv):13.2e} {residual(X, y, beta_chol):14.2e}"
+        )
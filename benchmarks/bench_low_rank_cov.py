@@ -0,0 +1,50 @@
+"""
+Wide BayesianRVFL2Regressor (p hidden nodes >> n training rows), with a dense
+p x p posterior covariance Sigma and with low_rank_cov=True (prior diagonal
+minus a rank-n term). Reports fit and predict(return_std=True) wall times and
+the size of the pickled model, for an increasing number of hidden nodes p.
+
+Run: python benchmarks/bench_low_rank_cov.py [p1 p2 ...]
+"""
+import pickle
+import sys
+import time
+import numpy as np
+import nnetsauce as ns
+
+
+def bench(X, y, X_test, p, low_rank_cov):
+    obj = ns.BayesianRVFL2Regressor(
+        n_hidden_features=p, s1=1, s2=0.1, sigma=0.5, low_rank_cov=low_rank_cov
+    )
+    t0 = time.perf_counter()
+    obj.fit(X, y)
+    t_fit = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    preds = obj.predict(X_test, return_std=True)
+    t_pred = time.perf_counter() - t0
+    return t_fit, t_pred, len(pickle.dumps(obj)) / 2 ** 20, preds
+
+
+if __name__ == "__main__":
+
+    ps = [int(p) for p in sys.argv[1:]] or [1000, 2000, 4000]
+
+    np.random.seed(123)
+    n, n_test = 200, 2000
+    X = np.random.randn(n + n_test, 5)
+    y = np.sin(X).sum(axis=1) + 0.1 * np.random.randn(n + n_test)
+
+    print(
+        "     p  dense fit (s)  dense pred (s)  dense (MiB)"
+        "  low-rank fit (s)  low-rank pred (s)  low-rank (MiB)"
+    )
+    for p in ps:
+        res = bench(X[:n], y[:n], X[n:], p, low_rank_cov=False)
+        res2 = bench(X[:n], y[:n], X[n:], p, low_rank_cov=True)
+        assert np.allclose(res[3][0], res2[3][0])
+        assert np.allclose(res[3][1], res2[3][1])
+        print(
+            f"{p:6d} {res[0]:14.3f} {res[1]:15.3f} {res[2]:12.1f}"
+            f" {res2[0]:17.3f} {res2[1]:18.3f} {res2[2]:15.1f}"
+        )
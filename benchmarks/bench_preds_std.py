@@ -0,0 +1,56 @@
+"""
+Predictive standard deviations of the Bayesian RVFL regressors
+(`lmfuncs.preds_std`), computed as before (diagonal of the m x m matrix
+X_star%*%Sigma%*%t(X_star)) and row by row, by blocks of rows. Reports wall
+times and peak memory, for an increasing number of test rows m.
+
+Run: python benchmarks/bench_preds_std.py [m1 m2 ...]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+from nnetsauce.utils import lmfuncs as lmf
+from nnetsauce.utils import matrixops as mo
+
+
+def diag_path(X_star, Sigma, sigma=0.05):
+    return np.sqrt(
+        np.diag(mo.safe_sparse_dot(X_star, mo.tcrossprod(Sigma, X_star)))
+        + sigma ** 2
+    )
+
+
+def rowwise_path(X_star, Sigma, sigma=0.05):
+    return lmf.preds_std(X_star, Sigma, sigma=sigma)
+
+
+def bench(fun, X_star, Sigma):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    res = fun(X_star, Sigma)
+    timing = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return timing, peak, res
+
+
+if __name__ == "__main__":
+
+    ms = [int(m) for m in sys.argv[1:]] or [1000, 5000, 10000, 20000]
+
+    np.random.seed(123)
+    p = 200
+    A = np.random.randn(p, p) / p
+    Sigma = np.dot(A, A.T)
+
+    print("     m   diag (s)  diag (MiB)  row-wise (s)  row-wise (MiB)")
+    for m in ms:
+        X_star = np.random.randn(m, p)
+        t_diag, mem_diag, std_diag = bench(diag_path, X_star, Sigma)
+        t_row, mem_row, std_row = bench(rowwise_path, X_star, Sigma)
+        assert np.allclose(std_diag, std_row)
+        print(
+            f"{m:6d} {t_diag:10.3f} {mem_diag:11.1f} {t_row:13.3f}"
+            f" {mem_row:15.1f}"
+        )
@@ -0,0 +1,54 @@
+"""
+Fit time and peak memory of Ridge2Regressor and Ridge2MultitaskClassifier
+with solver='pinv' (pseudo-inverses of the blocks, explicit assembly of the
+inverse) and solver='cholesky' (block Cholesky factorization and triangular
+solves), for increasingly wide hidden layers. The features are cooked
+before timing, so that only the linear algebra is measured.
+
+Run: python benchmarks/bench_ridge2.py [n_hidden_features1 ...]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+import nnetsauce as ns
+
+
+def bench(obj, X, y):
+    centered_y, scaled_Z = obj.cook_training_set(y=y, X=X)
+    if isinstance(obj, ns.Ridge2MultitaskClassifier):
+        centered_y = np.eye(3)[centered_y.astype(int)]
+    X_, Phi_X_ = obj.split_design(X, scaled_Z)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj.solve(X_, Phi_X_, centered_y)
+    timing = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return timing, peak
+
+
+if __name__ == "__main__":
+
+    widths = [int(p) for p in sys.argv[1:]] or [500, 1000, 2000, 4000]
+
+    np.random.seed(123)
+    X = np.random.randn(5000, 20)
+    y = X[:, 0] + np.sin(X[:, 1]) + 0.1 * np.random.randn(5000)
+    y_class = np.digitize(y, np.quantile(y, [1 / 3, 2 / 3]))
+
+    print(
+        "estimator                  hidden  solver     time (s)  peak (MiB)"
+    )
+    for width in widths:
+        for est, target in (
+            (ns.Ridge2Regressor, y),
+            (ns.Ridge2MultitaskClassifier, y_class),
+        ):
+            for solver in ("pinv", "cholesky"):
+                obj = est(n_hidden_features=width, n_clusters=0, solver=solver)
+                timing, peak = bench(obj, X, target)
+                print(
+                    f"{est.__name__:26s} {width:6d}  {solver:8s} {timing:10.3f}"
+                    f"  {peak:10.1f}"
+                )
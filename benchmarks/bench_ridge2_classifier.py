@@ -0,0 +1,76 @@
+"""
+Ridge2Classifier's objective, for an increasing number of classes.
+
+Log-likelihood and gradient, evaluated separately (self.loglik, X%*%B and
+the softmax computed twice) and fused (self.loglik_and_grad, used by fit).
+
+Hessian: dense
+hessian built block by block (double loop over the pairs of classes), dense
+hessian built at once (one product t(A)%*%A), and hessian-vector product
+(`hessp`, used by solver='Newton-CG', 'trust-ncg' and 'trust-krylov').
+
+Run: python benchmarks/bench_ridge2_classifier.py [n_classes1 ...]
+"""
+import sys
+import time
+import numpy as np
+import nnetsauce as ns
+
+
+def loop_hessian(obj, X, Y, x):
+    # hessian with a double loop over the pairs of classes
+    n, K = Y.shape
+    p = X.shape[1]
+    B = x.reshape(K, p).T
+    XB = X @ B
+    exp_XB = np.exp(XB - XB.max(axis=1)[:, None])
+    probs = exp_XB / exp_XB.sum(axis=1)[:, None]
+    hess = np.zeros((K * p, K * p))
+    for k1 in range(K):
+        x_index = range(k1 * p, (k1 + 1) * p)
+        for k2 in range(k1, K):
+            y_index = range(k2 * p, (k2 + 1) * p)
+            H_sub = -X.T @ ((probs[:, k1] * probs[:, k2])[:, None] * X) / n
+            hess[np.ix_(x_index, y_index)] = hess[
+                np.ix_(y_index, x_index)
+            ] = H_sub
+    return hess + (obj.lambda1 + obj.lambda2) * np.identity(K * p)
+
+
+def timeit(func, n_repeats=3):
+    timings = []
+    for _ in range(n_repeats):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return np.median(timings)
+
+
+if __name__ == "__main__":
+
+    n_classes = [int(K) for K in sys.argv[1:]] or [2, 5, 10, 20]
+
+    np.random.seed(123)
+    X = np.random.randn(2000, 20)
+
+    print(
+        "classes  coefs  loglik+grad (s)  fused (s)  loop hess (s)  hess (s)"
+        "  hessp (s)"
+    )
+    for K in n_classes:
+        y = np.random.randint(0, K, 2000)
+        obj = ns.Ridge2Classifier(n_hidden_features=100, n_clusters=0)
+        _, scaled_Z = obj.cook_training_set(y=y, X=X)
+        Y = np.eye(K)[y]
+        loglik_func, grad_func, hessian_func = obj.loglik(X=scaled_Z, Y=Y)
+        loglik_grad_func = obj.loglik_and_grad(X=scaled_Z, Y=Y)
+        x = 0.01 * np.random.randn(scaled_Z.shape[1] * K)
+        v = np.random.randn(scaled_Z.shape[1] * K)
+        print(
+            f"{K:7d}  {x.shape[0]:5d}"
+            f"  {timeit(lambda: (loglik_func(x), grad_func(x))):15.4f}"
+            f"  {timeit(lambda: loglik_grad_func(x)):9.4f}"
+            f"  {timeit(lambda: loop_hessian(obj, scaled_Z, Y, x)):13.3f}"
+            f"  {timeit(lambda: hessian_func(x)):8.3f}"
+            f"  {timeit(lambda: hessian_func(x, v)):9.4f}"
+        )
@@ -0,0 +1,48 @@
+"""
+Cold-import time of each public estimator: wall time of
+`from nnetsauce import <estimator>` in a fresh interpreter, and number of
+modules it loads. `import nnetsauce` alone is the baseline.
+
+Run: python benchmarks/bench_startup.py
+"""
+import subprocess
+import sys
+import numpy as np
+import nnetsauce as ns
+
+
+TIMED_IMPORT = """
+import sys, time
+n_modules = len(sys.modules)
+t0 = time.perf_counter()
+{statement}
+print(time.perf_counter() - t0, len(sys.modules) - n_modules)
+"""
+
+
+def bench(statement, n_repeats=5):
+
+    timings = []
+
+    for _ in range(n_repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMED_IMPORT.format(statement=statement)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(out[0]))
+
+    return np.median(timings), int(out[1])
+
+
+if __name__ == "__main__":
+
+    statements = ["import nnetsauce"] + [
+        f"from nnetsauce import {name}" for name in sorted(ns.__all__)
+    ]
+
+    print("statement                                        import (s)  modules")
+    for statement in statements:
+        timing, n_modules = bench(statement)
+        print(f"{statement:48s} {timing:10.3f}  {n_modules:7d}")
@@ -1,6 +1,7 @@
 """
 -- adapted from sklearn
 """
+import importlib
 import sys
 import logging
 import os
@@ -60,25 +61,65 @@ if __NNETSAUCE_SETUP__:
 
 else:
 
-    from .base.base import Base
-    from .base.baseRegressor import BaseRegressor
-    from .boosting.adaBoostClassifier import AdaBoostClassifier
-    from .custom.customClassifier import CustomClassifier
-    from .custom.customRegressor import CustomRegressor
-    from .glm.glmClassifier import GLMClassifier
-    from .glm.glmRegressor import GLMRegressor    
-    from .mts.mts import MTS
-    from .multitask.multitaskClassifier import MultitaskClassifier
-    from .optimizers._optimizer import Optimizer
-    from .randombag._randomBagClassifier import RandomBagClassifier
-    from .ridge2.ridge2Classifier import Ridge2Classifier
-    from .ridge2.ridge2Regressor import Ridge2Regressor
-    from .ridge2.ridge2MultitaskClassifier import Ridge2MultitaskClassifier
-    # from .rnn.rnnRegressor import RNNRegressor
-    # from .rnn.rnnClassifier import RNNClassifier
-    from .rvfl.bayesianrvflRegressor import BayesianRVFLRegressor
-    from .rvfl.bayesianrvfl2Regressor import BayesianRVFL2Regressor
-    from .simulator import Simulator
+    # The estimators are imported on first access (PEP 562): e.g 
+    # `from nnetsauce import Ridge2Regressor` only loads the modules 
+    # Ridge2Regressor depends on.
+    _estimators_modules = {
+        "AdaBoostClassifier": ".boosting.adaBoostClassifier",
+        "Base": ".base.base",
+        "BaseRegressor": ".base.baseRegressor",
+        "BayesianRVFLRegressor": ".rvfl.bayesianrvflRegressor",
+        "BayesianRVFL2Regressor": ".rvfl.bayesianrvfl2Regressor",
+        "CustomClassifier": ".custom.customClassifier",
+        "CustomRegressor": ".custom.customRegressor",
+        "GLMRegressor": ".glm.glmRegressor",
+        "GLMClassifier": ".glm.glmClassifier",
+        "MTS": ".mts.mts",
+        "MultitaskClassifier": ".multitask.multitaskClassifier",
+        "Optimizer": ".optimizers._optimizer",
+        "RandomBagClassifier": ".randombag._randomBagClassifier",
+        "Ridge2Regressor": ".ridge2.ridge2Regressor",
+        "Ridge2Classifier": ".ridge2.ridge2Classifier",
+        "Ridge2MultitaskClassifier": ".ridge2.ridge2MultitaskClassifier",
+        "Simulator": ".simulator._simulator",
+        # "RNNRegressor": ".rnn.rnnRegressor",
+        # "RNNClassifier": ".rnn.rnnClassifier",
+    }
+
+    _subpackages = (
+        "base",
+        "boosting",
+        "custom",
+        "glm",
+        "mts",
+        "multitask",
+        "optimizers",
+        "randombag",
+        "ridge2",
+        "rvfl",
+        "sampling",
+        "simulation",
+        "simulator",
+        "utils",
+    )
+
+    def __getattr__(name):
+
+        if name in _estimators_modules:
+            module = importlib.import_module(_estimators_modules[name], __name__)
+            value = getattr(module, name)
+            globals()[name] = value  # next accesses bypass __getattr__
+            return value
+
+        if name in _subpackages:
+            return importlib.import_module("." + name, __name__)
+
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        )
+
+    def __dir__():
+        return sorted(set(globals()) | set(_estimators_modules) | set(_subpackages))
 
     __all__ = [
         "AdaBoostClassifier",
@@ -8,6 +8,12 @@ _global_config = {
     "working_memory": int(os.environ.get("NNETSAUCE_WORKING_MEMORY", 1024)),
     "print_changed_only": True,
     "display": "text",
+    "dtype": os.environ.get("NNETSAUCE_DTYPE", "float64"),
+    "feature_cache_memory": int(
+        os.environ.get("NNETSAUCE_FEATURE_CACHE_MEMORY", 0)
+    ),
+    "cluster_max_rows": int(os.environ.get("NNETSAUCE_CLUSTER_MAX_ROWS", 0)),
+    "nodes_cache_memory": int(os.environ.get("NNETSAUCE_NODES_CACHE_MEMORY", 64)),
 }
 
 
@@ -32,6 +38,10 @@ def set_config(
     working_memory=None,
     print_changed_only=None,
     display=None,
+    dtype=None,
+    feature_cache_memory=None,
+    cluster_max_rows=None,
+    nodes_cache_memory=None,
 ):
     """Set global nnetsauce configuration
 
@@ -71,6 +81,35 @@ def set_config(
 
         .. versionadded:: 0.3.0
 
+    dtype : {'float64', 'float32'}, optional
+        Floating point precision of the design matrices, hidden layers, 
+        Gram matrices and regression coefficients. With 'float32', the 
+        data stay in single precision end-to-end (halving memory and 
+        speeding up matrix products), and only the small linear systems 
+        are solved in double precision. Global default: 'float64'.
+
+    feature_cache_memory : int, optional
+        If > 0, the training design matrices (hidden layer included) and 
+        the fitted preprocessing state are cached, up to this number of MiB, 
+        and reused by the estimators' `fit` on the same data with the same 
+        feature engineering hyperparameters (e.g. in a search over 
+        `lambda1`/`lambda2`). Least recently used entries are evicted 
+        first. Global default: 0 (no cache).
+
+    cluster_max_rows : int, optional
+        If > 0, maximum number of rows used for fitting the clustering 
+        models when `n_clusters` > 0: k-means ('kmeans', 'minibatchkmeans') 
+        are fitted on a weighted coreset of the training set, and Gaussian 
+        mixtures on a random subsample. All the rows are still labelled. 
+        Global default: 0 (all the rows).
+
+    nodes_cache_memory : int, optional
+        Size (in MiB) of the process-wide cache of hidden layer nodes 
+        (Sobol, Halton, Hammersley or uniform matrices), shared by all the 
+        estimators: each node matrix is generated once per process, and 
+        the least recently used ones are evicted first. 0 disables the 
+        cache. Global default: 64.
+
     See Also
     --------
     config_context: Context manager for global nnetsauce configuration
@@ -84,6 +123,18 @@ def set_config(
         _global_config["print_changed_only"] = print_changed_only
     if display is not None:
         _global_config["display"] = display
+    if dtype is not None:
+        assert dtype in (
+            "float32",
+            "float64",
+        ), "must have 'dtype' in ('float32', 'float64')"
+        _global_config["dtype"] = dtype
+    if feature_cache_memory is not None:
+        _global_config["feature_cache_memory"] = feature_cache_memory
+    if cluster_max_rows is not None:
+        _global_config["cluster_max_rows"] = cluster_max_rows
+    if nodes_cache_memory is not None:
+        _global_config["nodes_cache_memory"] = nodes_cache_memory
 
 
 @contextmanager
@@ -120,6 +171,22 @@ def config_context(**new_config):
 
         .. versionadded:: 0.3.0
 
+    dtype : {'float64', 'float32'}, optional
+        Floating point precision of the design matrices, hidden layers, 
+        Gram matrices and regression coefficients. Global default: 'float64'.
+
+    feature_cache_memory : int, optional
+        If > 0, size (in MiB) of the cache of training design matrices 
+        reused across fits on the same data. Global default: 0 (no cache).
+
+    cluster_max_rows : int, optional
+        If > 0, maximum number of rows used for fitting the clustering 
+        models. Global default: 0 (all the rows).
+
+    nodes_cache_memory : int, optional
+        Size (in MiB) of the process-wide cache of hidden layer nodes. 
+        Global default: 64.
+
     Notes
     -----
     All settings, not just those presently modified, will be returned to
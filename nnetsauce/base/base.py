@@ -2,24 +2,58 @@
 #
 # License: BSD 3 Clear
 
+import hashlib
 import numpy as np
 import platform
 import warnings
 from functools import partial
+from scipy import sparse
 from sklearn.base import BaseEstimator
-from sklearn.cluster import KMeans
-from sklearn.mixture import GaussianMixture
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from sklearn.utils import gen_batches, get_chunk_n_rows
+from .._config import get_config
 from ..utils import activations as ac
-from ..utils import memoize
 from ..utils import matrixops as mo
 from ..utils import misc as mx
-from ..simulation import nodesimulation as ns
+from ..utils.lrucache import LRUCache
 from ..sampling import SubSampler
 from ..simulator import Simulator
-if platform.system() in ('Linux', 'Darwin'):
-    import jax.nn as jnn
-    import jax.numpy as jnp
+
+
+# cooked training sets, shared by all the estimators (see `feature_cache_memory`
+# in nnetsauce.set_config)
+feature_cache = LRUCache()
+
+# hyperparameters determining the cooked training set
+cooking_params = (
+    "n_hidden_features",
+    "activation_name",
+    "a",
+    "nodes_sim",
+    "bias",
+    "dropout",
+    "direct_link",
+    "n_clusters",
+    "cluster_encode",
+    "type_clust",
+    "type_scaling",
+    "col_sample",
+    "row_sample",
+    "seed",
+    "backend",
+)
+
+# attributes fitted while cooking the training set
+cooking_state = (
+    "index_col",
+    "subsampler",
+    "index_row",
+    "clustering_obj",
+    "clustering_scaler",
+    "nn_scaler",
+    "scaler",
+    "W",
+    "y_mean",
+)
 
 
 class Base(BaseEstimator):
@@ -63,8 +97,8 @@ class Base(BaseEstimator):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -131,8 +165,9 @@ class Base(BaseEstimator):
 
         assert type_clust in (
             "kmeans",
+            "minibatchkmeans",
             "gmm",
-        ), "'type_clust' must be in ('kmeans', 'gmm')"
+        ), "'type_clust' must be in ('kmeans', 'minibatchkmeans', 'gmm')"
 
         assert (len(type_scaling) == 3) & all(
             type_scaling[i] in ("minmax", "std")
@@ -177,10 +212,14 @@ class Base(BaseEstimator):
         self.y = None
         self.y_mean = None
         self.beta = None
+        self.sufficient_stats = None
 
 
         # activation function -----    
         if sys_platform in ('Linux', 'Darwin'):    
+            if self.backend in ("gpu", "tpu"):  # JAX is only loaded when needed
+                import jax.nn as jnn
+                import jax.numpy as jnp
             activation_options = {
                 "relu": ac.relu if (self.backend == "cpu") else jnn.relu,
                 "tanh": np.tanh if (self.backend == "cpu") else jnp.tanh,
@@ -240,6 +279,7 @@ class Base(BaseEstimator):
                 self.n_clusters,
                 self.seed,
                 type_clust=self.type_clust,
+                max_rows=get_config()["cluster_max_rows"],
                 **kwargs
             )
 
@@ -260,7 +300,7 @@ class Base(BaseEstimator):
 
         return X_clustered
 
-    def create_layer(self, scaled_X, W=None):
+    def create_layer(self, scaled_X, W=None, out=None):
         """ Create hidden layer. 
         
         Args: 
@@ -271,6 +311,10 @@ class Base(BaseEstimator):
     
             W: {array-like}, shape = [n_features, hidden_features]
                 if provided, constructs the hidden layer with W; otherwise computed internally
+
+            out: {array-like}, shape = [n_samples, hidden_features]
+                if provided, the hidden layer is written in place into `out` 
+                (e.g a column block of a preallocated design matrix)
         
         Returns: 
     
@@ -280,132 +324,111 @@ class Base(BaseEstimator):
 
         n_features = scaled_X.shape[1]
 
-        if self.bias is False:  # no bias term in the hidden layer
-
-            if W is None:
-
-                try: # use Simulator here
-                
-                    self.W = Simulator(n_points=self.n_hidden_features, n_dims=n_features, 
-                    type_sim=self.nodes_sim, seed=self.seed).draw()
-
-                except:
-
-                    h_sim = {
-                        "sobol": ns.generate_sobol2(
-                            n_dims=n_features, n_points=self.n_hidden_features
-                        ),
-                        "hammersley": ns.generate_hammersley(
-                            n_dims=n_features, n_points=self.n_hidden_features
-                        ),
-                        "uniform": ns.generate_uniform(
-                            n_dims=n_features,
-                            n_points=self.n_hidden_features,
-                            seed=self.seed,
-                        ),
-                        "halton": ns.generate_halton(
-                            n_dims=n_features, n_points=self.n_hidden_features
-                        ),
-                    }
-
-                    self.W = h_sim[self.nodes_sim]
-
-                assert (
-                    scaled_X.shape[1] == self.W.shape[0]
-                ), "check dimensions of covariates X and matrix W"
-
-                return mo.dropout(
-                    x=self.activation_func(
-                        mo.safe_sparse_dot(
-                            a=scaled_X, b=self.W, backend=self.backend
-                        )
-                    ),
-                    drop_prob=self.dropout,
-                    seed=self.seed,
-                )
-
-            # W is not none
-            assert (
-                scaled_X.shape[1] == W.shape[0]
-            ), "check dimensions of covariates X and matrix W"
-
-            # self.W = W
-            return mo.dropout(
-                x=self.activation_func(
-                    mo.safe_sparse_dot(a=scaled_X, b=W, backend=self.backend)
-                ),
-                drop_prob=self.dropout,
-                seed=self.seed,
-            )
-
-        # with bias term in the hidden layer
         if W is None:
 
-            n_features_1 = n_features + 1
+            # with bias term in the hidden layer: one more row in W
+            n_dims = n_features + 1 if self.bias else n_features
 
-            try:
+            try: # use Simulator here
 
-                self.W = Simulator(n_points=self.n_hidden_features, n_dims=n_features_1, 
-                    type_sim=self.nodes_sim, seed=self.seed).draw()                
+                self.W = Simulator(n_points=self.n_hidden_features, n_dims=n_dims, 
+                    type_sim=self.nodes_sim, seed=self.seed).draw()
 
             except:
-                
+
+                from ..simulation import nodesimulation as ns
+
                 h_sim = {
                     "sobol": ns.generate_sobol2(
-                        n_dims=n_features_1, n_points=self.n_hidden_features
+                        n_dims=n_dims, n_points=self.n_hidden_features
                     ),
                     "hammersley": ns.generate_hammersley(
-                        n_dims=n_features_1, n_points=self.n_hidden_features
+                        n_dims=n_dims, n_points=self.n_hidden_features
                     ),
                     "uniform": ns.generate_uniform(
-                        n_dims=n_features_1,
+                        n_dims=n_dims,
                         n_points=self.n_hidden_features,
                         seed=self.seed,
                     ),
                     "halton": ns.generate_halton(
-                        n_dims=n_features_1, n_points=self.n_hidden_features
+                        n_dims=n_dims, n_points=self.n_hidden_features
                     ),
                 }
 
                 self.W = h_sim[self.nodes_sim]
 
-            return mo.dropout(
-                x=self.activation_func(
-                    mo.safe_sparse_dot(
-                        a=mo.cbind(
-                            np.ones(scaled_X.shape[0]),
-                            scaled_X,
-                            backend=self.backend,
-                        ),
-                        b=self.W,
-                        backend=self.backend,
-                    )
-                ),
-                drop_prob=self.dropout,
-                seed=self.seed,
-            )
+            W = self.W
+
+        if self.bias is False:  # no bias term in the hidden layer
+            assert (
+                scaled_X.shape[1] == W.shape[0]
+            ), "check dimensions of covariates X and matrix W"
 
-        # W is not None
-        # self.W = W
-        return mo.dropout(
-            x=self.activation_func(
-                mo.safe_sparse_dot(
-                    a=mo.cbind(
-                        np.ones(scaled_X.shape[0]),
-                        scaled_X,
-                        backend=self.backend,
+        if self.backend in ("gpu", "tpu"):
+
+            if self.bias is False:
+                res = mo.dropout(
+                    x=self.activation_func(
+                        mo.safe_sparse_dot(a=scaled_X, b=W, backend=self.backend)
                     ),
-                    b=W,
-                    backend=self.backend,
+                    drop_prob=self.dropout,
+                    seed=self.seed,
+                )
+            else:
+                res = mo.dropout(
+                    x=self.activation_func(
+                        mo.safe_sparse_dot(
+                            a=mo.cbind(
+                                np.ones(scaled_X.shape[0]),
+                                scaled_X,
+                                backend=self.backend,
+                            ),
+                            b=W,
+                            backend=self.backend,
+                        )
+                    ),
+                    drop_prob=self.dropout,
+                    seed=self.seed,
                 )
-            ),
-            drop_prob=self.dropout,
-            seed=self.seed,
-        )
+
+            if out is None:
+                return res
+
+            out[...] = res
+            return out
+
+        # self.backend == "cpu": GEMM, activation and dropout in `out`
+        dtype = get_config()["dtype"]
+        scaled_X = scaled_X.astype(dtype, copy=False)
+        W = W.astype(dtype, copy=False)
+
+        if out is None:
+            out = np.empty((scaled_X.shape[0], W.shape[1]), dtype=dtype)
+
+        # [1, scaled_X] %*% W == scaled_X %*% W[1:, :] + W[0, :]
+        W_X = W if self.bias is False else W[1:, :]
+
+        if sparse.issparse(scaled_X):  # sparse GEMM, dense hidden layer
+            out[...] = scaled_X @ W_X
+        else:
+            np.matmul(scaled_X, W_X, out=out)
+
+        if self.bias is not False:
+            out += W[0, :]
+
+        self.activation_func(out, out=out)
+
+        return mo.dropout(x=out, drop_prob=self.dropout, seed=self.seed, out=out)
 
     def cook_training_set(self, y=None, X=None, W=None, **kwargs):
         """ Create new hidden features for training set, with hidden layer, center the response. 
 
+        When the global `feature_cache_memory` setting is > 0 (see 
+        `nnetsauce.set_config`), the result and the fitted preprocessing 
+        state are cached, keyed by the contents of X and y and the feature 
+        engineering hyperparameters only: refitting with e.g another 
+        `lambda1` reuses them. The cached arrays are shared, not copied.
+
         Args: 
     
             y: array-like, shape = [n_samples]
@@ -424,148 +447,207 @@ class Base(BaseEstimator):
 
         """
 
-        # either X and y are stored or not
-        # assert ((y is None) & (X is None)) | ((y is not None) & (X is not None))
+        if X is None:
+            X = self.X
+
+        if y is None:
+            y = self.y
+
+        # a full fit discards the chunks passed to self.partial_cook_training_set
+        self.sufficient_stats = None
+
+        cache_memory = get_config()["feature_cache_memory"]
+
+        # no cache for user-provided nodes or clustering parameters
+        if (cache_memory <= 0) or (W is not None) or (len(kwargs) > 0):
+            return self._cook_training_set(y=y, X=X, W=W, **kwargs)
+
+        feature_cache.max_bytes = cache_memory * 2 ** 20
+
+        key = self._cooking_key(X, y)
+
+        cached = feature_cache.get(key)
+
+        if cached is not None:
+            state, res = cached
+            for name, value in state.items():
+                setattr(self, name, value)
+            return res
+
+        res = self._cook_training_set(y=y, X=X)
+
+        feature_cache.put(
+            key,
+            ({name: getattr(self, name) for name in cooking_state}, res),
+        )
+
+        return res
+
+    def _cooking_key(self, X, y):
+        """ Content hash of (X, y), plus the hyperparameters in `cooking_params`. """
+
+        h = hashlib.sha1()
+
+        if sparse.issparse(X):
+            X = X.tocsr()
+            h.update(str(X.shape).encode())
+            arrays = (X.data, X.indices, X.indptr, y)
+        else:
+            arrays = (X, y)
+
+        for arr in arrays:
+            arr = np.ascontiguousarray(arr)
+            h.update(str((arr.shape, arr.dtype.str)).encode())
+            h.update(arr)
+
+        params = tuple(getattr(self, name) for name in cooking_params)
+
+        config = get_config()
+
+        return (h.hexdigest(), params, config["dtype"], config["cluster_max_rows"])
+
+    def _cook_training_set(self, y, X, W=None, **kwargs):
+        """ Create new hidden features for training set (see self.cook_training_set), 
+        without caching. 
+
+        The design matrix is allocated once: the input (and clusters) block and 
+        the hidden layer are written straight into their column slices, then 
+        scaled in place. When `row_sample` < 1, only the rows surviving the 
+        subsampling are computed. 
+        
+        Sparse X (scipy.sparse) is never densified: scaling does not center 
+        it, the hidden layer is a sparse-dense product, and the design matrix 
+        is a CSR matrix (dense when it is the hidden layer alone, i.e 
+        `direct_link` is False).
+        """
+
         if self.n_hidden_features > 0:  # has a hidden layer
             assert (
                 len(self.type_scaling) >= 2
             ), "must have len(self.type_scaling) >= 2 when self.n_hidden_features > 0"        
 
-        if X is None:
-            if self.col_sample == 1:
-                input_X = self.X
-            else:
-                n_features = self.X.shape[1]
-                new_n_features = int(np.ceil(n_features * self.col_sample))
-                assert (
-                    new_n_features >= 1
-                ), "check class attribute 'col_sample' and the number of covariates provided for X"
-                np.random.seed(self.seed)
-                index_col = np.random.choice(
-                    range(n_features), size=new_n_features, replace=False
-                )
-                self.index_col = index_col
-                input_X = self.X[:, self.index_col]
-        else:  # X is not None # keep X vs self.X
-            if self.col_sample == 1:
-                input_X = X
-            else:
-                n_features = X.shape[1]
-                new_n_features = int(np.ceil(n_features * self.col_sample))
-                assert (
-                    new_n_features >= 1
-                ), "check class attribute 'col_sample' and the number of covariates provided for X"
-                np.random.seed(self.seed)
-                index_col = np.random.choice(
-                    range(n_features), size=new_n_features, replace=False
-                )
-                self.index_col = index_col
-                input_X = X[:, self.index_col]
+        if self.col_sample == 1:
+            input_X = X
+        else:
+            n_features = X.shape[1]
+            new_n_features = int(np.ceil(n_features * self.col_sample))
+            assert (
+                new_n_features >= 1
+            ), "check class attribute 'col_sample' and the number of covariates provided for X"
+            np.random.seed(self.seed)
+            index_col = np.random.choice(
+                range(n_features), size=new_n_features, replace=False
+            )
+            self.index_col = index_col
+            input_X = X[:, self.index_col]
 
         if (
             self.n_clusters <= 0
         ):  # data without any clustering: self.n_clusters is None -----
-            if self.n_hidden_features > 0:  # with hidden layer
-                self.nn_scaler, scaled_X = mo.scale_covariates(
-                    input_X, choice=self.type_scaling[1]
-                )
-                Phi_X = (
-                    self.create_layer(scaled_X)
-                    if W is None
-                    else self.create_layer(scaled_X, W=W)
-                )
-                Z = (
-                    mo.cbind(input_X, Phi_X, backend=self.backend)
-                    if self.direct_link == True
-                    else Phi_X
-                )
-                self.scaler, scaled_Z = mo.scale_covariates(
-                    Z, choice=self.type_scaling[0]
-                )
-            else:  # no hidden layer
-                Z = input_X
-                self.scaler, scaled_Z = mo.scale_covariates(
-                    Z, choice=self.type_scaling[0]
-                )
+            augmented_X = input_X
         else:  # data with clustering: self.n_clusters is not None ----- # keep
             augmented_X = mo.cbind(
                 input_X,
                 self.encode_clusters(input_X, **kwargs),
                 backend=self.backend,
             )
-            if self.n_hidden_features > 0:  # with hidden layer
-                self.nn_scaler, scaled_X = mo.scale_covariates(
-                    augmented_X, choice=self.type_scaling[1]
-                )
-                Phi_X = (
-                    self.create_layer(scaled_X)
-                    if W is None
-                    else self.create_layer(scaled_X, W=W)
-                )
-                Z = (
-                    mo.cbind(augmented_X, Phi_X, backend=self.backend)
-                    if self.direct_link == True
-                    else Phi_X
-                )
-                self.scaler, scaled_Z = mo.scale_covariates(
-                    Z, choice=self.type_scaling[0]
+
+        # rows surviving the subsampling, before any hidden layer is computed
+        if self.row_sample < 1:
+            # stratified on the first response, for several responses
+            self.subsampler = SubSampler(
+                y=y if len(np.shape(y)) == 1 else np.asarray(y)[:, 0],
+                row_sample=self.row_sample,
+                seed=self.seed,
+            )
+            self.index_row = self.subsampler.subsample()
+            n_rows = len(self.index_row)
+        else:
+            n_rows = augmented_X.shape[0]
+
+        p_augmented = augmented_X.shape[1]
+
+        if self.n_hidden_features > 0:  # with hidden layer
+            self.nn_scaler, scaled_X = mo.scale_covariates(
+                augmented_X, choice=self.type_scaling[1]
+            )
+            if self.row_sample < 1:
+                scaled_X = scaled_X[self.index_row, :]
+            p_Z = (
+                p_augmented + self.n_hidden_features
+                if self.direct_link == True
+                else self.n_hidden_features
+            )
+        else:  # no hidden layer
+            p_Z = p_augmented
+
+        dtype = get_config()["dtype"]
+
+        with_direct_link = (self.n_hidden_features <= 0) or (
+            self.direct_link == True
+        )
+
+        # sparse design matrix (with the sparse inputs; otherwise, the design
+        # matrix is the dense hidden layer alone)
+        if sparse.issparse(augmented_X) and with_direct_link:
+
+            blocks = [
+                augmented_X[self.index_row, :]
+                if self.row_sample < 1
+                else augmented_X
+            ]
+
+            if self.n_hidden_features > 0:
+                blocks.append(self.create_layer(scaled_X, W=W))
+
+            Z = sparse.hstack(blocks, format="csr", dtype=dtype)
+
+        else:  # design matrix: [augmented_X, Phi_X], allocated once
+
+            Z = np.empty((n_rows, p_Z), dtype=dtype)
+
+            if with_direct_link:
+                Z[:, 0:p_augmented] = (
+                    augmented_X[self.index_row, :]
+                    if self.row_sample < 1
+                    else augmented_X
                 )
-            else:  # no hidden layer
-                Z = augmented_X
-                self.scaler, scaled_Z = mo.scale_covariates(
-                    Z, choice=self.type_scaling[0]
+
+            if self.n_hidden_features > 0:
+                self.create_layer(
+                    scaled_X, W=W, out=Z[:, (p_Z - self.n_hidden_features) : p_Z]
                 )
 
+        self.scaler, scaled_Z = mo.scale_covariates(
+            Z, choice=self.type_scaling[0], copy=False
+        )
+
         # Returning model inputs -----
         if mx.is_factor(y) == False:  # regression
             # center y
-            self.y_mean, centered_y = (
-                mo.center_response(self.y)
-                if y is None
-                else mo.center_response(y)
-            )
+            self.y_mean, centered_y = mo.center_response(y)
+            centered_y = centered_y.astype(dtype, copy=False)
             # y is subsampled            
             if self.row_sample < 1:
-
-                n, p = Z.shape
-
-                self.subsampler = SubSampler(y=self.y, row_sample=self.row_sample, seed=self.seed) if y is None else SubSampler(y=y, row_sample=self.row_sample, seed=self.seed)
-
-                self.index_row = self.subsampler.subsample()
-                    
-                n_row_sample = len(self.index_row)
                 # regression
                 return (
-                    centered_y[self.index_row].reshape(n_row_sample),
-                    self.scaler.transform(
-                        Z[self.index_row, :].reshape(n_row_sample, p)
+                    centered_y[self.index_row].reshape(
+                        (n_rows,) + centered_y.shape[1:]
                     ),
+                    scaled_Z,
                 )
             # y is not subsampled
             # regression
-            return (centered_y, self.scaler.transform(Z))
+            return (centered_y, scaled_Z)
             
         # classification
         # y is subsampled
         if self.row_sample < 1:
-
-            n, p = Z.shape
-
-            self.subsampler = SubSampler(y=self.y, row_sample=self.row_sample, seed=self.seed) if y is None else SubSampler(y=y, row_sample=self.row_sample, seed=self.seed)
-
-            self.index_row = self.subsampler.subsample()
-                
-            n_row_sample = len(self.index_row)
             # classification
-            return (
-                y[self.index_row].reshape(n_row_sample),
-                self.scaler.transform(
-                    Z[self.index_row, :].reshape(n_row_sample, p)
-                ),
-            )
+            return (y[self.index_row].reshape(n_rows), scaled_Z)
         # y is not subsampled
         # classification
-        return (y, self.scaler.transform(Z))
+        return (y, scaled_Z)
 
     def cook_test_set(self, X, **kwargs):
         """ Transform data from test set, with hidden layer. 
@@ -583,6 +665,14 @@ class Base(BaseEstimator):
             Transformed test set : {array-like}        
         """
 
+        return self.scaler.transform(
+            self._cook_test_features(X, **kwargs)
+        ).astype(get_config()["dtype"], copy=False)
+
+    def _cook_test_features(self, X, **kwargs):
+        """ Features of the test set (see self.cook_test_set), before the 
+        final scaling by self.scaler. """
+
         if (
             self.n_clusters == 0
         ):  # data without clustering: self.n_clusters is None -----
@@ -595,13 +685,11 @@ class Base(BaseEstimator):
                 )
                 Phi_X = self.create_layer(scaled_X, self.W)
                 if self.direct_link == True:
-                    return self.scaler.transform(
-                        mo.cbind(scaled_X, Phi_X, backend=self.backend)
-                    )
+                    return mo.cbind(scaled_X, Phi_X, backend=self.backend)
                 # when self.direct_link == False
-                return self.scaler.transform(Phi_X)
+                return Phi_X
             # if no hidden layer # self.n_hidden_features == 0
-            return self.scaler.transform(X)
+            return X
 
         # data with clustering: self.n_clusters > 0 -----
         if self.col_sample == 1:
@@ -621,10 +709,237 @@ class Base(BaseEstimator):
             scaled_X = self.nn_scaler.transform(augmented_X)
             Phi_X = self.create_layer(scaled_X, self.W)
             if self.direct_link == True:
-                return self.scaler.transform(
-                    mo.cbind(augmented_X, Phi_X, backend=self.backend)
-                )
-            return self.scaler.transform(Phi_X)
+                return mo.cbind(augmented_X, Phi_X, backend=self.backend)
+            return Phi_X
 
         # if no hidden layer
-        return self.scaler.transform(augmented_X)
+        return augmented_X
+
+    def partial_cook_training_set(self, y, X, Y=None, **kwargs):
+        """ Update the sufficient statistics of the training set's design 
+        matrix with a chunk of training data, for out-of-core fitting. 
+
+        On the first chunk, the preprocessing (clustering, input scaling, 
+        nodes W) is fitted as in self.cook_training_set, then frozen for 
+        the next chunks. The final scaler (self.scaler) is updated on each 
+        chunk with its `partial_fit`, and the column means and centered 
+        cross-products (co-moments) of the unscaled features and of the 
+        response are merged chunk by chunk (pairwise updates, as in 
+        StandardScaler.partial_fit), in double precision: no cancellation 
+        for features with large offsets. `row_sample` is not applied. 
+        See self.scaled_gram for the scaled, centered statistics.
+
+        Args: 
+
+            y: array-like, shape = [n_samples]
+                Target values
+
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors, where n_samples is the number 
+                of samples and n_features is the number of features
+
+            Y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                response whose cross-products with the features are 
+                accumulated (default is y)
+
+            **kwargs: additional parameters to be passed to 
+                self.encode_clusters, on the first chunk
+
+        Returns: 
+
+            self: object
+
+        """
+
+        if Y is None:
+            Y = y
+
+        Y = np.asarray(Y, dtype=np.float64)
+
+        if self.sufficient_stats is None:  # first chunk: fit the preprocessing
+            self._cook_training_set(y=y, X=X, **kwargs)
+            features = self._cook_test_features(X, **kwargs)
+            self.scaler, _ = mo.scale_covariates(
+                features, choice=self.type_scaling[0]
+            )
+            p = features.shape[1]
+            self.sufficient_stats = {
+                "n_inputs": X.shape[1],
+                "n": 0,
+                "mean_features": np.zeros(p),
+                "comoment_features": np.zeros((p, p)),
+                "mean_response": np.zeros(Y.shape[1:]),
+                "comoment_response": np.zeros(Y.shape[1:]),
+                "comoment_features_response": np.zeros((p,) + Y.shape[1:]),
+            }
+        else:
+            features = self._cook_test_features(X, **kwargs)
+            self.scaler.partial_fit(features)
+
+        # the chunk's means and co-moments
+        n_chunk = features.shape[0]
+        mean_Y = Y.mean(axis=0)
+        centered_Y = Y - mean_Y
+        if sparse.issparse(features):  # not centered, to remain sparse
+            mean_features = np.asarray(features.mean(axis=0)).ravel()
+            comoment_features = mo.crossprod(x=features) - n_chunk * np.outer(
+                mean_features, mean_features
+            )
+            comoment_features_response = mo.crossprod(x=features, y=centered_Y)
+        else:
+            features = np.asarray(features, dtype=np.float64)
+            mean_features = features.mean(axis=0)
+            centered_features = features - mean_features
+            comoment_features = mo.crossprod(x=centered_features)
+            comoment_features_response = mo.crossprod(
+                x=centered_features, y=centered_Y
+            )
+
+        # pairwise merge with the previous chunks' statistics
+        stats = self.sufficient_stats
+        n = stats["n"] + n_chunk
+        weight = stats["n"] * n_chunk / n
+        delta_features = mean_features - stats["mean_features"]
+        delta_Y = mean_Y - stats["mean_response"]
+        stats["comoment_features"] += comoment_features + weight * np.outer(
+            delta_features, delta_features
+        )
+        stats["comoment_features_response"] += (
+            comoment_features_response
+            + weight * np.multiply.outer(delta_features, delta_Y)
+        )
+        stats["comoment_response"] += (centered_Y ** 2).sum(
+            axis=0
+        ) + weight * delta_Y ** 2
+        stats["mean_features"] += delta_features * n_chunk / n
+        stats["mean_response"] += delta_Y * n_chunk / n
+        stats["n"] = n
+
+        return self
+
+    def scaled_gram(self, center_response=True):
+        """ Cross-products of the scaled design matrix Z, from the statistics 
+        accumulated by self.partial_cook_training_set: each scaler used here 
+        is affine, Z = features*a + b. 
+
+        Args: 
+
+            center_response: bool
+                center the response (and store its mean in self.y_mean), as 
+                for regression
+
+        Returns: 
+
+            (number of rows, t(Z)%*%Z, t(Z)%*%response, sum of the squared 
+            response): {tuple}
+
+        """
+
+        stats = self.sufficient_stats
+        n = stats["n"]
+        mean_features = stats["mean_features"]
+        p = mean_features.shape[0]
+
+        # slopes a and column means of Z, evaluated around the features' 
+        # means (no cancellation for features with large offsets)
+        step = np.maximum(np.abs(mean_features), 1)
+        mean_Z = np.asarray(
+            self.scaler.transform(mean_features.reshape(1, p))
+        ).ravel()
+        a = (
+            np.asarray(
+                self.scaler.transform((mean_features + step).reshape(1, p))
+            ).ravel()
+            - mean_Z
+        ) / ((mean_features + step) - mean_features)
+
+        # t(Z)%*%Z and t(Z)%*%(centered response)
+        cov_Z = a[:, None] * stats["comoment_features"] * a[
+            None, :
+        ] + n * np.outer(mean_Z, mean_Z)
+        cov_Z_response = (
+            a.reshape(
+                (p,) + (1,) * (stats["comoment_features_response"].ndim - 1)
+            )
+            * stats["comoment_features_response"]
+        )
+        sum_squared_response = stats["comoment_response"]
+
+        if center_response == True:
+            self.y_mean = stats["mean_response"].copy()
+        else:
+            cov_Z_response = cov_Z_response + n * np.multiply.outer(
+                mean_Z, stats["mean_response"]
+            )
+            sum_squared_response = (
+                sum_squared_response + n * stats["mean_response"] ** 2
+            )
+
+        return n, cov_Z, cov_Z_response, sum_squared_response
+
+    def predict_in_chunks(self, X, predict_func, **kwargs):
+        """ Apply a prediction function to the test set, block of rows by block of rows. 
+
+        The size of each block is derived from the global `working_memory` 
+        setting (see `nnetsauce.set_config`), so that peak memory depends 
+        on the block size and not on the number of rows in X.
+        
+        Args: 
+    
+            X: {array-like}, shape = [n_samples, n_features]
+                Test vectors, where n_samples is the number 
+                of samples and n_features is the number of features
+    
+            predict_func: function
+                takes a cooked block of rows (see self.cook_test_set) and returns 
+                the predictions for this block (an array, or a tuple of arrays)
+
+            **kwargs: additional parameters to be passed to self.cook_test_set
+            
+        Returns: 
+    
+            predictions for the whole test set: {array-like} or tuple of {array-like}
+        """
+
+        n_rows = X.shape[0]
+
+        if n_rows == 0:  # the outputs' structure, from one (dummy) row
+            res = predict_func(
+                self.cook_test_set(np.zeros((1, X.shape[1])), **kwargs)
+            )
+            if isinstance(res, tuple):
+                return tuple(np.asarray(r)[:0] for r in res)
+            return np.asarray(res)[:0]
+
+        # one cooked row: input features, clusters and hidden layer (the 
+        # width of Z, in the configured dtype), plus the intermediate copies 
+        # made in self.cook_test_set
+        n_features = self.cook_test_set(X[:1], **kwargs).shape[1]
+        row_bytes = 3 * np.dtype(get_config()["dtype"]).itemsize * n_features
+        chunk_n_rows = get_chunk_n_rows(
+            row_bytes=row_bytes,
+            max_n_rows=n_rows,
+            working_memory=get_config()["working_memory"],
+        )
+
+        res = None
+
+        for batch in gen_batches(n_rows, chunk_n_rows):
+
+            batch_res = predict_func(self.cook_test_set(X[batch], **kwargs))
+
+            is_tuple = isinstance(batch_res, tuple)
+
+            if is_tuple == False:
+                batch_res = (batch_res,)
+
+            if res is None:  # preallocate outputs
+                res = tuple(
+                    np.empty((n_rows,) + np.shape(r)[1:], dtype=np.asarray(r).dtype)
+                    for r in batch_res
+                )
+
+            for r, r_batch in zip(res, batch_res):
+                r[batch] = r_batch
+
+        return res if is_tuple else res[0]
@@ -4,6 +4,7 @@
 
 import numpy as np
 from .base import Base
+from .._config import get_config
 import sklearn.metrics as skm
 from ..utils import matrixops as mo
 from ..utils import lmfuncs as lmf
@@ -50,8 +51,8 @@ class BaseRegressor(Base, RegressorMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -120,8 +121,9 @@ class BaseRegressor(Base, RegressorMixin):
                 Training vectors, where n_samples is the number 
                 of samples and n_features is the number of features
             
-            y: array-like, shape = [n_samples]
-                Target values
+            y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                Target values (several targets share the features and the
+                factorization)
     
             **kwargs: additional parameters to be passed to self.cook_training_set
                
@@ -132,7 +134,9 @@ class BaseRegressor(Base, RegressorMixin):
 
         centered_y, scaled_Z = self.cook_training_set(y=y, X=X, **kwargs)
 
-        fit_obj = lmf.beta_Sigma_hat(X=scaled_Z, y=centered_y, backend=self.backend)
+        fit_obj = lmf.beta_Sigma_hat(
+            X=scaled_Z, y=centered_y, return_cov=False, backend=self.backend
+        )
 
         self.beta = fit_obj["beta_hat"]
 
@@ -140,6 +144,57 @@ class BaseRegressor(Base, RegressorMixin):
 
         return self
 
+    def partial_fit(self, X, y, **kwargs):
+        """Update BaseRegressor with a chunk of training data (X, y), for 
+        out-of-core fitting: only the cross-products of the design matrix 
+        are kept in memory. Call self.finalize once all the chunks are passed.
+
+        The preprocessing (clustering, scaling of the inputs, hidden layer) is 
+        fitted on the first chunk, then frozen (see 
+        self.partial_cook_training_set).
+        
+        Args:
+        
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors, where n_samples is the number 
+                of samples and n_features is the number of features
+            
+            y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                Target values (several targets share the features and the
+                factorization)
+    
+            **kwargs: additional parameters to be passed to 
+                self.partial_cook_training_set
+               
+        Returns:
+        
+            self: object
+        """
+
+        self.partial_cook_training_set(y=y, X=X, **kwargs)
+
+        return self
+
+    def finalize(self):
+        """Fit BaseRegressor on the chunks of training data passed to 
+        self.partial_fit.
+               
+        Returns:
+        
+            self: object
+        """
+
+        n, cov_Z, cov_Z_y, sum_squared_y = self.scaled_gram()
+
+        self.beta = lmf.beta_hat_cov(cov_Z, cov_Z_y).astype(
+            get_config()["dtype"], copy=False
+        )
+
+        # as in self.fit (see lmfuncs.beta_Sigma_hat)
+        self.GCV = sum_squared_y / n
+
+        return self
+
     def predict(self, X, **kwargs):
         """Predict test data X.
         
@@ -153,7 +208,8 @@ class BaseRegressor(Base, RegressorMixin):
                
         Returns:
         
-            model predictions: {array-like}
+            model predictions: {array-like}, shape = [n_samples] or 
+            [n_samples, n_targets]
         """
 
         if len(X.shape) == 1:
@@ -173,8 +229,11 @@ class BaseRegressor(Base, RegressorMixin):
                 )
             )[0]
 
-        return self.y_mean + mo.safe_sparse_dot(
-            a=self.cook_test_set(X, **kwargs), b=self.beta, backend=self.backend
+        return self.predict_in_chunks(
+            X,
+            lambda Z: self.y_mean
+            + mo.safe_sparse_dot(a=Z, b=self.beta, backend=self.backend),
+            **kwargs
         )
 
     def score(self, X, y, scoring=None, **kwargs):
@@ -56,8 +56,8 @@ class Boosting(Base):
             if `False`, then labels are used, without one-hot encoding
             
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
             
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -52,8 +52,8 @@ class CustomClassifier(Custom, ClassifierMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -185,7 +185,9 @@ class CustomClassifier(Custom, ClassifierMixin):
                 self.obj.predict(self.cook_test_set(new_X, **kwargs), **kwargs)
             )[0]
 
-        return self.obj.predict(self.cook_test_set(X, **kwargs), **kwargs)
+        return self.predict_in_chunks(
+            X, lambda Z: self.obj.predict(Z, **kwargs), **kwargs
+        )
 
     def predict_proba(self, X, **kwargs):
         """Predict probabilities for test data X.
@@ -218,7 +220,9 @@ class CustomClassifier(Custom, ClassifierMixin):
                 )
             )[0]
 
-        return self.obj.predict_proba(self.cook_test_set(X, **kwargs), **kwargs)
+        return self.predict_in_chunks(
+            X, lambda Z: self.obj.predict_proba(Z, **kwargs), **kwargs
+        )
 
     def score(self, X, y, scoring=None, **kwargs):
         """ Score the model on test set features X and response y. 
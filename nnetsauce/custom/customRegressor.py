@@ -54,8 +54,8 @@ class CustomRegressor(Custom, RegressorMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -194,8 +194,8 @@ class CustomRegressor(Custom, RegressorMixin):
                 )
             )[0]
 
-        return self.y_mean + self.obj.predict(
-            self.cook_test_set(X, **kwargs), **kwargs
+        return self.predict_in_chunks(
+            X, lambda Z: self.y_mean + self.obj.predict(Z, **kwargs), **kwargs
         )
 
     def score(self, X, y, scoring=None, **kwargs):
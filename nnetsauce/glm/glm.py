@@ -6,7 +6,9 @@
 
 
 import numpy as np
+from scipy import sparse
 from ..base import Base
+from ..utils import matrixops as mo
 from ..optimizers import Optimizer
 
 
@@ -61,8 +63,8 @@ class GLM(Base):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -75,6 +77,11 @@ class GLM(Base):
         seed: int 
             reproducibility seed for nodes_sim=='uniform' and clustering       
 
+        warm_start: bool
+            if True, `fit` starts from the previous solution (self.beta, and 
+            the optimizer's velocity) when the number of coefficients is 
+            unchanged, instead of a least squares solution
+
     """
 
     # construct the object -----
@@ -98,6 +105,7 @@ class GLM(Base):
         type_scaling=("std", "std", "std"),
         optimizer=Optimizer(),
         seed=123,
+        warm_start=False,
     ):
 
         super().__init__(
@@ -120,40 +128,61 @@ class GLM(Base):
         self.lambda2 = lambda2
         self.alpha2 = alpha2
         self.optimizer = optimizer
+        self.warm_start = warm_start
         self.beta = None
         
         
+    def warm_start_point(self, beta, n_coefs):
+        """Starting point of the optimizer for warm starts: previous solution 
+        beta and the optimizer's velocity, if self.warm_start is True and 
+        their number of coefficients is n_coefs (None otherwise)."""
+
+        if (
+            (self.warm_start == False)
+            or (beta is None)
+            or (np.shape(beta) != (n_coefs,))
+        ):
+            return None, None
+
+        velocity = self.optimizer.velocity
+
+        if (velocity is not None) and (np.shape(velocity) != (n_coefs,)):
+            velocity = None
+
+        # copied: the optimizer updates its starting point in place
+        return np.array(beta, dtype=np.double), velocity
+
     def compute_XB(self, X, beta=None, row_index=None):        
         
         if beta is not None:            
             
             if (row_index is None):
                 
-                return np.dot(X, beta)
+                return mo.safe_sparse_dot(X, beta)
             
-            return np.dot(X[row_index,:], beta)
+            return mo.safe_sparse_dot(X[row_index,:], beta)
         
         # self.beta is not None in this case       
         if row_index is None:
             
-            return np.dot(X, self.beta)
+            return mo.safe_sparse_dot(X, self.beta)
         
-        return np.dot(X[row_index,:], self.beta)
+        return mo.safe_sparse_dot(X[row_index,:], self.beta)
 
 
     def compute_XB2(self, X, beta=None, row_index=None):   
 
         def f00(X):
-            return np.dot(X, self.beta)
+            return mo.safe_sparse_dot(X, self.beta)
 
         def f01(X):
-            return np.dot(X[row_index,:], self.beta)
+            return mo.safe_sparse_dot(X[row_index,:], self.beta)
 
         def f11(X):
-            return np.dot(X[row_index,:], beta)
+            return mo.safe_sparse_dot(X[row_index,:], beta)
 
         def f10(X):
-            return np.dot(X, beta)             
+            return mo.safe_sparse_dot(X, beta)             
 
         h_result = {'00': f00,
                     '01': f01,
@@ -181,4 +210,44 @@ class GLM(Base):
         return self.penalty(beta1=beta[0:group_index], 
                             beta2=beta[group_index:len(beta)], 
                             lambda1=self.lambda1, lambda2=self.lambda2, 
-                            alpha1=self.alpha1, alpha2=self.alpha2)
\ No newline at end of file
+                            alpha1=self.alpha1, alpha2=self.alpha2)
+
+
+    def compute_penalty_grad(self, group_index, beta):
+        """Gradient of self.compute_penalty with respect to beta (a 
+        subgradient for the l1 terms, with sign(0) = 0)."""
+
+        res = np.empty_like(beta)
+
+        for index, lambda_, alpha_ in (
+            (slice(0, group_index), self.lambda1, self.alpha1),
+            (slice(group_index, len(beta)), self.lambda2, self.alpha2),
+        ):
+            res[index] = lambda_ * (
+                (1 - alpha_) * beta[index] + alpha_ * np.sign(beta[index])
+            )
+
+        return res
+
+
+    def compute_penalty_grad_j(self, group_index, beta, j):
+        """j-th coordinate of self.compute_penalty_grad, in O(1)."""
+
+        if j < group_index:
+            lambda_, alpha_ = self.lambda1, self.alpha1
+        else:
+            lambda_, alpha_ = self.lambda2, self.alpha2
+
+        return lambda_ * ((1 - alpha_) * beta[j] + alpha_ * np.sign(beta[j]))
+
+
+    def column_getter(self, X):
+        """Function returning the j-th column of X as a dense vector (X is
+        converted to CSC once, if sparse)."""
+
+        if sparse.issparse(X):
+            X = X.tocsc()
+            return lambda j: X[:, j].toarray().ravel()
+
+        X = np.asfortranarray(X)
+        return lambda j: X[:, j]
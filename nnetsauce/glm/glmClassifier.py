@@ -67,8 +67,8 @@ class GLMClassifier(GLM, ClassifierMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -81,6 +81,11 @@ class GLMClassifier(GLM, ClassifierMixin):
         seed: int 
             reproducibility seed for nodes_sim=='uniform'
 
+        warm_start: bool
+            if True, `fit` starts from the previous solution (self.beta, and 
+            the optimizer's velocity) when the number of coefficients is 
+            unchanged, instead of a least squares solution
+
     """
     
     
@@ -106,6 +111,7 @@ class GLMClassifier(GLM, ClassifierMixin):
         type_scaling=("std", "std", "std"),  
         optimizer=Optimizer(),
         seed=123,
+        warm_start=False,
     ):
 
         super().__init__(
@@ -126,6 +132,7 @@ class GLMClassifier(GLM, ClassifierMixin):
             type_scaling=type_scaling,
             optimizer=optimizer,
             seed=seed,
+            warm_start=warm_start,
         )
         
         self.family = family
@@ -134,7 +141,7 @@ class GLMClassifier(GLM, ClassifierMixin):
         
     def logit_loss(self, Y, row_index, XB):
         
-        self.n_classes = len(np.unique(y))
+        self.n_classes = Y.shape[1]
         #Y = mo.one_hot_encode2(y, self.n_classes)
         #Y = self.optimizer.one_hot_encode(y, self.n_classes)
 
@@ -192,6 +199,99 @@ class GLMClassifier(GLM, ClassifierMixin):
         
                                                 
     
+    def loss_and_grad(self, beta, group_index, 
+                      X, Y, y,
+                      row_index=None, type_loss="logit", 
+                      **kwargs):
+        """Loss function (see self.loss_func) and its gradient with respect 
+        to beta (a subgradient for the l1 penalty), in one pass over the 
+        rows in row_index."""
+
+        beta = np.asarray(beta)
+
+        if row_index is None:
+            X_, Y_ = X, Y
+        else:
+            X_, Y_ = X[row_index, :], Y[row_index, :]
+
+        XB = mo.safe_sparse_dot(X_, np.reshape(beta, (X.shape[1], 
+                                                      self.n_classes), 
+                                               order="F"))
+
+        if type_loss == "logit":
+            clipped = XB > 709.0
+            XB[clipped] = 709.0
+
+        # the log-sum-exp is taken over the whole matrix XB
+        lse = logsumexp(XB)
+        loss = -np.mean(np.sum(Y_ * XB, axis=1) - lse)
+        d_XB = np.exp(XB - lse) - Y_/XB.shape[0]
+
+        if type_loss == "logit":
+            d_XB[clipped] = 0
+
+        return (loss + self.compute_penalty(group_index=group_index, 
+                                            beta=beta), 
+                mo.crossprod(x=X_, y=d_XB).flatten(order="F") 
+                + self.compute_penalty_grad(group_index=group_index, 
+                                            beta=beta))
+
+
+    def coordinate_grad(self, beta, group_index,
+                        X, Y, y,
+                        row_index=None, type_loss="logit",
+                        **kwargs):
+        """Partial derivatives of self.loss_func over the rows in row_index,
+        for coordinate descent.
+
+        X%*%B is computed once, at beta. The returned function
+        grad_j(beta, j) gives the j-th partial derivative in one pass over
+        the n_rows x n_classes matrix X%*%B: beta may only have changed,
+        since the previous call, at the previous call's coordinate, which
+        is folded into one column of X%*%B with a rank-1 update."""
+
+        if row_index is None:
+            X_, Y_ = X, Y
+        else:
+            X_, Y_ = X[row_index, :], Y[row_index, :]
+
+        p = X.shape[1]
+
+        column = self.column_getter(X_)
+
+        XB = np.array(mo.safe_sparse_dot(X_, np.reshape(np.asarray(beta),
+                                                        (p, self.n_classes),
+                                                        order="F")),
+                      dtype=np.double)
+
+        # coordinate of the previous call, and its value then
+        previous = [None, 0.0]
+
+        def grad_j(beta, j):
+
+            i, value = previous
+
+            if (i is not None) and (beta[i] != value):
+                XB[:, i // p] += (beta[i] - value) * column(i % p)
+
+            previous[0], previous[1] = j, beta[j]
+
+            # as in self.loss_and_grad, for the (j % p, j // p) coefficient
+            XB_ = np.minimum(XB, 709.0) if type_loss == "logit" else XB
+            k = j // p
+            d_XB_k = np.exp(XB_[:, k] - logsumexp(XB_)) - Y_[:, k]/XB.shape[0]
+
+            if type_loss == "logit":
+                d_XB_k[XB[:, k] > 709.0] = 0
+
+            return np.dot(column(j % p), d_XB_k) + self.compute_penalty_grad_j(
+                group_index=group_index, beta=beta, j=j
+            )
+
+        return grad_j
+        
+                                                
+    
     def fit(self, X, y, 
             learning_rate=0.01, decay=0.1, # in an object, in constructor
             batch_prop=1, tolerance=1e-5, # in an object, in constructor
@@ -219,6 +319,9 @@ class GLMClassifier(GLM, ClassifierMixin):
 
         assert mx.is_factor(y), "y must contain only integers" # change is_factor and subsampling everywhere
         
+        # previous solution, for warm starts
+        beta0 = self.beta
+
         self.beta = None
         
         self.n_iter = 0
@@ -231,11 +334,19 @@ class GLMClassifier(GLM, ClassifierMixin):
         
         output_y, scaled_Z = self.cook_training_set(y=y, X=X, **kwargs)
 
+        # the optimizers work in double precision (whatever the `dtype` setting)
+        scaled_Z = scaled_Z.astype(np.float64, copy=False)
+
         #Y = mo.one_hot_encode2(output_y, self.n_classes)
         Y = self.optimizer.one_hot_encode(output_y, self.n_classes)
         
         # initialization                    
-        beta_ = np.linalg.lstsq(scaled_Z, Y, rcond=None)[0]  
+        x0, velocity0 = self.warm_start_point(
+            beta0, scaled_Z.shape[1] * self.n_classes
+        )
+
+        if x0 is None:
+            x0 = np.linalg.lstsq(scaled_Z, Y, rcond=None)[0].flatten(order="F")
         
         self.optimizer.learning_rate = learning_rate
         self.optimizer.decay = decay
@@ -249,7 +360,10 @@ class GLMClassifier(GLM, ClassifierMixin):
         #          **kwargs)
         self.optimizer.fit(self.loss_func,  
                            response = np.asarray(y, dtype=np.float), 
-                           x0 = beta_.flatten(order="F"),
+                           x0 = x0,
+                           velocity0 = velocity0,
+                           loss_and_grad = self.loss_and_grad,
+                           coordinate_grad = self.coordinate_grad,
                            group_index = self.group_index, 
                            X = scaled_Z, 
                            Y = Y,
@@ -12,6 +12,8 @@ from ..utils import matrixops as mo
 from ..utils import misc as mx
 from sklearn.base import RegressorMixin
 from scipy.optimize import minimize
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
 from ..optimizers import Optimizer
 from scipy.special import erf, factorial
 
@@ -67,8 +69,8 @@ class GLMRegressor(GLM, RegressorMixin):
                 if `False`, then labels are used, without one-hot encoding
 
             type_clust: str
-                type of clustering method: currently k-means ('kmeans') or Gaussian 
-                Mixture Model ('gmm')
+                type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+                ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
                 
             type_scaling: a tuple of 3 strings
                 scaling methods for inputs, hidden layer, and clustering respectively
@@ -81,6 +83,11 @@ class GLMRegressor(GLM, RegressorMixin):
             seed: int 
                 reproducibility seed for nodes_sim=='uniform'
 
+            warm_start: bool
+                if True, `fit` starts from the previous solution (self.beta, and 
+                the optimizer's velocity) when the number of coefficients is 
+                unchanged, instead of a least squares solution
+
     """        
     
     # construct the object -----
@@ -105,6 +112,7 @@ class GLMRegressor(GLM, RegressorMixin):
         type_scaling=("std", "std", "std"),  
         optimizer=Optimizer(),
         seed=123,
+        warm_start=False,
     ):
 
         super().__init__(
@@ -125,6 +133,7 @@ class GLMRegressor(GLM, RegressorMixin):
             type_scaling=type_scaling,
             optimizer=optimizer,
             seed=seed,
+            warm_start=warm_start,
         )
         
         self.family = family
@@ -174,6 +183,82 @@ class GLMRegressor(GLM, RegressorMixin):
         
                                                 
     
+    def loss_and_grad(self, beta, group_index, X, y, 
+                      row_index=None, type_loss="gaussian", 
+                      **kwargs):
+        """Loss function (see self.loss_func) and its gradient with respect 
+        to beta (a subgradient for 'laplace' and the l1 penalty), in one 
+        pass over the rows in row_index."""
+
+        beta = np.asarray(beta)
+
+        if row_index is None:
+            X_, y_ = X, y
+        else:
+            X_, y_ = X[row_index, :], y[row_index]
+
+        residuals = y_ - mo.safe_sparse_dot(X_, beta)
+
+        if type_loss == "gaussian":
+            loss = 0.5*np.mean(np.square(residuals))
+            d_XB = -residuals/len(residuals)
+        else: # "laplace"
+            loss = 0.5*np.mean(np.abs(residuals))
+            d_XB = -0.5*np.sign(residuals)/len(residuals)
+
+        return (loss + self.compute_penalty(group_index=group_index, 
+                                            beta=beta), 
+                mo.crossprod(x=X_, y=d_XB) 
+                + self.compute_penalty_grad(group_index=group_index, 
+                                            beta=beta))
+
+
+    def coordinate_grad(self, beta, group_index, X, y,
+                        row_index=None, type_loss="gaussian",
+                        **kwargs):
+        """Partial derivatives of self.loss_func over the rows in row_index,
+        for coordinate descent.
+
+        The residuals are computed once, at beta. The returned function
+        grad_j(beta, j) gives the j-th partial derivative in one pass over
+        the rows: beta may only have changed, since the previous call, at
+        the previous call's coordinate, which is folded into the residuals
+        with a rank-1 update."""
+
+        if row_index is None:
+            X_, y_ = X, y
+        else:
+            X_, y_ = X[row_index, :], y[row_index]
+
+        column = self.column_getter(X_)
+
+        residuals = y_ - mo.safe_sparse_dot(X_, np.asarray(beta))
+
+        # coordinate of the previous call, and its value then
+        previous = [None, 0.0]
+
+        def grad_j(beta, j):
+
+            i, value = previous
+
+            if (i is not None) and (beta[i] != value):
+                residuals[:] -= (beta[i] - value) * column(i)
+
+            previous[0], previous[1] = j, beta[j]
+
+            if type_loss == "gaussian":
+                d_XB = -residuals/len(residuals)
+            else: # "laplace"
+                d_XB = -0.5*np.sign(residuals)/len(residuals)
+
+            return np.dot(column(j), d_XB) + self.compute_penalty_grad_j(
+                group_index=group_index, beta=beta, j=j
+            )
+
+        return grad_j
+
+                                                
+    
     def fit(self, X, y, 
             learning_rate=0.01, decay=0.1, # in an object, in constructor
             batch_prop=1, tolerance=1e-5, # in an object, in constructor
@@ -199,6 +284,9 @@ class GLMRegressor(GLM, RegressorMixin):
 
         """
         
+        # previous solution, for warm starts
+        beta0 = self.beta
+
         self.beta = None
         
         self.n_iter = 0
@@ -206,11 +294,21 @@ class GLMRegressor(GLM, RegressorMixin):
         n, self.group_index = X.shape
         
         centered_y, scaled_Z = self.cook_training_set(y=y, X=X)
+
+        # the optimizers work in double precision (whatever the `dtype` setting)
+        centered_y = np.asarray(centered_y, dtype=np.float64)
+        scaled_Z = scaled_Z.astype(np.float64, copy=False)
         
         n_Z = scaled_Z.shape[0]
         
         # initialization                    
-        beta_ = np.linalg.lstsq(scaled_Z, centered_y, rcond=None)[0]     
+        beta_, velocity0 = self.warm_start_point(beta0, scaled_Z.shape[1])
+
+        if beta_ is None:
+            if sparse.issparse(scaled_Z):
+                beta_ = lsqr(scaled_Z, centered_y)[0]
+            else:
+                beta_ = np.linalg.lstsq(scaled_Z, centered_y, rcond=None)[0]     
 
         self.optimizer.learning_rate = learning_rate
         self.optimizer.decay = decay
@@ -226,6 +324,9 @@ class GLMRegressor(GLM, RegressorMixin):
         self.optimizer.fit(self.loss_func,  
                            response = centered_y, 
                            x0 = beta_,
+                           velocity0 = velocity0,
+                           loss_and_grad = self.loss_and_grad,
+                           coordinate_grad = self.coordinate_grad,
                            group_index = self.group_index, 
                            X = scaled_Z, 
                            y = centered_y, 
@@ -265,10 +366,10 @@ class GLMRegressor(GLM, RegressorMixin):
                 np.ones(n_features).reshape(1, n_features),
             )
                            
-            return (self.y_mean + np.dot(self.cook_test_set(new_X, **kwargs), 
+            return (self.y_mean + mo.safe_sparse_dot(self.cook_test_set(new_X, **kwargs), 
                                          self.beta))[0]
         
-        return self.y_mean + np.dot(self.cook_test_set(X, **kwargs), 
+        return self.y_mean + mo.safe_sparse_dot(self.cook_test_set(X, **kwargs), 
                                     self.beta)
     
     
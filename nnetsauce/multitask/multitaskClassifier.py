@@ -55,8 +55,8 @@ class MultitaskClassifier(Base, ClassifierMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -205,10 +205,10 @@ class MultitaskClassifier(Base, ClassifierMixin):
 
         shape_X = X.shape
 
-        probs = np.zeros((shape_X[0], self.n_classes))
-
         if len(shape_X) == 1:
 
+            probs = np.zeros((shape_X[0], self.n_classes))
+
             n_features = shape_X[0]
 
             new_X = mo.rbind(
@@ -223,18 +223,24 @@ class MultitaskClassifier(Base, ClassifierMixin):
 
                 probs[:, i] = self.fit_objs[i].predict(Z, **kwargs)[0]
 
-        else:
+            expit_raw_probs = expit(probs)
+
+            return expit_raw_probs / expit_raw_probs.sum(axis=1)[:, None]
 
-            Z = self.cook_test_set(X, **kwargs)
+        def calc_probs(Z):
+
+            probs = np.zeros((Z.shape[0], self.n_classes))
 
             # loop on all the classes
             for i in range(self.n_classes):
 
                 probs[:, i] = self.fit_objs[i].predict(Z, **kwargs)
 
-        expit_raw_probs = expit(probs)
+            expit_raw_probs = expit(probs)
+
+            return expit_raw_probs / expit_raw_probs.sum(axis=1)[:, None]
 
-        return expit_raw_probs / expit_raw_probs.sum(axis=1)[:, None]
+        return self.predict_in_chunks(X, calc_probs, **kwargs)
 
     def score(self, X, y, scoring=None, **kwargs):
         """ Score the model on test set features X and response y. 
@@ -78,9 +78,11 @@ class Optimizer(BaseEstimator):
         self.decay = decay
         self.verbose = verbose
         self.opt = None
+        self.velocity = None
                                                           
     
-    def fit(self, loss_func, response, x0, **kwargs):
+    def fit(self, loss_func, response, x0, velocity0=None, loss_and_grad=None, 
+            coordinate_grad=None, **kwargs):
         """Fit GLM model to training data (X, y).
         
         Args:
@@ -92,6 +94,21 @@ class Optimizer(BaseEstimator):
             
             x0: array-like, shape = [n_features]
                 initial value provided to the optimizer
+
+            velocity0: array-like, shape = [n_features]
+                initial velocity for `learning_method` == "momentum" (e.g 
+                self.velocity from a previous fit, for warm starts); 
+                default is zero
+
+            loss_and_grad: function
+                returns the loss function and its gradient (same arguments as 
+                loss_func), used in place of finite differences when provided
+
+            coordinate_grad: function
+                for `type_optim` == "scd": returns, for a minibatch, a function 
+                grad_j(x, j) giving the j-th partial derivative of the loss 
+                function (same arguments as loss_func), used in place of 
+                loss_and_grad when provided
         
             **kwargs: additional parameters to be passed to 
                     loss function
@@ -114,6 +131,9 @@ class Optimizer(BaseEstimator):
                             mass=self.mass, decay=self.decay,                     
                             randomization=self.randomization,             
                             verbose=self.verbose, 
+                            velocity0=velocity0,
+                            loss_and_grad=loss_and_grad,
+                            coordinate_grad=coordinate_grad,
                             **kwargs)            
             
             
@@ -128,8 +148,13 @@ class Optimizer(BaseEstimator):
                             mass=self.mass, decay=self.decay,                     
                             randomization=self.randomization,             
                             verbose=self.verbose, 
+                            velocity0=velocity0,
+                            loss_and_grad=loss_and_grad,
                             **kwargs)    
 
+        # final velocity, for warm starts
+        self.velocity = self.results[3]
+
         return self
 
     def one_hot_encode(self, y, n_classes):
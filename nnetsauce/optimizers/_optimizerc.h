@@ -1,4 +1,4 @@
-/* Generated by Cython 0.29.21 */
+/* Generated by Cython 0.29.37 */
 
 #ifndef __PYX_HAVE__nnetsauce__optimizers___optimizerc
 #define __PYX_HAVE__nnetsauce__optimizers___optimizerc
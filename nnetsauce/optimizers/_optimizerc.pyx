@@ -376,6 +376,41 @@ def one_hot_encode(long int[:] y,
     return np.asarray(res)
 
 
+# 5 - gradients for the optimizers -----
+
+# minibatch gradient: analytic (one pass over the minibatch) when 
+# loss_and_grad is provided, numerical (2p loss evaluations) otherwise 
+def calc_grad_i(objective, double[:] x, idx, loss_and_grad, dict kwargs):
+    if loss_and_grad is None:
+        return calc_grad(objective, x)
+    return np.asarray(loss_and_grad(x, row_index=idx, **kwargs)[1], 
+                      dtype=np.double)
+
+
+# j-th coordinate of the minibatch gradient: from grad_j (one pass over 
+# the minibatch, see init_grad_j) when provided, analytic (full gradient) 
+# when loss_and_grad is provided, central finite difference (2 loss 
+# evaluations) otherwise
+def calc_grad_j(f_j, double[:] x, long int j, idx, loss_and_grad, 
+                dict kwargs, grad_j=None):
+    cdef double h0
+    if grad_j is not None:
+        return grad_j(np.asarray(x), j)
+    if loss_and_grad is None:
+        h0 = 6.055454452393343e-06*x[j]        
+        return (f_j(h0, x, j) - f_j(-h0, x, j))/(2*h0)
+    return loss_and_grad(x, row_index=idx, **kwargs)[1][j]
+
+
+# per-coordinate gradient on the minibatch idx, starting at x: 
+# coordinate_grad(x, row_index=idx, **kwargs) returns grad_j(x, j), which 
+# keeps track of the changes in x[j] between calls (None if not provided)
+def init_grad_j(double[:] x, idx, coordinate_grad, dict kwargs):
+    if coordinate_grad is None:
+        return None
+    return coordinate_grad(np.asarray(x), row_index=idx, **kwargs)
+
+
 # Coordinate descent (Stochastic) -----
 
 # 1 - algos -----
@@ -383,15 +418,16 @@ def one_hot_encode(long int[:] y,
 def scd(loss_func, double[:] response, double[:] x, int num_iters=200, 
         double batch_prop=1.0, double learning_rate=0.01, double mass=0.9, 
         double decay=0.1, method="momentum", randomization="strat", 
-        double tolerance=1e-3, verbose=1, 
-        **kwargs):
+        double tolerance=1e-3, verbose=1, velocity0=None, 
+        loss_and_grad=None, coordinate_grad=None, **kwargs):
     """Stochastic gradient descent with momentum and adaptive learning rates."""
     
     cdef int i = 0 
     cdef long int j = 0
     cdef long int n = len(response)
     cdef long int p = len(x)
-    cdef double[:] velocity = np.zeros(p)
+    # initial velocity (for warm starts)
+    cdef double[:] velocity = np.zeros(p) if velocity0 is None else np.array(velocity0, dtype=np.double)
     cdef double grad_x, decay_rate, learning_rate_, h0
     cdef list losses = []
 
@@ -424,9 +460,11 @@ def scd(loss_func, double[:] response, double[:] x, int num_iters=200,
             if verbose == 2:
                 print(f"\n x prev: {np.asarray(x)}")
             
+            grad_j = init_grad_j(x, idx, coordinate_grad, kwargs)
+
             for j in range(p):                          
-                h0 = 6.055454452393343e-06*x[j]        
-                grad_x = (f_j(h0, x, j) - f_j(-h0, x, j))/(2*h0)        
+                grad_x = calc_grad_j(f_j, x, j, idx, loss_and_grad, kwargs, 
+                                     grad_j)
                 velocity[j] = mass * velocity[j] - learning_rate * grad_x  
                 x[j] = x[j] + velocity[j]        
             
@@ -479,9 +517,11 @@ def scd(loss_func, double[:] response, double[:] x, int num_iters=200,
             
             losses.append(f(x))
             
+            grad_j = init_grad_j(x, idx, coordinate_grad, kwargs)
+
             for j in range(p):  
-                h0 = 6.055454452393343e-06*x[j]        
-                grad_x = (f_j(h0, x, j) - f_j(-h0, x, j))/(2*h0)        
+                grad_x = calc_grad_j(f_j, x, j, idx, loss_and_grad, kwargs, 
+                                     grad_j)
                 x[j] = x[j] - grad_x*learning_rate/decay_rate
                 
             diff += np.asarray(x) 
@@ -506,7 +546,7 @@ def scd(loss_func, double[:] response, double[:] x, int num_iters=200,
                 print(np.flip(losses)[0])
 
                     
-    return np.asarray(x), num_iters, losses
+    return np.asarray(x), num_iters, losses, np.asarray(velocity)
 
 
 # Gradient descent (Stochastic) -----  
@@ -514,15 +554,16 @@ def scd(loss_func, double[:] response, double[:] x, int num_iters=200,
 def sgd(loss_func, double[:] response, double[:] x, int num_iters=200, 
         double batch_prop=1.0, double learning_rate=0.01, double mass=0.9, 
         double decay=0.1, method="momentum", randomization="strat", 
-        double tolerance=1e-3, verbose=1, 
-        **kwargs):
+        double tolerance=1e-3, verbose=1, velocity0=None, 
+        loss_and_grad=None, **kwargs):
     """Stochastic gradient descent with momentum and adaptive learning rates."""
     
     cdef int i = 0 
     cdef long int j = 0
     cdef long int n = len(response)
     cdef long int p = len(x)
-    cdef double[:] velocity = np.zeros(p)
+    # initial velocity (for warm starts)
+    cdef double[:] velocity = np.zeros(p) if velocity0 is None else np.array(velocity0, dtype=np.double)
     cdef double[:] grad_i = np.zeros(p)
     cdef double decay_rate, learning_rate_
     cdef list losses = []
@@ -546,7 +587,7 @@ def sgd(loss_func, double[:] response, double[:] x, int num_iters=200,
                 return loss_func(x, row_index=idx, **kwargs)
             
             #grad_i = numerical_gradient(objective, x)                        
-            grad_i = calc_grad(objective, x)    
+            grad_i = calc_grad_i(objective, x, idx, loss_and_grad, kwargs)
             
             diff = -np.asarray(x)
 
@@ -593,7 +634,7 @@ def sgd(loss_func, double[:] response, double[:] x, int num_iters=200,
                 return loss_func(x, row_index=idx, **kwargs)
             
             #grad_i = numerical_gradient(objective, x)
-            grad_i = calc_grad(objective, x)            
+            grad_i = calc_grad_i(objective, x, idx, loss_and_grad, kwargs)
                         
             decay_rate = (1 + decay*i) if method is "poly" else exp(decay*i)
             
@@ -629,4 +670,4 @@ def sgd(loss_func, double[:] response, double[:] x, int num_iters=200,
                 print(f"iter {i+1} - loss -----")
                 print(np.flip(losses)[0])
     
-    return np.asarray(x), num_iters, losses
+    return np.asarray(x), num_iters, losses, np.asarray(velocity)
@@ -5,7 +5,13 @@
 # License: BSD 3 Clear
 
 
+import numpy as np
+import platform
+from numpy import linalg as la
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve, pinv, solve_triangular
 from ..base import Base
+from ..utils import matrixops as mo
 
 
 class Ridge2(Base):
@@ -47,8 +53,8 @@ class Ridge2(Base):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -73,6 +79,13 @@ class Ridge2(Base):
         backend: str
             "cpu" or "gpu" or "tpu"                
 
+        solver: str
+            linear solver for the penalized system: 'cholesky' (block 
+            Cholesky factorization of the primal system, or of the dual 
+            n x n system when there are more coefficients than samples; 
+            default) or 'pinv' (pseudo-inverses, always used on 'gpu' and 
+            'tpu' backends)
+
     """
 
     # construct the object -----
@@ -95,7 +108,8 @@ class Ridge2(Base):
         lambda1=0.1,
         lambda2=0.1,
         seed=123,
-        backend="cpu"
+        backend="cpu",
+        solver="cholesky",
     ):
 
         super().__init__(
@@ -116,5 +130,277 @@ class Ridge2(Base):
             backend=backend
         )
 
+        assert solver in (
+            "cholesky",
+            "pinv",
+        ), "'solver' must be in ('cholesky', 'pinv')"
+
         self.lambda1 = lambda1
         self.lambda2 = lambda2
+        self.solver = solver
+
+    def n_direct_link_features(self, p_X):
+        """Number of columns of the design matrix penalized by lambda1, for 
+        p_X input features (see self.split_design)."""
+
+        if self.n_clusters > 0:
+            if self.encode_clusters == True:
+                return p_X + self.n_clusters
+            return p_X + 1
+        return p_X
+
+    def split_design(self, X, scaled_Z):
+        """Split the cooked design matrix into the direct link's and the 
+        hidden layer's columns, penalized by lambda1 and lambda2 respectively.
+
+        Args:
+
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors
+
+            scaled_Z: {array-like}, shape = [n_samples, n_features_cooked]
+                Design matrix returned by self.cook_training_set
+
+        Returns:
+
+            a tuple: (direct link columns, hidden layer columns); the hidden 
+            layer is dense even for sparse inputs
+
+        """
+
+        n_features = self.n_direct_link_features(X.shape[1])
+
+        X_ = scaled_Z[:, 0:n_features]
+        Phi_X_ = scaled_Z[:, n_features:]
+        if sparse.issparse(Phi_X_):  # sparse inputs, the hidden layer is dense
+            Phi_X_ = Phi_X_.toarray()
+
+        return X_, Phi_X_
+
+    def solve(self, X_, Phi_X_, Y):
+        """Coefficients of the regression of Y on (X_, Phi_X_), with penalties 
+        lambda1 on X_'s coefficients and lambda2 on Phi_X_'s.
+
+        With solver='cholesky', the block system 
+        [[B, t(C)], [C, D]] = [[t(X_)%*%X_ + lambda1*I, t(X_)%*%Phi_X_], 
+        [t(Phi_X_)%*%X_, t(Phi_X_)%*%Phi_X_ + lambda2*I]] is factorized as 
+        [[L_B, 0], [t(V), L_S]] (L_B%*%V = t(C), and L_S the Cholesky factor 
+        of the Schur complement D - t(V)%*%V) and solved by triangular solves, 
+        against all the columns of Y at once. The inverse is never formed. 
+        When there are more coefficients than samples, the dual (n x n) 
+        system is solved instead (see self.solve_dual).
+
+        Args:
+
+            X_: {array-like}, shape = [n_samples, n_features]
+                direct link's columns of the design matrix
+
+            Phi_X_: {array-like}, shape = [n_samples, n_hidden]
+                hidden layer's columns of the design matrix
+
+            Y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                response(s)
+
+        Returns:
+
+            coefficients, shape = [n_features + n_hidden] or 
+            [n_features + n_hidden, n_targets]
+
+        """
+
+        if (
+            (self.solver == "cholesky")
+            and (self.backend == "cpu")
+            and (X_.shape[0] < X_.shape[1] + Phi_X_.shape[1])
+            and (self.lambda1 > 0)
+            and (self.lambda2 > 0)
+        ):  # more coefficients than samples: n x n system
+            beta = self.solve_dual(X_, Phi_X_, Y)
+            if beta is not None:
+                return beta
+
+        B = mo.crossprod(x=X_, backend=self.backend) + self.lambda1 * np.diag(
+            np.repeat(1, X_.shape[1])
+        )
+        C = mo.crossprod(x=Phi_X_, y=X_, backend=self.backend)
+        D = mo.crossprod(
+            x=Phi_X_, backend=self.backend
+        ) + self.lambda2 * np.diag(np.repeat(1, Phi_X_.shape[1]))
+        Y_X = mo.crossprod(x=X_, y=Y, backend=self.backend)
+        Y_Phi = mo.crossprod(x=Phi_X_, y=Y, backend=self.backend)
+
+        if (self.solver == "cholesky") and (self.backend == "cpu"):
+
+            beta = self.solve_cholesky(B, C, D, Y_X, Y_Phi)
+
+            if beta is not None:
+                return beta
+
+            # D was overwritten
+            D = mo.crossprod(
+                x=Phi_X_, backend=self.backend
+            ) + self.lambda2 * np.diag(np.repeat(1, Phi_X_.shape[1]))
+
+        return self.solve_pinv(B, C, D, Y_X, Y_Phi)
+
+    def solve_gram(self, cov, cov_response, n_features):
+        """Coefficients of self.solve, from the cross-products of the design 
+        matrix Z = (X_, Phi_X_) and of the response (e.g accumulated over 
+        chunks of data, see self.partial_fit).
+
+        Args:
+
+            cov: array-like, shape = [n_coefs, n_coefs]
+                t(Z)%*%Z
+
+            cov_response: array-like, shape = [n_coefs] or [n_coefs, n_targets]
+                t(Z)%*%Y
+
+            n_features: int
+                number of direct link's columns in Z (see self.split_design)
+
+        Returns:
+
+            coefficients, shape = [n_coefs] or [n_coefs, n_targets]
+
+        """
+
+        def blocks():
+            B = cov[:n_features, :n_features] + self.lambda1 * np.eye(n_features)
+            D = cov[n_features:, n_features:] + self.lambda2 * np.eye(
+                cov.shape[0] - n_features
+            )
+            return B, D
+
+        C = cov[n_features:, :n_features]
+        Y_X = cov_response[:n_features]
+        Y_Phi = cov_response[n_features:]
+
+        if (self.solver == "cholesky") and (self.backend == "cpu"):
+
+            B, D = blocks()
+            beta = self.solve_cholesky(B, C, D, Y_X, Y_Phi)
+
+            if beta is not None:
+                return beta
+
+        B, D = blocks()  # D was overwritten
+
+        return self.solve_pinv(B, C, D, Y_X, Y_Phi)
+
+    def solve_cholesky(self, B, C, D, Y_X, Y_Phi):
+        """Block Cholesky solve of the penalized system of self.solve, from its 
+        blocks (B and D include the penalties; D is overwritten). Returns None 
+        if the system is not numerically positive definite."""
+
+        try:
+            L_B = cho_factor(B, lower=True, check_finite=False)[0]
+            V = solve_triangular(L_B, C.T, lower=True, check_finite=False)
+            D -= np.dot(V.T, V)  # Schur complement
+            L_S = cho_factor(
+                D, lower=True, overwrite_a=True, check_finite=False
+            )[0]
+        except la.LinAlgError:  # not numerically positive definite
+            return None
+
+        # forward substitution
+        z_X = solve_triangular(L_B, Y_X, lower=True, check_finite=False)
+        z_Phi = solve_triangular(
+            L_S, Y_Phi - np.dot(V.T, z_X), lower=True, check_finite=False
+        )
+        # backward substitution
+        beta_Phi = solve_triangular(
+            L_S, z_Phi, lower=True, trans="T", check_finite=False
+        )
+        beta_X = solve_triangular(
+            L_B,
+            z_X - np.dot(V, beta_Phi),
+            lower=True,
+            trans="T",
+            check_finite=False,
+        )
+        return np.concatenate((beta_X, beta_Phi))
+
+    def solve_pinv(self, B, C, D, Y_X, Y_Phi):
+        """Solve of the penalized system of self.solve, from its blocks (B and 
+        D include the penalties), with pseudo-inverses of B and of the Schur 
+        complement."""
+
+        sys_platform = platform.system()
+
+        if (sys_platform in ('Linux', 'Darwin')) and (self.backend != "cpu"):
+          from jax.numpy.linalg import pinv as jpinv
+
+        if sys_platform in ('Linux', 'Darwin'):  
+          B_inv = pinv(B) if self.backend == "cpu" else jpinv(B)
+        else:
+          B_inv = pinv(B)
+
+        W = mo.safe_sparse_dot(a=C, b=B_inv, backend=self.backend)
+        S_mat = D - mo.tcrossprod(x=W, y=C, backend=self.backend)
+
+        if sys_platform in ('Linux', 'Darwin'):
+          S_inv = pinv(S_mat) if self.backend == "cpu" else jpinv(S_mat)
+        else:
+          S_inv = pinv(S_mat) 
+
+        Y2 = mo.safe_sparse_dot(a=S_inv, b=W, backend=self.backend)
+        inv = mo.rbind(
+            mo.cbind(
+                x=B_inv + mo.crossprod(x=W, y=Y2, backend=self.backend),
+                y=-np.transpose(Y2),
+                backend=self.backend,
+            ),
+            mo.cbind(x=-Y2, y=S_inv, backend=self.backend),
+            backend=self.backend,
+        )
+
+        return mo.safe_sparse_dot(
+            a=inv,
+            b=np.concatenate((Y_X, Y_Phi)),
+            backend=self.backend,
+        )
+
+    def solve_dual(self, X_, Phi_X_, Y):
+        """Coefficients of self.solve, from the dual (n x n) system: with 
+        Z = (X_, Phi_X_) and Lambda = diag(lambda1*I, lambda2*I), 
+        beta = Lambda^{-1}%*%t(Z)%*%alpha, where alpha solves 
+        (X_%*%t(X_)/lambda1 + Phi_X_%*%t(Phi_X_)/lambda2 + I)%*%alpha = Y. 
+        In O(n^2(p+q)) instead of O((p+q)^3), for wide hidden layers.
+
+        Args:
+
+            X_: {array-like}, shape = [n_samples, n_features]
+                direct link's columns of the design matrix
+
+            Phi_X_: {array-like}, shape = [n_samples, n_hidden]
+                hidden layer's columns of the design matrix
+
+            Y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                response(s)
+
+        Returns:
+
+            coefficients, shape = [n_features + n_hidden] or 
+            [n_features + n_hidden, n_targets] (None if the weighted kernel 
+            matrix is not numerically positive definite)
+
+        """
+
+        K = mo.tcrossprod(x=X_).astype(np.float64) / self.lambda1
+        K += mo.tcrossprod(x=Phi_X_) / self.lambda2
+        K[np.diag_indices_from(K)] += 1
+
+        try:
+            c = cho_factor(K, lower=True, overwrite_a=True, check_finite=False)
+        except la.LinAlgError:
+            return None
+
+        alpha = cho_solve(c, np.asarray(Y, dtype=np.float64), check_finite=False)
+
+        return np.concatenate(
+            (
+                mo.crossprod(x=X_, y=alpha) / self.lambda1,
+                mo.crossprod(x=Phi_X_, y=alpha) / self.lambda2,
+            )
+        )
@@ -6,6 +6,8 @@ import numpy as np
 import platform
 import sys
 import sklearn.metrics as skm2
+from scipy import sparse
+from scipy.linalg import block_diag
 from scipy.optimize import minimize
 from .ridge2 import Ridge2
 from ..utils import matrixops as mo
@@ -53,8 +55,8 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
             
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -79,6 +81,10 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
         backend: str
             "cpu" or "gpu" or "tpu"                
 
+        warm_start: bool
+            if True, `fit` starts from the previous solution (self.beta) when 
+            the number of coefficients is unchanged, instead of zeros
+
 
     References:
     
@@ -110,7 +116,8 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
         lambda1=0.1,
         lambda2=0.1,
         seed=123,
-        backend="cpu"
+        backend="cpu",
+        warm_start=False,
     ):
 
         super().__init__(
@@ -135,6 +142,7 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
 
 
         self.type_fit = "classification"
+        self.warm_start = warm_start
 
     def loglik(self, X, Y, **kwargs):
         """Log-likelihood for training data (X, Y).
@@ -165,10 +173,8 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
             # initial number of covariates
             init_p = p - self.n_hidden_features
 
-            max_double = 709.0
-            XB[XB > max_double] = max_double
-            exp_XB = np.exp(XB)
-            probs = exp_XB / exp_XB.sum(axis=1)[:, None]
+            # softmax, from the row-wise log-sum-exp
+            probs = np.exp(XB - logsumexp(XB, axis=1)[:, None])
 
             # gradient -----
             # (Y - p) -> (n, K)
@@ -181,32 +187,65 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
                     )
                     / n
                 )
-                grad += self.lambda1 * B[0:init_p, :].sum(axis=0)[:, None]
-                grad += self.lambda2 * B[init_p:p, :].sum(axis=0)[:, None]
+                grad[:, 0:init_p] += self.lambda1 * B[0:init_p, :].T
+                grad[:, init_p:p] += self.lambda2 * B[init_p:p, :].T
 
                 return grad.flatten()
 
             # hessian -----
-            if hessian is True:
-                Kp = K * p
-                hess = np.zeros((Kp, Kp), float)
-                for k1 in range(K):
-                    x_index = range(k1 * p, (k1 + 1) * p)
-                    for k2 in range(k1, K):
-                        y_index = range(k2 * p, (k2 + 1) * p)
-                        H_sub = (
-                            -mo.safe_sparse_dot(
-                                a=X.T,
-                                b=(probs[:, k1] * probs[:, k2])[:, None] * X,
-                                backend=self.backend,
-                            )
-                            / n
-                        )  # do not store
-                        hess[np.ix_(x_index, y_index)] = hess[
-                            np.ix_(y_index, x_index)
-                        ] = H_sub
-
-                return hess + (self.lambda1 + self.lambda2) * np.identity(Kp)
+            # the (k1, k2) block of the hessian is 
+            # t(X)%*%diag(probs[:, k1]*(k1 == k2) - probs[:, k1]*probs[:, k2])%*%X/n: 
+            # all the blocks at once from t(A)%*%A, with 
+            # A[:, k*p + j] = probs[:, k]*X[:, j], and the diagonal blocks' 
+            # first term from t(X)%*%A[:, k*p:(k+1)*p]
+            if sparse.issparse(X):
+                A = sparse.hstack(
+                    [X.multiply(probs[:, [k]]) for k in range(K)], format="csr"
+                )
+            else:
+                A = (probs[:, :, None] * X[:, None, :]).reshape(n, K * p)
+
+            hess = (
+                block_diag(
+                    *[
+                        mo.crossprod(
+                            x=X, y=A[:, k * p : (k + 1) * p], backend=self.backend
+                        )
+                        for k in range(K)
+                    ]
+                )
+                - mo.crossprod(x=A, backend=self.backend)
+            ) / n
+
+            return hess + np.diag(penalty)
+
+        def hessian_vector_product(Y, X, B, XB, v, **kwargs):
+            # hessian of loglik_grad_hess times v, in O(n*K*p) (the hessian 
+            # is not formed): t(X)%*%(probs*(XV - rowsum(probs*XV)))/n
+            n, K = Y.shape
+
+            p = X.shape[1]
+
+            probs = np.exp(XB - logsumexp(XB, axis=1)[:, None])
+
+            # (n, K)
+            XV = mo.safe_sparse_dot(
+                X, v.reshape(K, p).T.astype(X.dtype, copy=False),
+                backend=self.backend,
+            )
+            # (n,)
+            probs_XV = (probs * XV).sum(axis=1)
+
+            res = (
+                mo.safe_sparse_dot(
+                    a=(probs * (XV - probs_XV[:, None])).T,
+                    b=X,
+                    backend=self.backend,
+                )
+                / n
+            )
+
+            return res.flatten() + penalty * v
 
         # total number of covariates
         p = X.shape[1]
@@ -214,15 +253,27 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
         # initial number of covariates
         init_p = p - self.n_hidden_features
 
+        # hessian of the penalty: lambda1 on the direct link's coefficients, 
+        # lambda2 on the hidden layer's, for each class
+        penalty = np.tile(
+            np.concatenate(
+                (
+                    np.repeat(self.lambda1, init_p),
+                    np.repeat(self.lambda2, p - init_p),
+                )
+            ),
+            Y.shape[1],
+        )
+
         # log-likelihood (1st return)
         def loglik_func(x):
             # (p, K)
-            B = x.reshape(Y.shape[1], p).T
+            B = x.reshape(Y.shape[1], p).T.astype(X.dtype, copy=False)
 
             # (n, K)
             XB = mo.safe_sparse_dot(X, B, backend=self.backend)
 
-            res = -(np.sum(Y * XB, axis=1) - logsumexp(XB)).mean()
+            res = -(np.sum(Y * XB, axis=1) - logsumexp(XB, axis=1)).mean()
 
             res += 0.5 * self.lambda1 * mo.squared_norm(B[0:init_p, :], backend=self.backend)
             res += 0.5 * self.lambda2 * mo.squared_norm(B[init_p:p, :], backend=self.backend)
@@ -232,7 +283,7 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
         # gradient of log-likelihood
         def grad_func(x):
             # (p, K)
-            B = x.reshape(Y.shape[1], p).T
+            B = x.reshape(Y.shape[1], p).T.astype(X.dtype, copy=False)
 
             return loglik_grad_hess(
                 Y=Y,
@@ -243,10 +294,21 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
                 **kwargs
             )
 
-        # hessian of log-likelihood
-        def hessian_func(x):
+        # hessian of log-likelihood (or hessian-vector product, if v is 
+        # provided: scipy's `hessp`)
+        def hessian_func(x, v=None):
             # (p, K)
-            B = x.reshape(Y.shape[1], p).T
+            B = x.reshape(Y.shape[1], p).T.astype(X.dtype, copy=False)
+
+            if v is not None:
+                return hessian_vector_product(
+                    Y=Y,
+                    X=X,
+                    B=B,
+                    XB=mo.safe_sparse_dot(X, B, backend=self.backend),
+                    v=v,
+                    **kwargs
+                )
 
             return loglik_grad_hess(
                 Y=Y,
@@ -259,6 +321,88 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
 
         return loglik_func, grad_func, hessian_func
 
+    def loglik_and_grad(self, X, Y, **kwargs):
+        """Log-likelihood and its gradient for training data (X, Y), fused in 
+        one evaluation (scipy.optimize.minimize's `jac=True`): X%*%B and the 
+        softmax are computed once per evaluation, in preallocated buffers. 
+        Same values as the first two functions returned by self.loglik.
+        
+        Args:
+        
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors, where n_samples is the number 
+                of samples and n_features is the number of features.
+            
+            Y: array-like, shape = [n_samples]
+                One-hot encode target values.
+        
+            **kwargs: additional parameters to be passed to 
+                    self.cook_training_set or self.obj.fit
+               
+        Returns: 
+
+            function of the coefficients, returning (log-likelihood, gradient)
+        
+        """
+
+        # nobs, n_classes
+        n, K = Y.shape
+
+        # total number of covariates
+        p = X.shape[1]
+
+        # initial number of covariates
+        init_p = p - self.n_hidden_features
+
+        # in-place X%*%B
+        out_dot = (self.backend == "cpu") and (not sparse.issparse(X))
+
+        # buffers, shared by all the evaluations
+        XB = np.empty((n, K), dtype=X.dtype)
+        probs = np.empty((n, K), dtype=X.dtype)
+        XB_max = np.empty(n, dtype=X.dtype)
+        sum_exp = np.empty(n, dtype=X.dtype)
+
+        def loglik_grad_func(x):
+            # (p, K)
+            B = x.reshape(K, p).T.astype(X.dtype, copy=False)
+
+            # (n, K)
+            if out_dot:
+                np.dot(X, B, out=XB)
+            else:
+                XB[:] = mo.safe_sparse_dot(X, B, backend=self.backend)
+
+            # row-wise log-sum-exp, shifted by the row max; its exponentials 
+            # are the softmax's numerators
+            XB.max(axis=1, out=XB_max)
+            np.subtract(XB, XB_max[:, None], out=probs)
+            np.exp(probs, out=probs)
+            probs.sum(axis=1, out=sum_exp)
+            lse = XB_max + np.log(sum_exp)
+
+            # log-likelihood
+            res = -(np.sum(Y * XB, axis=1) - lse).mean()
+
+            res += 0.5 * self.lambda1 * mo.squared_norm(B[0:init_p, :], backend=self.backend)
+            res += 0.5 * self.lambda2 * mo.squared_norm(B[init_p:p, :], backend=self.backend)
+
+            # gradient -----
+            # softmax
+            np.divide(probs, sum_exp[:, None], out=probs)
+
+            # (p - Y) -> (n, K)
+            # (K, n) %*% (n, p) -> (K, p)
+            np.subtract(probs, Y, out=probs)
+            grad = mo.safe_sparse_dot(a=probs.T, b=X, backend=self.backend) / n
+            grad[:, 0:init_p] += self.lambda1 * B[0:init_p, :].T
+            grad[:, init_p:p] += self.lambda2 * B[init_p:p, :].T
+
+            # scipy's optimizers expect double precision (e.g L-BFGS-B)
+            return float(res), grad.astype(np.float64, copy=False).ravel()
+
+        return loglik_grad_func
+
     # newton-cg
     # L-BFGS-B
     def fit(self, X, y, solver="L-BFGS-B", **kwargs):
@@ -275,6 +419,11 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
             
             y: array-like, shape = [n_samples]
                 Target values.
+
+            solver: str
+                scipy.optimize.minimize's method: 'L-BFGS-B', or using the 
+                hessian, 'Newton-CG', 'trust-ncg', 'trust-krylov' 
+                (hessian-vector products) or 'trust-exact' (dense hessian)
         
             **kwargs: additional parameters to be passed to 
                     self.cook_training_set or self.obj.fit
@@ -294,24 +443,50 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
         Y = mo.one_hot_encode2(output_y, self.n_classes)
 
         # optimize for beta, minimize self.loglik (maximize loglik) -----
-        loglik_func, grad_func, hessian_func = self.loglik(X=scaled_Z, Y=Y)
+        loglik_grad_func = self.loglik_and_grad(X=scaled_Z, Y=Y)
+
+        n_coefs = scaled_Z.shape[1] * self.n_classes
+
+        if (
+            (self.warm_start == True)
+            and (self.beta is not None)
+            and (np.shape(self.beta) == (n_coefs,))
+        ):  # previous solution
+            x0 = np.asarray(self.beta, dtype=np.float64)
+        else:
+            x0 = np.zeros(n_coefs)
 
         if solver == "L-BFGS-B":
             self.beta = minimize(
-                fun=loglik_func,
-                x0=np.zeros(scaled_Z.shape[1] * self.n_classes),
-                jac=grad_func,
+                fun=loglik_grad_func,
+                x0=x0,
+                jac=True,
+                method=solver,
+            ).x.astype(scaled_Z.dtype, copy=False)
+
+            return self
+
+        hessian_func = self.loglik(X=scaled_Z, Y=Y)[2]
+
+        # hessian-vector products only
+        if solver in ("Newton-CG", "trust-ncg", "trust-krylov"):
+            self.beta = minimize(
+                fun=loglik_grad_func,
+                x0=x0,
+                jac=True,
+                hessp=hessian_func,
                 method=solver,
-            ).x
+            ).x.astype(scaled_Z.dtype, copy=False)
 
-        if solver in ("Newton-CG", "trust-ncg"):
+        # dense hessian
+        if solver == "trust-exact":
             self.beta = minimize(
-                fun=loglik_func,
-                x0=np.zeros(scaled_Z.shape[1] * self.n_classes),
-                jac=grad_func,
+                fun=loglik_grad_func,
+                x0=x0,
+                jac=True,
                 hess=hessian_func,
                 method=solver,
-            ).x
+            ).x.astype(scaled_Z.dtype, copy=False)
 
         return self
 
@@ -351,6 +526,21 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
             probability estimates for test data: {array-like}    
                 
         """
+
+        def calc_probs(Z):
+
+            ZB = mo.safe_sparse_dot(
+                a=Z,
+                b=self.beta.reshape(
+                    self.n_classes,
+                    X.shape[1] + self.n_hidden_features + self.n_clusters).T,        
+                backend=self.backend)
+        
+            # shifted by the row max: exp would overflow early in float32
+            exp_ZB = np.exp(ZB - ZB.max(axis=1)[:, None])
+
+            return exp_ZB / exp_ZB.sum(axis=1)[:, None]
+
         if len(X.shape) == 1:
 
             n_features = X.shape[0]
@@ -359,22 +549,9 @@ class Ridge2Classifier(Ridge2, ClassifierMixin):
                 np.ones(n_features).reshape(1, n_features),
             )
 
-            Z = self.cook_test_set(new_X, **kwargs)
-
-        else:
-
-            Z = self.cook_test_set(X, **kwargs)
-
-        ZB = mo.safe_sparse_dot(
-            a=Z,
-            b=self.beta.reshape(
-                self.n_classes,
-                X.shape[1] + self.n_hidden_features + self.n_clusters).T,        
-            backend=self.backend)
-        
-        exp_ZB = np.exp(ZB)
+            return calc_probs(self.cook_test_set(new_X, **kwargs))
 
-        return exp_ZB / exp_ZB.sum(axis=1)[:, None]
+        return self.predict_in_chunks(X, calc_probs, **kwargs)
 
     def score(self, X, y, scoring=None, **kwargs):
         """ Score the model on test set features X and response y. 
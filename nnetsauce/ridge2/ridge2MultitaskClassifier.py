@@ -3,17 +3,14 @@
 # License: BSD 3 Clear
 
 import numpy as np
-import platform
 from scipy.optimize import minimize
 import sklearn.metrics as skm2
 from .ridge2 import Ridge2
+from .._config import get_config
 from ..utils import matrixops as mo
 from ..utils import misc as mx
 from sklearn.base import ClassifierMixin
 from scipy.special import logsumexp
-from scipy.linalg import pinv
-if platform.system() in ('Linux', 'Darwin'):
-  from jax.numpy.linalg import pinv as jpinv
 
 
 class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
@@ -51,8 +48,8 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -71,6 +68,13 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
         backend: str
             "cpu" or "gpu" or "tpu"                
 
+        solver: str
+            linear solver for the penalized system: 'cholesky' (block 
+            Cholesky factorization of the primal system, or of the dual 
+            n x n system when there are more coefficients than samples; 
+            default) or 'pinv' (pseudo-inverses, always used on 'gpu' and 
+            'tpu' backends)
+
     References:  
 
         - [1] Moudiki, T. (2020). Quasi-randomized networks for regression and classification, with two shrinkage parameters. Available at: 
@@ -95,7 +99,8 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
         lambda1=0.1,
         lambda2=0.1,
         seed=123,
-        backend="cpu" 
+        backend="cpu",
+        solver="cholesky",
     ):
 
         super().__init__(
@@ -114,7 +119,8 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
             lambda1=lambda1,
             lambda2=lambda2,
             seed=seed,
-            backend=backend
+            backend=backend,
+            solver=solver,
         )
 
         self.type_fit = "regression"
@@ -140,8 +146,6 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
 
         """
 
-        sys_platform = platform.system()
-
         assert mx.is_factor(y), "y must contain only integers"        
 
         output_y, scaled_Z = self.cook_training_set(y=y, X=X, **kwargs)
@@ -154,54 +158,89 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
         # multitask response
         Y = mo.one_hot_encode2(output_y, self.n_classes)
 
-        if self.n_clusters > 0:
-            if self.encode_clusters == True:
-                n_features = p_X + self.n_clusters
+        X_, Phi_X_ = self.split_design(X, scaled_Z)
+
+        self.beta = self.solve(X_, Phi_X_, Y)
+
+        if self.backend == "cpu":  # solved in double precision
+            self.beta = self.beta.astype(scaled_Z.dtype, copy=False)
+
+        return self
+
+    def partial_fit(self, X, y, classes=None, **kwargs):
+        """Update Ridge model with a chunk of training data (X, y), for 
+        out-of-core fitting: only the cross-products of the design matrix 
+        are kept in memory. Call self.finalize once all the chunks are passed.
+
+        The preprocessing (clustering, scaling of the inputs, hidden layer) is 
+        fitted on the first chunk, then frozen (see 
+        self.partial_cook_training_set).
+
+        Args:
+
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors, where n_samples is the number 
+                of samples and n_features is the number of features.
+
+            y: array-like, shape = [n_samples]
+                Target values.
+
+            classes: array-like, shape = [n_classes]
+                all the classes of the response (required on the first 
+                chunk if it does not contain all of them)
+
+            **kwargs: additional parameters to be passed to 
+                    self.partial_cook_training_set
+
+        Returns: 
+
+            self: object
+
+        """
+
+        assert mx.is_factor(y), "y must contain only integers"
+
+        if self.sufficient_stats is None:
+            if classes is None:
+                self.n_classes = len(np.unique(y))
+                if np.max(y) >= self.n_classes:  # classes are 0, 1, ...
+                    raise ValueError(
+                        "the first chunk does not contain all the classes: "
+                        "`classes` must be provided on the first call"
+                    )
             else:
-                n_features = p_X + 1
-        else:
-            n_features = p_X
+                self.n_classes = len(classes)
 
-        X_ = scaled_Z[:, 0:n_features]
-        Phi_X_ = scaled_Z[:, n_features:p_Z]
+        elif np.max(y) >= self.n_classes:
+            raise ValueError(
+                "y contains classes absent from the first chunk: `classes` "
+                "must be provided on the first call to partial_fit"
+            )
 
-        B = mo.crossprod(x=X_, backend=self.backend) + self.lambda1 * np.diag(
-            np.repeat(1, X_.shape[1])
-        )
-        C = mo.crossprod(x=Phi_X_, y=X_, backend=self.backend)
-        D = mo.crossprod(
-            x=Phi_X_, backend=self.backend
-        ) + self.lambda2 * np.diag(np.repeat(1, Phi_X_.shape[1]))
-
-        if sys_platform in ('Linux', 'Darwin'):  
-          B_inv = pinv(B) if self.backend == "cpu" else jpinv(B)
-        else:
-          B_inv = pinv(B)
-
-        W = mo.safe_sparse_dot(a=C, b=B_inv, backend=self.backend)
-        S_mat = D - mo.tcrossprod(x=W, y=C, backend=self.backend)
-
-        if sys_platform in ('Linux', 'Darwin'):
-          S_inv = pinv(S_mat) if self.backend == "cpu" else jpinv(S_mat)
-        else:
-          S_inv = pinv(S_mat) 
-
-        Y2 = mo.safe_sparse_dot(a=S_inv, b=W, backend=self.backend)
-        inv = mo.rbind(
-            mo.cbind(
-                x=B_inv + mo.crossprod(x=W, y=Y2, backend=self.backend),
-                y=-np.transpose(Y2),
-                backend=self.backend,
-            ),
-            mo.cbind(x=-Y2, y=S_inv, backend=self.backend),
-            backend=self.backend,
-        )
+        # multitask response
+        Y = mo.one_hot_encode2(y, self.n_classes)
 
-        self.beta = mo.safe_sparse_dot(
-            a=inv,
-            b=mo.crossprod(x=scaled_Z, y=Y, backend=self.backend),
-            backend=self.backend,
-        )
+        self.partial_cook_training_set(y=y, X=X, Y=Y, **kwargs)
+
+        return self
+
+    def finalize(self):
+        """Fit Ridge model on the chunks of training data passed to 
+        self.partial_fit.
+
+        Returns: 
+
+            self: object
+
+        """
+
+        _, cov_Z, cov_Z_Y, _ = self.scaled_gram(center_response=False)
+
+        self.beta = self.solve_gram(
+            cov_Z,
+            cov_Z_Y,
+            self.n_direct_link_features(self.sufficient_stats["n_inputs"]),
+        ).astype(get_config()["dtype"], copy=False)
 
         return self
 
@@ -243,6 +282,16 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
 
         """
 
+
+        def calc_probs(Z):
+
+            ZB = mo.safe_sparse_dot(a=Z, b=self.beta, backend=self.backend)
+
+            # shifted by the row max: exp would overflow early in float32
+            exp_ZB = np.exp(ZB - ZB.max(axis=1)[:, None])
+
+            return exp_ZB / exp_ZB.sum(axis=1)[:, None]
+
         if len(X.shape) == 1:
 
             n_features = X.shape[0]
@@ -252,17 +301,9 @@ class Ridge2MultitaskClassifier(Ridge2, ClassifierMixin):
                 backend=self.backend,
             )
 
-            Z = self.cook_test_set(new_X, **kwargs)
-
-        else:
-
-            Z = self.cook_test_set(X, **kwargs)
-
-        ZB = mo.safe_sparse_dot(a=Z, b=self.beta, backend=self.backend)
-
-        exp_ZB = np.exp(ZB)
+            return calc_probs(self.cook_test_set(new_X, **kwargs))
 
-        return exp_ZB / exp_ZB.sum(axis=1)[:, None]
+        return self.predict_in_chunks(X, calc_probs, **kwargs)
 
     def score(self, X, y, scoring=None, **kwargs):
         """ Score the model on test set covariates X and response y. """
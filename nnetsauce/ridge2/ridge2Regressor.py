@@ -3,17 +3,14 @@
 # License: BSD 3 Clear
 
 import numpy as np
-import platform
 from scipy.optimize import minimize
 import sklearn.metrics as skm
 from .ridge2 import Ridge2
+from .._config import get_config
 from ..utils import matrixops as mo
 from ..utils import misc as mx
 from sklearn.base import RegressorMixin
 from scipy.special import logsumexp
-from scipy.linalg import pinv
-if platform.system() in ('Linux', 'Darwin'):
-  from jax.numpy.linalg import pinv as jpinv
 
 
 class Ridge2Regressor(Ridge2, RegressorMixin):
@@ -51,8 +48,8 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian 
-            Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means
+            ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -77,6 +74,13 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
         backend: str
             'cpu' or 'gpu' or 'tpu'                
 
+        solver: str
+            linear solver for the penalized system: 'cholesky' (block 
+            Cholesky factorization of the primal system, or of the dual 
+            n x n system when there are more coefficients than samples; 
+            default) or 'pinv' (pseudo-inverses, always used on 'gpu' and 
+            'tpu' backends)
+
     References: 
 
         - [1] Moudiki, T. (2020). Quasi-randomized networks for regression and classification, with two shrinkage parameters. Available at: 
@@ -104,7 +108,8 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
         lambda1=0.1,
         lambda2=0.1,
         seed=123,
-        backend="cpu" 
+        backend="cpu",
+        solver="cholesky",
     ):
 
         super().__init__(
@@ -123,7 +128,8 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
             lambda1=lambda1,
             lambda2=lambda2,
             seed=seed,
-            backend=backend 
+            backend=backend,
+            solver=solver,
         )
 
         self.type_fit = "regression"
@@ -137,8 +143,9 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
                 Training vectors, where n_samples is the number 
                 of samples and n_features is the number of features.
             
-            y: array-like, shape = [n_samples]
-                Target values.
+            y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                Target values (several targets share the features and the
+                factorization).
         
             **kwargs: additional parameters to be passed to 
                     self.cook_training_set or self.obj.fit
@@ -149,64 +156,203 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
 
         """
         
-        sys_platform = platform.system()
-
         centered_y, scaled_Z = self.cook_training_set(y=y, X=X, **kwargs)
 
-        n_X, p_X = X.shape
-        n_Z, p_Z = scaled_Z.shape
+        X_, Phi_X_ = self.split_design(X, scaled_Z)
 
-        if self.n_clusters > 0:
-            if self.encode_clusters == True:
-                n_features = p_X + self.n_clusters
-            else:
-                n_features = p_X + 1
-        else:
-            n_features = p_X
+        self.beta = self.solve(X_, Phi_X_, centered_y)
 
-        X_ = scaled_Z[:, 0:n_features]
-        Phi_X_ = scaled_Z[:, n_features:p_Z]
+        if self.backend == "cpu":  # solved in double precision
+            self.beta = self.beta.astype(scaled_Z.dtype, copy=False)
 
-        B = mo.crossprod(x=X_, backend=self.backend) + self.lambda1 * np.diag(
-            np.repeat(1, n_features)
-        )
-        C = mo.crossprod(x=Phi_X_, y=X_, backend=self.backend)
-        D = mo.crossprod(
-            x=Phi_X_, backend=self.backend
-        ) + self.lambda2 * np.diag(np.repeat(1, Phi_X_.shape[1]))
-
-        if sys_platform in ('Linux', 'Darwin'):  
-          B_inv = pinv(B) if self.backend == "cpu" else jpinv(B)
-        else:
-          B_inv = pinv(B)
-
-        W = mo.safe_sparse_dot(a=C, b=B_inv, backend=self.backend)
-        S_mat = D - mo.tcrossprod(x=W, y=C, backend=self.backend)
-
-        if sys_platform in ('Linux', 'Darwin'):
-          S_inv = pinv(S_mat) if self.backend == "cpu" else jpinv(S_mat)
-        else:
-          S_inv = pinv(S_mat) 
-
-        Y = mo.safe_sparse_dot(a=S_inv, b=W, backend=self.backend)
-        inv = mo.rbind(
-            mo.cbind(
-                x=B_inv + mo.crossprod(x=W, y=Y, backend=self.backend),
-                y=-np.transpose(Y),
-                backend=self.backend,
-            ),
-            mo.cbind(x=-Y, y=S_inv, backend=self.backend),
-            backend=self.backend,
-        )
+        return self
 
-        self.beta = mo.safe_sparse_dot(
-            a=inv,
-            b=mo.crossprod(x=scaled_Z, y=centered_y, backend=self.backend),
-            backend=self.backend,
-        )
+    def partial_fit(self, X, y, **kwargs):
+        """Update Ridge model with a chunk of training data (X, y), for 
+        out-of-core fitting: only the cross-products of the design matrix 
+        are kept in memory. Call self.finalize once all the chunks are passed.
+
+        The preprocessing (clustering, scaling of the inputs, hidden layer) is 
+        fitted on the first chunk, then frozen (see 
+        self.partial_cook_training_set).
+
+        Args:
+
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors, where n_samples is the number 
+                of samples and n_features is the number of features.
+
+            y: array-like, shape = [n_samples]
+                Target values.
+
+            **kwargs: additional parameters to be passed to 
+                    self.partial_cook_training_set
+
+        Returns: 
+
+            self: object
+
+        """
+
+        self.partial_cook_training_set(y=y, X=X, **kwargs)
+
+        return self
+
+    def finalize(self):
+        """Fit Ridge model on the chunks of training data passed to 
+        self.partial_fit.
+
+        Returns: 
+
+            self: object
+
+        """
+
+        _, cov_Z, cov_Z_y, _ = self.scaled_gram()
+
+        self.beta = self.solve_gram(
+            cov_Z,
+            cov_Z_y,
+            self.n_direct_link_features(self.sufficient_stats["n_inputs"]),
+        ).astype(get_config()["dtype"], copy=False)
 
         return self
 
+    def fit_path(self, X, y, lambda1s, lambda2s, **kwargs):
+        """Fit Ridge model to training data (X, y), on a grid of 
+        regularization parameters (lambda1, lambda2).
+
+        The features and the Gram matrices are computed once, and an 
+        eigendecomposition of the hidden layer's Schur complement is computed 
+        once per lambda1 and reused for all the lambda2s. The model is then 
+        set to the pair with the lowest Generalized Cross-Validation error 
+        (summed over the targets, for several targets), stored in `lambda1_` 
+        and `lambda2_` (beta is overwritten; lambda1 and lambda2 are left as 
+        is).
+
+        Args:
+
+            X: {array-like}, shape = [n_samples, n_features]
+                Training vectors, where n_samples is the number 
+                of samples and n_features is the number of features.
+
+            y: array-like, shape = [n_samples] or [n_samples, n_targets]
+                Target values (several targets share the features and the
+                factorization).
+
+            lambda1s: array-like
+                regularization parameters on direct link
+
+            lambda2s: array-like
+                regularization parameters on hidden layer
+
+            **kwargs: additional parameters to be passed to 
+                    self.cook_training_set
+
+        Returns: 
+
+            a dict with the grid ('lambda1', 'lambda2'), the coefficients 
+            ('beta', shape = [len(lambda1s), len(lambda2s), n_coefs] or 
+            [len(lambda1s), len(lambda2s), n_coefs, n_targets]) and the 
+            Generalized Cross-Validation errors ('GCV', shape = 
+            [len(lambda1s), len(lambda2s)] or [len(lambda1s), len(lambda2s), 
+            n_targets])
+
+        """
+
+        lambda1s = np.asarray(lambda1s, dtype=np.float64).ravel()
+        lambda2s = np.asarray(lambda2s, dtype=np.float64).ravel()
+
+        centered_y, scaled_Z = self.cook_training_set(y=y, X=X, **kwargs)
+        centered_y = np.asarray(centered_y, dtype=np.float64)
+
+        # one column per target
+        one_target = centered_y.ndim == 1
+        Y = centered_y[:, None] if one_target else centered_y
+        n_targets = Y.shape[1]
+
+        X_, Phi_X_ = self.split_design(X, scaled_Z)
+        n, q = X_.shape
+        p = Phi_X_.shape[1]
+
+        # Gram blocks, once for the whole grid (in double precision)
+        B0 = np.asarray(mo.crossprod(x=X_), dtype=np.float64)
+        C = np.asarray(mo.crossprod(x=Phi_X_, y=X_), dtype=np.float64)
+        D0 = np.asarray(mo.crossprod(x=Phi_X_), dtype=np.float64)
+        r_X = np.asarray(mo.crossprod(x=X_, y=Y), dtype=np.float64)
+        r_Phi = np.asarray(mo.crossprod(x=Phi_X_, y=Y), dtype=np.float64)
+
+        e_B, U_B = np.linalg.eigh(B0)
+
+        betas = np.zeros((len(lambda1s), len(lambda2s), q + p, n_targets))
+        GCVs = np.zeros((len(lambda1s), len(lambda2s), n_targets))
+
+        for i, lambda1 in enumerate(lambda1s):
+
+            B_inv = np.dot(U_B / (e_B + lambda1), U_B.T)
+            W = np.dot(C, B_inv)
+            # Schur complement of B in the block system, without lambda2
+            S0 = D0 - np.dot(W, C.T)
+            e_S, U_S = np.linalg.eigh((S0 + S0.T) / 2)
+            inv_e_S = 1 / (e_S[:, None] + lambda2s[None, :])  # p x len(lambda2s)
+
+            # coefficients on the hidden layer, then on the direct link 
+            # (p x len(lambda2s) x n_targets, q x len(lambda2s) x n_targets)
+            beta_Phi = np.tensordot(
+                U_S,
+                np.dot(U_S.T, r_Phi - np.dot(W, r_X))[:, None, :]
+                * inv_e_S[:, :, None],
+                axes=1,
+            )
+            beta_X = np.tensordot(
+                B_inv, r_X[:, None, :] - np.tensordot(C.T, beta_Phi, axes=1),
+                axes=1,
+            )
+            betas[i] = np.concatenate((beta_X, beta_Phi)).transpose(1, 0, 2)
+
+            # effective degrees of freedom, trace of the hat matrix:
+            # q + p - lambda1*trace(inv_11) - lambda2*trace(inv_22), with
+            # inv_11 = B_inv + W'%*%S_inv%*%W and inv_22 = S_inv
+            WU = np.dot(W.T, U_S)
+            df = (
+                q
+                + p
+                - lambda1
+                * (
+                    np.sum(1 / (e_B + lambda1))
+                    + np.dot(np.sum(WU ** 2, axis=0), inv_e_S)
+                )
+                - lambda2s * np.sum(inv_e_S, axis=0)
+            )
+
+            # n x len(lambda2s) x n_targets
+            residuals = Y[:, None, :] - mo.safe_sparse_dot(
+                a=scaled_Z,
+                b=betas[i].transpose(1, 0, 2).reshape(q + p, -1),
+            ).reshape(n, len(lambda2s), n_targets)
+            GCVs[i] = (
+                np.mean(residuals ** 2, axis=0)
+                / ((1 - df / n) ** 2)[:, None]
+            )
+
+        if one_target:
+            betas = betas[..., 0]
+            GCVs = GCVs[..., 0]
+
+        # one pair of penalties shared by all the targets
+        total_GCVs = GCVs if one_target else GCVs.sum(axis=2)
+        i, j = np.unravel_index(np.argmin(total_GCVs), total_GCVs.shape)
+        self.lambda1_ = lambda1s[i]
+        self.lambda2_ = lambda2s[j]
+        self.beta = betas[i, j].astype(scaled_Z.dtype, copy=False)
+
+        return {
+            "lambda1": lambda1s,
+            "lambda2": lambda2s,
+            "beta": betas,
+            "GCV": GCVs,
+        }
+
     def predict(self, X, **kwargs):
         """Predict test data X.
         
@@ -221,7 +367,8 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
                 
         Returns: 
         
-            model predictions: {array-like}
+            model predictions: {array-like}, shape = [n_samples] or 
+            [n_samples, n_targets]
 
         """
 
@@ -243,8 +390,11 @@ class Ridge2Regressor(Ridge2, RegressorMixin):
                 )
             )[0]
 
-        return self.y_mean + mo.safe_sparse_dot(
-            a=self.cook_test_set(X, **kwargs), b=self.beta, backend=self.backend
+        return self.predict_in_chunks(
+            X,
+            lambda Z: self.y_mean
+            + mo.safe_sparse_dot(a=Z, b=self.beta, backend=self.backend),
+            **kwargs
         )
 
     def score(self, X, y, scoring=None, **kwargs):
@@ -0,0 +1,164 @@
+"""Bayesian Random Vector Functional Link Networks"""
+
+# Authors: Thierry Moudiki
+#
+# License: BSD 3
+
+import numpy as np
+from sklearn.utils import gen_batches, get_chunk_n_rows
+from .._config import get_config
+from ..base import Base
+from ..utils import matrixops as mo
+from ..utils import lmfuncs as lmf
+
+
+class BayesianRVFL(Base):
+    """Bayesian RVFL model class derived from class Base: posterior updates 
+    and sampling shared by BayesianRVFLRegressor and BayesianRVFL2Regressor, 
+    from the fitted posterior distribution of the parameters (`beta`, `Sigma`), the 
+    response's mean `y_mean` and the residuals' std. dev. `sigma_`.
+    """
+
+    def update(self, X, y, forgetting_factor=1, **kwargs):
+        """Update the posterior distribution of the parameters with new 
+        observations (X, y), without refitting: in O(k*p^2) for k new rows 
+        and p columns of the hidden layer's output (O(k*rank*p) with 
+        low_rank_cov=True).
+
+        The hidden layer, the scalers and the response's mean from the 
+        initial fit are kept as is, and GCV is not updated. 
+        
+        Args:
+        
+            X: {array-like}, shape = [n_samples, n_features]
+                New training vectors, where n_samples is the number 
+                of samples and n_features is the number of features
+            
+            y: array-like, shape = [n_samples]
+                New target values
+
+            forgetting_factor: float
+                in (0, 1]; the posterior covariance is divided by 
+                `forgetting_factor` before the update, to discount older 
+                observations (drift). 1: no forgetting
+        
+            **kwargs: additional parameters to be passed to 
+                    self.cook_test_set
+               
+        Returns: 
+
+            self: object
+
+        """
+
+        assert (
+            self.Sigma is not None
+        ), "the model must be fitted with return_std=True"
+
+        assert 0 < forgetting_factor <= 1, "forgetting_factor must be in (0, 1]"
+
+        if len(X.shape) == 1:  # one new observation
+            X = X.reshape(1, -1)
+
+        self.beta, self.Sigma = lmf.update_beta_Sigma_hat(
+            self.beta,
+            self.Sigma,
+            x=self.cook_test_set(X, **kwargs),
+            y=np.ravel(y) - self.y_mean,
+            sigma=self.sigma_,
+            forgetting_factor=forgetting_factor,
+        )
+
+        return self
+
+    def sample_posterior_predictive(
+        self, X, n_samples=100, chunk_size=None, out=None, seed=None, **kwargs
+    ):
+        """Draw from the posterior distribution of the regression function 
+        on X: with beta_s ~ N(beta, Sigma) (s = 1, ..., n_samples), 
+        y_mean + Z%*%beta_s for Z the cooked X (see self.cook_test_set). 
+
+        Sigma's square root is computed once per fit (or update), the 
+        parameters are drawn at once, and each chunk of rows takes a single 
+        matrix product.
+        
+        Args:
+        
+            X: {array-like}, shape = [n_samples, n_features]
+                Test vectors, where n_samples is the number 
+                of samples and n_features is the number of features
+
+            n_samples: int
+                number of draws
+
+            chunk_size: int
+                number of rows of X processed at once (default: derived from 
+                the `working_memory` setting, see `nnetsauce.set_config`)
+
+            out: str
+                path of a .npy file the draws are written to, as a 
+                memory-mapped array (default: the draws are kept in memory)
+
+            seed: int
+                reproducibility seed for the draws (default: self.seed)
+        
+            **kwargs: additional parameters to be passed to 
+                    self.cook_test_set
+               
+        Returns: 
+
+            draws: {array-like} or {np.memmap}, shape = [X.shape[0], n_samples]
+
+        """
+
+        assert (
+            self.Sigma is not None
+        ), "the model must be fitted with return_std=True"
+
+        if len(X.shape) == 1:  # one observation in the test set only
+            X = X.reshape(1, -1)
+
+        if getattr(self, "_Sigma_sqrt", (None,))[0] is not self.Sigma:
+            self._Sigma_sqrt = (self.Sigma, lmf.cov_sqrt(self.Sigma))
+
+        beta_draws = lmf.sample_beta(
+            self.beta,
+            self._Sigma_sqrt[1],
+            n_samples,
+            np.random.RandomState(self.seed if seed is None else seed),
+        ).astype(self.beta.dtype, copy=False)
+
+        n_rows = X.shape[0]
+
+        if out is None:
+            res = np.empty((n_rows, n_samples), dtype=beta_draws.dtype)
+        else:
+            res = np.lib.format.open_memmap(
+                out,
+                mode="w+",
+                dtype=beta_draws.dtype,
+                shape=(n_rows, n_samples),
+            )
+
+        if chunk_size is None:
+            # one row of draws, plus a cooked row (see self.predict_in_chunks)
+            n_features = (
+                X.shape[1] + max(self.n_clusters, 0) + self.n_hidden_features
+            )
+            chunk_size = get_chunk_n_rows(
+                row_bytes=8 * (n_samples + 3 * n_features),
+                max_n_rows=n_rows,
+                working_memory=get_config()["working_memory"],
+            )
+
+        for batch in gen_batches(n_rows, chunk_size):
+            res[batch] = self.y_mean + mo.safe_sparse_dot(
+                a=self.cook_test_set(X[batch], **kwargs),
+                b=beta_draws,
+                backend=self.backend,
+            )
+
+        if out is not None:
+            res.flush()
+
+        return res
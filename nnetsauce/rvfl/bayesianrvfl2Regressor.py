@@ -4,14 +4,16 @@
 
 import numpy as np
 import sklearn.metrics as skm2
-from ..base import Base
+from scipy import sparse
+from scipy.optimize import minimize_scalar
+from .bayesianrvfl import BayesianRVFL
 from ..utils import misc as mx
 from ..utils import matrixops as mo
 from ..utils import lmfuncs as lmf
 from sklearn.base import RegressorMixin
 
 
-class BayesianRVFL2Regressor(Base, RegressorMixin):
+class BayesianRVFL2Regressor(BayesianRVFL, RegressorMixin):
     """Bayesian Random Vector Functional Link Network regression with two priors
     
     Attributes: 
@@ -46,7 +48,7 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -74,7 +76,7 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
         beta: array-like
             regression''s fitted parameters 
 
-        Sigma: array-like
+        Sigma: array-like or LowRankCov
             covariance of the distribution of fitted parameters
 
         GCV: float
@@ -83,6 +85,21 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
         backend: str
             "cpu" or "gpu" or "tpu"                
 
+        low_rank_cov: boolean
+            if True, Sigma is stored as a diagonal (the prior's) minus a 
+            low-rank term, in a `LowRankCov` (rank <= n_samples, for wide 
+            models: memory and cost of the predictive std. dev. in O(rank*p) 
+            instead of O(p^2))
+
+        cov_rank: int
+            maximum rank of Sigma's low-rank term when low_rank_cov is True 
+            (None: no truncation); truncation overestimates the predictive 
+            std. dev.
+
+        s1_, s2_, sigma_: float
+            s1, s2 and sigma of the fitted model (the values maximizing the 
+            marginal likelihood of y with `fit(optimize_hyper=True)`)
+
     References:       
 
         - [1] Moudiki, T. (2020). Quasi-randomized networks for regression and classification, with two shrinkage parameters. Available at: 
@@ -116,7 +133,9 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
         Sigma=None,
         GCV=None,
         return_std=True,
-        backend="cpu"
+        backend="cpu",
+        low_rank_cov=False,
+        cov_rank=None,
     ):
 
         super().__init__(
@@ -144,8 +163,10 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
         self.Sigma = Sigma
         self.GCV = GCV
         self.return_std = return_std
+        self.low_rank_cov = low_rank_cov
+        self.cov_rank = cov_rank
 
-    def fit(self, X, y, **kwargs):
+    def fit(self, X, y, optimize_hyper=False, **kwargs):
         """Fit BayesianRVFL2Regressor to training data (X, y)
         
         Args:        
@@ -156,6 +177,13 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
             
             y: array-like, shape = [n_samples]
                 Target values
+
+            optimize_hyper: boolean
+                if True, the model uses the values of `s1`, `s2` and `sigma` 
+                maximizing the marginal likelihood of y (starting from the 
+                current ones), stored in `s1_`, `s2_` and `sigma_`: one 
+                eigendecomposition per ratio s1/s2 tried (only one without 
+                direct link)
         
             **kwargs: additional parameters to be passed to 
                     self.cook_training_set
@@ -171,14 +199,24 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
         n, p = X.shape
         q = self.n_hidden_features
 
+        n_direct = p + self.n_clusters if self.direct_link == True else 0
+
+        if optimize_hyper == True:
+            return self._fit_evidence(centered_y, scaled_Z, n_direct)
+
+        self.s1_, self.s2_, self.sigma_ = self.s1, self.s2, self.sigma
+
+        if self.low_rank_cov == True:
+            return self._fit_low_rank(centered_y, scaled_Z, n_direct)
+
         if self.direct_link == True:
 
             r = p + self.n_clusters
 
-            block11 = (self.s1 ** 2) * np.eye(r)
-            block12 = np.zeros((r, q))
-            block21 = np.zeros((q, r))
-            block22 = (self.s2 ** 2) * np.eye(q)
+            block11 = (self.s1_ ** 2) * np.eye(r, dtype=scaled_Z.dtype)
+            block12 = np.zeros((r, q), dtype=scaled_Z.dtype)
+            block21 = np.zeros((q, r), dtype=scaled_Z.dtype)
+            block22 = (self.s2_ ** 2) * np.eye(q, dtype=scaled_Z.dtype)
 
             Sigma_prior = mo.rbind(
                 x=mo.cbind(x=block11, y=block12, backend=self.backend),
@@ -188,13 +226,13 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
 
         else:
 
-            Sigma_prior = (self.s2 ** 2) * np.eye(q)
+            Sigma_prior = (self.s2_ ** 2) * np.eye(q, dtype=scaled_Z.dtype)
 
         fit_obj = lmf.beta_Sigma_hat_rvfl2(
             X=scaled_Z,
             y=centered_y,
             Sigma=Sigma_prior,
-            sigma=self.sigma,
+            sigma=self.sigma_,
             fit_intercept=False,
             return_cov=self.return_std,
             backend=self.backend,
@@ -209,6 +247,77 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
 
         return self
 
+    def _fit_low_rank(self, centered_y, scaled_Z, n_direct):
+        # diagonal prior: s1^2 on the n_direct first columns, s2^2 elsewhere
+        prior_var = np.repeat(self.s2_ ** 2, scaled_Z.shape[1])
+        prior_var[:n_direct] = self.s1_ ** 2
+
+        fit_obj = lmf.beta_Sigma_hat_low_rank(
+            X=scaled_Z,
+            y=centered_y,
+            prior_var=prior_var,
+            sigma=self.sigma_,
+            max_rank=self.cov_rank,
+        )
+
+        self.beta = fit_obj["beta_hat"]
+
+        if self.return_std == True:
+            self.Sigma = fit_obj["Sigma_hat"]
+
+        self.GCV = fit_obj["GCV"]
+
+        return self
+
+    def _fit_evidence(self, centered_y, scaled_Z, n_direct):
+        # with scales = s1/s2 on the n_direct first columns and 1 elsewhere,
+        # Z%*%diag(scales) has the prior s2^2*I. t(Z)%*%Z and the prior have
+        # no common eigenvectors when s1 != s2, hence an eigendecomposition
+        # per ratio s1/s2, and (s2, sigma) in O(p) for each of them
+        n = scaled_Z.shape[0]
+        yty = np.sum(np.square(centered_y, dtype=np.float64))
+
+        def fit_ratio(log_ratio):
+            scales = np.ones(scaled_Z.shape[1])
+            scales[:n_direct] = np.exp(log_ratio)
+            d, V, z = lmf.eigen_cov(
+                scaled_Z.multiply(scales).tocsr()
+                if sparse.issparse(scaled_Z)
+                else scaled_Z * scales,
+                centered_y,
+            )
+            return (scales, d, V, z) + lmf.max_log_evidence(
+                d, z, n=n, yty=yty, s0=self.s2, sigma0=self.sigma
+            )
+
+        log_ratio = np.log(self.s1 / self.s2)
+        if n_direct > 0:
+            log_ratio = minimize_scalar(
+                lambda x: -fit_ratio(x)[-1],
+                bounds=(log_ratio - 10, log_ratio + 10),
+                method="bounded",
+            ).x
+
+        scales, d, V, z, self.s2_, self.sigma_, _ = fit_ratio(log_ratio)
+        self.s1_ = self.s2_ * np.exp(log_ratio) if n_direct > 0 else self.s1
+
+        if self.low_rank_cov == True:
+            return self._fit_low_rank(centered_y, scaled_Z, n_direct)
+
+        beta, Cn = lmf.beta_inv_penalized_cov_eigen(
+            d, V, z, lam=(self.sigma_ / self.s2_) ** 2
+        )
+        # back to the original columns: Cn_Sigma = diag(scales)%*%Cn%*%diag(scales)
+        Cn *= scales[:, None] * scales[None, :]
+        self.beta = (scales * beta).astype(scaled_Z.dtype, copy=False)
+        if self.return_std == True:
+            self.Sigma = ((self.sigma_ ** 2) * Cn).astype(
+                scaled_Z.dtype, copy=False
+            )
+        self.GCV = lmf.gcv(X=scaled_Z, y=centered_y, M=Cn)
+
+        return self
+
     def predict(self, X, return_std=False, **kwargs):
         """Predict test data X.
         
@@ -252,9 +361,11 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
                     )
                 )[0]
 
-            return self.y_mean + mo.safe_sparse_dot(
-                self.cook_test_set(X, **kwargs), self.beta, 
-                backend=self.backend
+            return self.predict_in_chunks(
+                X,
+                lambda Z: self.y_mean
+                + mo.safe_sparse_dot(Z, self.beta, backend=self.backend),
+                **kwargs
             )
 
         else:  # confidence interval required for preds?
@@ -264,6 +375,7 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
                 Z = self.cook_test_set(new_X, **kwargs)
 
                 pred_obj = lmf.beta_Sigma_hat_rvfl2(
+                    sigma=self.sigma_,
                     X_star=Z,
                     return_cov=self.return_std,
                     beta_hat_=self.beta,
@@ -276,17 +388,20 @@ class BayesianRVFL2Regressor(Base, RegressorMixin):
                     pred_obj["preds_std"][0],
                 )
 
-            Z = self.cook_test_set(X, **kwargs)
+            def calc_preds(Z):
 
-            pred_obj = lmf.beta_Sigma_hat_rvfl2(
-                X_star=Z,
-                return_cov=self.return_std,
-                beta_hat_=self.beta,
-                Sigma_hat_=self.Sigma,
-                backend=self.backend,
-            )
+                pred_obj = lmf.beta_Sigma_hat_rvfl2(
+                    sigma=self.sigma_,
+                    X_star=Z,
+                    return_cov=self.return_std,
+                    beta_hat_=self.beta,
+                    Sigma_hat_=self.Sigma,
+                    backend=self.backend,
+                )
+
+                return (self.y_mean + pred_obj["preds"], pred_obj["preds_std"])
 
-            return (self.y_mean + pred_obj["preds"], pred_obj["preds_std"])
+            return self.predict_in_chunks(X, calc_preds, **kwargs)
 
     def score(self, X, y, scoring=None, **kwargs):
         """ Score the model on test set features X and response y. 
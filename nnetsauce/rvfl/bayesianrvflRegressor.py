@@ -4,14 +4,14 @@
 
 import numpy as np
 import sklearn.metrics as skm2
-from ..base import Base
+from .bayesianrvfl import BayesianRVFL
 from ..utils import misc as mx
 from ..utils import matrixops as mo
 from ..utils import lmfuncs as lmf
 from sklearn.base import RegressorMixin
 
 
-class BayesianRVFLRegressor(Base, RegressorMixin):
+class BayesianRVFLRegressor(BayesianRVFL, RegressorMixin):
     """Bayesian Random Vector Functional Link Network regression with one prior
     
     Attributes: 
@@ -46,7 +46,7 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
             if `False`, then labels are used, without one-hot encoding
 
         type_clust: str
-            type of clustering method: currently k-means ('kmeans') or Gaussian Mixture Model ('gmm')
+            type of clustering method: currently k-means ('kmeans'), mini-batch k-means ('minibatchkmeans') or Gaussian Mixture Model ('gmm')
 
         type_scaling: a tuple of 3 strings
             scaling methods for inputs, hidden layer, and clustering respectively
@@ -71,7 +71,7 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
         beta: array-like
             regression''s fitted parameters 
 
-        Sigma: array-like
+        Sigma: array-like or LowRankCov
             covariance of the distribution of fitted parameters
 
         GCV: float
@@ -80,6 +80,21 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
         backend: str
             "cpu" or "gpu" or "tpu"                
 
+        low_rank_cov: boolean
+            if True, Sigma is stored as a diagonal (the prior's) minus a 
+            low-rank term, in a `LowRankCov` (rank <= n_samples, for wide 
+            models: memory and cost of the predictive std. dev. in O(rank*p) 
+            instead of O(p^2))
+
+        cov_rank: int
+            maximum rank of Sigma's low-rank term when low_rank_cov is True 
+            (None: no truncation); truncation overestimates the predictive 
+            std. dev.
+
+        s_, sigma_: float
+            s and sigma of the fitted model (the values maximizing the 
+            marginal likelihood of y with `fit(optimize_hyper=True)`)
+
     """
 
     # construct the object -----
@@ -106,7 +121,9 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
         Sigma=None,
         GCV=None,
         return_std=True,
-        backend="cpu"
+        backend="cpu",
+        low_rank_cov=False,
+        cov_rank=None,
     ):
 
         super().__init__(
@@ -132,8 +149,10 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
         self.Sigma = Sigma
         self.GCV = GCV
         self.return_std = return_std
+        self.low_rank_cov = low_rank_cov
+        self.cov_rank = cov_rank
 
-    def fit(self, X, y, **kwargs):
+    def fit(self, X, y, optimize_hyper=False, **kwargs):
         """Fit BayesianRVFLRegressor to training data (X, y).
         
         Args:
@@ -144,6 +163,12 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
             
             y: array-like, shape = [n_samples]
                 Target values.
+
+            optimize_hyper: boolean
+                if True, the model uses the values of `s` and `sigma` 
+                maximizing the marginal likelihood of y (starting from the 
+                current ones), stored in `s_` and `sigma_`: all computed from 
+                one eigendecomposition of t(Z)%*%Z
         
             **kwargs: additional parameters to be passed to 
                     self.cook_training_set
@@ -156,11 +181,42 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
 
         centered_y, scaled_Z = self.cook_training_set(y=y, X=X, **kwargs)
 
+        if optimize_hyper == True:
+            # one eigendecomposition, for the marginal likelihood of each
+            # (s, sigma) in O(p), and for the posterior
+            d, V, z = lmf.eigen_cov(scaled_Z, centered_y)
+            self.s_, self.sigma_, _ = lmf.max_log_evidence(
+                d,
+                z,
+                n=scaled_Z.shape[0],
+                yty=np.sum(np.square(centered_y, dtype=np.float64)),
+                s0=self.s,
+                sigma0=self.sigma,
+            )
+            if self.low_rank_cov == True:
+                return self._fit_low_rank(centered_y, scaled_Z)
+            beta, Cn = lmf.beta_inv_penalized_cov_eigen(
+                d, V, z, lam=(self.sigma_ / self.s_) ** 2
+            )
+            Sigma_hat = (self.sigma_ ** 2) * Cn
+            self.beta = beta.astype(scaled_Z.dtype, copy=False)
+            if self.return_std == True:
+                self.Sigma = Sigma_hat.astype(scaled_Z.dtype, copy=False)
+            self.GCV = lmf.gcv(
+                X=scaled_Z, y=centered_y, M=np.dot(Cn, Sigma_hat)
+            )
+            return self
+
+        self.s_, self.sigma_ = self.s, self.sigma
+
+        if self.low_rank_cov == True:
+            return self._fit_low_rank(centered_y, scaled_Z)
+
         fit_obj = lmf.beta_Sigma_hat_rvfl(
             X=scaled_Z,
             y=centered_y,
-            s=self.s,
-            sigma=self.sigma,
+            s=self.s_,
+            sigma=self.sigma_,
             fit_intercept=False,
             return_cov=self.return_std,
             backend=self.backend,
@@ -175,6 +231,24 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
 
         return self
 
+    def _fit_low_rank(self, centered_y, scaled_Z):
+        fit_obj = lmf.beta_Sigma_hat_low_rank(
+            X=scaled_Z,
+            y=centered_y,
+            prior_var=np.repeat(self.s_ ** 2, scaled_Z.shape[1]),
+            sigma=self.sigma_,
+            max_rank=self.cov_rank,
+        )
+
+        self.beta = fit_obj["beta_hat"]
+
+        if self.return_std == True:
+            self.Sigma = fit_obj["Sigma_hat"]
+
+        self.GCV = fit_obj["GCV"]
+
+        return self
+
     def predict(self, X, return_std=False, **kwargs):
         """Predict test data X.
         
@@ -218,10 +292,11 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
                     )
                 )[0]
 
-            return self.y_mean + mo.safe_sparse_dot(
-                a=self.cook_test_set(X, **kwargs),
-                b=self.beta,
-                backend=self.backend,
+            return self.predict_in_chunks(
+                X,
+                lambda Z: self.y_mean
+                + mo.safe_sparse_dot(a=Z, b=self.beta, backend=self.backend),
+                **kwargs
             )
 
         else:  # confidence interval required for preds?
@@ -231,8 +306,8 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
                 Z = self.cook_test_set(new_X, **kwargs)
 
                 pred_obj = lmf.beta_Sigma_hat_rvfl(
-                    s=self.s,
-                    sigma=self.sigma,
+                    s=self.s_,
+                    sigma=self.sigma_,
                     X_star=Z,
                     return_cov=True,
                     beta_hat_=self.beta,
@@ -245,19 +320,21 @@ class BayesianRVFLRegressor(Base, RegressorMixin):
                     pred_obj["preds_std"][0],
                 )
 
-            Z = self.cook_test_set(X, **kwargs)
+            def calc_preds(Z):
 
-            pred_obj = lmf.beta_Sigma_hat_rvfl(
-                s=self.s,
-                sigma=self.sigma,
-                X_star=Z,
-                return_cov=True,
-                beta_hat_=self.beta,
-                Sigma_hat_=self.Sigma,
-                backend=self.backend,
-            )
+                pred_obj = lmf.beta_Sigma_hat_rvfl(
+                    s=self.s_,
+                    sigma=self.sigma_,
+                    X_star=Z,
+                    return_cov=True,
+                    beta_hat_=self.beta,
+                    Sigma_hat_=self.Sigma,
+                    backend=self.backend,
+                )
+
+                return (self.y_mean + pred_obj["preds"], pred_obj["preds_std"])
 
-            return (self.y_mean + pred_obj["preds"], pred_obj["preds_std"])
+            return self.predict_in_chunks(X, calc_preds, **kwargs)
 
     def score(self, X, y, scoring=None, **kwargs):
         """ Score the model on test set features X and response y. 
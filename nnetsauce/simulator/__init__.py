@@ -1,3 +1,3 @@
-from ._simulator import Simulator
+from ._simulator import Simulator, nodes_cache
 
-__all__ = ["Simulator"]
+__all__ = ["Simulator", "nodes_cache"]
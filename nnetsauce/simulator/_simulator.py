@@ -1,26 +1,58 @@
 
-from functools import partial
 from . import _simulatorc as simulatorc
-from ..utils import memoize
-from ..simulation import generate_uniform
+from .._config import get_config
+from ..utils.lrucache import LRUCache
 
-class Simulator():    
+
+# node matrices, shared by all the Simulator instances (see `nodes_cache_memory`
+# in nnetsauce.set_config)
+nodes_cache = LRUCache()
+
+
+class Simulator():
 
     def __init__(self, n_points, n_dims, type_sim="sobol", seed=123):
 
-        self.n = n_points            
-        self.m = n_dims                
-        self.type_sim = type_sim 
+        self.n = n_points
+        self.m = n_dims
+        self.type_sim = type_sim
         self.seed = seed
 
-    @memoize
-    def draw(self):        
-        h_sim = {
-            "sobol": simulatorc.py_i4_sobol_generate,
-            "halton": simulatorc.py_halton_sequence,
-            "hammersley": simulatorc.py_hammersley_sequence,
-            "uniform": partial(generate_uniform, seed=self.seed)
-        }    
-        return h_sim[self.type_sim](m=self.m, n=self.n)    
-        
+    def draw(self):
+        """Draw the nodes, an array of shape [n_dims, n_points].
+
+        The nodes are cached and shared across instances, keyed by the
+        generation parameters: the returned array is read-only.
+        """
+
+        nodes_cache.max_bytes = get_config()["nodes_cache_memory"] * 2 ** 20
+
+        # the seed only matters for uniform nodes
+        key = (
+            self.type_sim,
+            self.m,
+            self.n,
+            self.seed if self.type_sim == "uniform" else None,
+        )
+
+        nodes = nodes_cache.get(key)
+
+        if nodes is None:
+
+            h_sim = {
+                "sobol": simulatorc.py_i4_sobol_generate,
+                "halton": simulatorc.py_halton_sequence,
+                "hammersley": simulatorc.py_hammersley_sequence,
+                "uniform": self.draw_uniform,
+            }
+            nodes = h_sim[self.type_sim](m=self.m, n=self.n)
+            nodes.flags.writeable = False
+            nodes_cache.put(key, nodes)
+
+        return nodes
+
+    def draw_uniform(self, m, n):
+        # nnetsauce.simulation (large, pure Python) is only imported here
+        from ..simulation import generate_uniform
 
+        return generate_uniform(n_dims=m, n_points=n, seed=self.seed)
@@ -114,7 +114,7 @@ class TestAdaBoost(ut.TestCase):
 
         self.assertTrue(np.allclose(preds1[0, 1], 0.9989601842190745))
 
-        self.assertTrue(np.allclose(preds2[0, 0], 0.28646471034732585))
+        self.assertTrue(np.allclose(preds2[0, 0], 0.2874144965263139))
 
         self.assertFalse(np.allclose(preds3[0, 0], 1000))
 
@@ -199,7 +199,7 @@ class TestAdaBoost(ut.TestCase):
 
         self.assertTrue(
             np.allclose(score1, 0.9210526315789473)
-            & np.allclose(score2, 0.7807017543859649)
+            & np.allclose(score2, 0.8333333333333334)
         )
 
         self.assertFalse(np.allclose(score3, 1000))
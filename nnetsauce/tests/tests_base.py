@@ -238,8 +238,9 @@ class TestBase(ut.TestCase):
 
         self.assertTrue(np.allclose(rmse, 63.243819280710575))
         self.assertTrue(np.allclose(rmse2, 19.404919470812349))
-        self.assertFalse(np.allclose(rmse3, 0))
-        self.assertTrue(np.allclose(rmse4, 208.284))
+        # noiseless, linear y: exact fits with the input features
+        self.assertTrue(np.allclose(rmse3, 0))
+        self.assertTrue(np.allclose(rmse4, 0))
         self.assertFalse(np.allclose(rmse5, 0))
         self.assertTrue(np.allclose(rmse6, 62.613229649101946))
         self.assertTrue(np.allclose(rmse7, 63.048908568696184))
@@ -253,7 +254,7 @@ class TestBase(ut.TestCase):
 
         self.assertFalse(np.allclose(rmse8, 1.63e-13))
         self.assertFalse(np.allclose(rmse9, 1.76e-13))
-        self.assertTrue(np.allclose(rmse10, 12.827880281249008))
+        self.assertTrue(np.allclose(rmse10, 0))
         self.assertTrue(np.allclose(rmse11, 22.54340221323043))
         self.assertTrue(np.allclose(rmse12, 22.54340221322761))
         self.assertFalse(np.allclose(rmse13, 1e6))
@@ -274,9 +275,184 @@ class TestBase(ut.TestCase):
         )
         fit_obj.fit(X, y)
 
+        # noiseless, linear y: exact fit with the input features
         self.assertTrue(
-            np.allclose(fit_obj.score(X, y, scoring="r2"), 0.9294339466604191)
-            & np.allclose(fit_obj.score(X, y), 1596.2615409365528)
+            np.allclose(fit_obj.score(X, y, scoring="r2"), 1)
+            & np.allclose(fit_obj.score(X, y), 0)
+        )
+
+    def test_predict_in_chunks(self):
+
+        X, y = datasets.make_regression(
+            n_samples=100, n_features=3, random_state=123
+        )
+
+        fit_obj = ns.BaseRegressor(
+            n_hidden_features=5,
+            direct_link=True,
+            bias=True,
+            nodes_sim="sobol",
+            activation_name="relu",
+            n_clusters=0,
+        )
+        fit_obj.fit(X, y)
+
+        preds = fit_obj.predict(X)
+        with ns.config_context(working_memory=0.001):
+            preds_chunks = fit_obj.predict(X)
+
+        # empty test set
+        fit_obj2 = ns.BayesianRVFLRegressor(n_hidden_features=5).fit(X, y)
+        preds_empty = fit_obj.predict(X[:0])
+        preds_empty2 = fit_obj2.predict(X[:0], return_std=True)
+
+        # blocks sized from the width of Z (one-hot clusters included) and
+        # the configured dtype: 10 rows of float64, 20 rows of float32
+        fit_obj3 = ns.BaseRegressor(
+            n_hidden_features=5, n_clusters=3, type_clust="gmm"
+        ).fit(X, y)
+        p_Z = fit_obj3.cook_test_set(X).shape[1]
+        n_calls = []
+        for dtype in ("float64", "float32"):
+            calls = []
+            cook_test_set = fit_obj3.cook_test_set
+            fit_obj3.cook_test_set = lambda X, **kwargs: (
+                calls.append(X.shape[0]) or cook_test_set(X, **kwargs)
+            )
+            with ns.config_context(
+                working_memory=3 * 8 * p_Z * 10 / 2 ** 20, dtype=dtype
+            ):
+                fit_obj3.predict(X)
+            del fit_obj3.cook_test_set
+            n_calls.append(len(calls) - 1)  # one row for the width of Z
+
+        self.assertTrue(
+            np.allclose(preds, preds_chunks)
+            & (n_calls == [10, 5])
+            & (preds_empty.shape == (0,))
+            & isinstance(preds_empty2, tuple)
+            & (preds_empty2[0].shape == (0,))
+            & (preds_empty2[1].shape == (0,))
+        )
+
+    def test_float32(self):
+
+        X, y = datasets.make_regression(
+            n_samples=100, n_features=3, random_state=123
+        )
+
+        fit_obj = ns.BaseRegressor(
+            n_hidden_features=6,
+            direct_link=True,
+            bias=True,
+            nodes_sim="sobol",
+            activation_name="relu",
+            n_clusters=0,
+        )
+        preds = fit_obj.fit(X, y).predict(X)
+
+        with ns.config_context(dtype="float32"):
+            fit_obj.fit(X, y)
+            preds32 = fit_obj.predict(X)
+
+        self.assertTrue(
+            (fit_obj.beta.dtype == np.float32)
+            & (preds32.dtype == np.float32)
+            & np.allclose(preds, preds32, atol=1e-4 * np.abs(preds).max())
+        )
+
+    def test_multi_target(self):
+
+        X, Y = datasets.make_regression(
+            n_samples=100, n_features=3, n_targets=3, random_state=123
+        )
+
+        fit_obj = ns.BaseRegressor(n_hidden_features=5, n_clusters=0)
+        preds = fit_obj.fit(X, Y).predict(X)
+        preds2 = np.column_stack(
+            [fit_obj.fit(X, Y[:, j]).predict(X) for j in range(3)]
+        )
+
+        self.assertTrue(
+            (preds.shape == (100, 3)) & np.allclose(preds, preds2)
+        )
+
+    def test_feature_cache(self):
+
+        from nnetsauce.base.base import feature_cache
+
+        X, y = datasets.make_regression(
+            n_samples=100, n_features=3, random_state=123
+        )
+
+        fit_obj = ns.Ridge2Regressor(n_hidden_features=5, n_clusters=2)
+        preds = [
+            fit_obj.set_params(lambda1=lambda1).fit(X, y).predict(X)
+            for lambda1 in (0.1, 10)
+        ]
+
+        feature_cache.clear()
+        with ns.config_context(feature_cache_memory=1):
+            preds_cache = [
+                fit_obj.set_params(lambda1=lambda1).fit(X, y).predict(X)
+                for lambda1 in (0.1, 10)
+            ]
+            # another hidden layer: not in the cache
+            fit_obj.set_params(n_hidden_features=6).fit(X, y)
+
+        self.assertTrue(
+            np.allclose(preds[0], preds_cache[0])
+            & np.allclose(preds[1], preds_cache[1])
+            & (feature_cache.hits == 1)
+            & (feature_cache.misses == 2)
+        )
+        feature_cache.clear()
+
+    def test_lazy_jax(self):
+
+        import os
+        import subprocess
+        import sys
+
+        out = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, numpy as np, nnetsauce as ns; "
+                "ns.Ridge2Regressor(n_clusters=0).fit("
+                "np.random.rand(10, 2), np.random.rand(10)); "
+                "print('jax' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        ).stdout
+
+        self.assertEqual(out.strip(), "False")
+
+    def test_lazy_import(self):
+
+        import os
+        import subprocess
+        import sys
+
+        out = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, nnetsauce; print('sklearn' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        ).stdout
+
+        self.assertTrue(
+            (out.strip() == "False")
+            & all(
+                getattr(ns, name).__name__ == name for name in ns.__all__
+            )
+            & set(ns.__all__).issubset(dir(ns))
         )
 
 
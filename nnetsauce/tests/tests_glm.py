@@ -0,0 +1,153 @@
+import numpy as np
+from scipy.optimize import approx_fprime
+import unittest as ut
+import nnetsauce as ns
+from sklearn.datasets import load_iris, load_wine, make_regression
+
+
+class TestGLM(ut.TestCase):
+    def test_loss_and_grad(self):
+
+        X, y = make_regression(n_samples=50, n_features=3, random_state=1)
+        X2, y2 = load_wine(return_X_y=True)
+        row_index = np.arange(0, 50, 2)
+
+        fit_obj = ns.GLMRegressor(
+            n_hidden_features=5, lambda1=0.1, lambda2=0.2, n_clusters=0
+        )
+        _, scaled_Z = fit_obj.cook_training_set(y=y, X=X)
+        fit_obj2 = ns.GLMClassifier(n_hidden_features=5, family="logit")
+        fit_obj2.n_classes = 3
+        output_y, scaled_Z2 = fit_obj2.cook_training_set(y=y2, X=X2)
+
+        x = np.random.RandomState(123).randn(scaled_Z.shape[1])
+        x2 = 0.1 * np.random.RandomState(123).randn(scaled_Z2.shape[1] * 3)
+
+        for obj, beta, kwargs in (
+            (fit_obj, x, dict(X=scaled_Z, y=y, type_loss="gaussian")),
+            (fit_obj, x, dict(X=scaled_Z, y=y, type_loss="laplace")),
+            (
+                fit_obj2,
+                x2,
+                dict(X=scaled_Z2, Y=np.eye(3)[output_y], y=y2),
+            ),
+        ):
+            loss, grad = obj.loss_and_grad(
+                beta, 3, row_index=row_index, **kwargs
+            )
+            loss_func = lambda b: obj.loss_func(
+                b, 3, row_index=row_index, **kwargs
+            )
+            self.assertTrue(
+                np.allclose(loss, loss_func(beta))
+                & np.allclose(
+                    grad, approx_fprime(beta, loss_func, 1e-7), atol=1e-4
+                )
+            )
+
+        # analytic gradients in the optimizer
+        fit_obj.optimizer = ns.Optimizer(verbose=0, num_iters=20)
+        fit_obj.fit(X, y, verbose=0)
+        self.assertTrue(
+            fit_obj.optimizer.results[2][-1] < fit_obj.optimizer.results[2][0]
+        )
+
+    def test_coordinate_grad(self):
+
+        X, y = make_regression(n_samples=50, n_features=3, random_state=1)
+        X2, y2 = load_wine(return_X_y=True)
+        row_index = np.arange(0, 50, 2)
+
+        fit_obj = ns.GLMRegressor(
+            n_hidden_features=5, lambda1=0.1, lambda2=0.2, n_clusters=0
+        )
+        _, scaled_Z = fit_obj.cook_training_set(y=y, X=X)
+        fit_obj2 = ns.GLMClassifier(n_hidden_features=5, family="logit")
+        fit_obj2.n_classes = 3
+        output_y, scaled_Z2 = fit_obj2.cook_training_set(y=y2, X=X2)
+
+        x = np.random.RandomState(123).randn(scaled_Z.shape[1])
+        x2 = 0.1 * np.random.RandomState(123).randn(scaled_Z2.shape[1] * 3)
+
+        # partial derivatives, with coordinates updated along the way
+        for obj, beta, kwargs in (
+            (fit_obj, x, dict(X=scaled_Z, y=y, type_loss="gaussian")),
+            (fit_obj, x, dict(X=scaled_Z, y=y, type_loss="laplace")),
+            (
+                fit_obj2,
+                x2,
+                dict(X=scaled_Z2, Y=np.eye(3)[output_y], y=y2),
+            ),
+        ):
+            beta = beta.copy()
+            grad_j = obj.coordinate_grad(
+                beta.copy(), 3, row_index=row_index, **kwargs
+            )
+            errors = []
+            for j in np.random.RandomState(1).permutation(len(beta)):
+                grad = obj.loss_and_grad(
+                    beta, 3, row_index=row_index, **kwargs
+                )[1]
+                errors.append(grad_j(beta, j) - grad[j])
+                beta[j] -= 0.1 * grad[j]
+            self.assertTrue(np.allclose(errors, 0))
+
+        # in coordinate descent
+        losses = []
+        for coordinate_grad in (fit_obj.coordinate_grad, None):
+            fit_obj.coordinate_grad = coordinate_grad
+            fit_obj.optimizer = ns.Optimizer(
+                type_optim="scd", verbose=0, num_iters=20
+            )
+            fit_obj.fit(X, y, verbose=0)
+            losses.append(fit_obj.optimizer.results[2])
+        del fit_obj.coordinate_grad
+        self.assertTrue(
+            np.allclose(losses[0], losses[1]) & (losses[0][-1] < losses[0][0])
+        )
+
+    def test_sgd(self):
+
+        X, y = load_iris(return_X_y=True)
+
+        fit_obj = ns.GLMClassifier(
+            n_hidden_features=5,
+            n_clusters=0,
+            optimizer=ns.Optimizer(verbose=0),
+        ).fit(X, y, verbose=0)
+        losses = fit_obj.optimizer.results[2]
+
+        # with exact gradients, the loss keeps decreasing: no early stopping
+        # (the finite differences stalled after 4 iterations, at 5.78)
+        self.assertTrue(
+            (len(losses) == 100)
+            & np.all(np.diff(losses) < 0)
+            & np.allclose(losses[-1], 5.4980754602302495)
+            & np.allclose(
+                fit_obj.predict_proba(X[0, :].reshape(1, -1)),
+                [[0.7249, 0.0126, 0.2625]],
+                atol=1e-4,
+            )
+        )
+
+    def test_float32(self):
+
+        X, y = make_regression(n_samples=50, n_features=3, random_state=1)
+        X2, y2 = load_wine(return_X_y=True)
+
+        with ns.config_context(dtype="float32"):
+            fit_obj = ns.GLMRegressor(
+                n_hidden_features=5, optimizer=ns.Optimizer(verbose=0)
+            ).fit(X, y, verbose=0)
+            fit_obj2 = ns.GLMClassifier(
+                n_hidden_features=5, optimizer=ns.Optimizer(verbose=0)
+            ).fit(X2, y2, verbose=0)
+
+            self.assertTrue(
+                np.all(np.isfinite(fit_obj.predict(X)))
+                & (fit_obj2.score(X2, y2) > 0.5)
+            )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -4,6 +4,7 @@ import unittest as ut
 import nnetsauce as ns
 from sklearn.model_selection import train_test_split
 from sklearn.datasets import load_breast_cancer, load_wine
+from scipy.optimize import approx_fprime
 
 
 class TestRidge(ut.TestCase):
@@ -51,13 +52,13 @@ class TestRidge(ut.TestCase):
         fit_obj4.fit(Z_train, t_train)
         preds4 = fit_obj4.predict_proba(Z_test)
 
-        self.assertTrue(np.allclose(preds1[0, 0], 5.1412488698250085e-06))
-        self.assertTrue(np.allclose(preds2[0, 0], 5.1412488698250085e-06))
-        self.assertTrue(np.allclose(preds3[0, 0], 0.0488412175))
-        self.assertTrue(np.allclose(preds4[0, 0], 0.8545733738))
+        self.assertTrue(np.allclose(preds1[0, 0], 0.9999999999990481))
+        self.assertTrue(np.allclose(preds2[0, 0], 0.9999999999990481))
+        self.assertTrue(np.allclose(preds3[0, 0], 1.4357381565185714e-10))
+        self.assertTrue(np.allclose(preds4[0, 0], 0.9976131715606043))
 
         self.assertTrue(
-            np.allclose(fit_obj.predict(X_test)[0], 1)
+            np.allclose(fit_obj.predict(X_test)[0], 0)
             & np.allclose(fit_obj2.predict(X_test)[0], 1)
             & np.allclose(fit_obj3.predict(Z_test)[0], 1)
             & np.allclose(fit_obj4.predict(Z_test)[0], 0)
@@ -104,14 +105,145 @@ class TestRidge(ut.TestCase):
         fit_obj4.fit(Z_train, t_train)
         score4 = fit_obj4.score(Z_test, t_test)
 
-        self.assertTrue(np.allclose(score1, 0.9649122807017544))
+        self.assertTrue(np.allclose(score1, 0.9912280701754386))
 
-        self.assertTrue(np.allclose(score2, 0.94736842105263153))
+        self.assertTrue(np.allclose(score2, 0.9912280701754386))
 
         self.assertTrue(np.allclose(score3, 1.0))
 
         self.assertTrue(np.allclose(score4, 0.9722222222222222))
 
+    def test_solvers(self):
+
+        X, y = load_wine(return_X_y=True)
+
+        fit_obj = ns.Ridge2MultitaskClassifier(
+            n_hidden_features=50, n_clusters=2, solver="cholesky"
+        ).fit(X, y)
+        fit_obj2 = ns.Ridge2MultitaskClassifier(
+            n_hidden_features=50, n_clusters=2, solver="pinv"
+        ).fit(X, y)
+
+        self.assertTrue(
+            (fit_obj.beta.shape == (65, 3))
+            & np.allclose(fit_obj.beta, fit_obj2.beta)
+            & np.allclose(fit_obj.predict_proba(X), fit_obj2.predict_proba(X))
+        )
+
+    def test_hessian(self):
+
+        X, y = load_wine(return_X_y=True)
+
+        fit_obj = ns.Ridge2Classifier(n_hidden_features=10)
+        _, scaled_Z = fit_obj.cook_training_set(y=y, X=X)
+        _, grad_func, hessian_func = fit_obj.loglik(
+            X=scaled_Z, Y=np.eye(3)[y]
+        )
+
+        x = 0.1 * np.random.RandomState(123).randn(scaled_Z.shape[1] * 3)
+        v = np.random.RandomState(456).randn(scaled_Z.shape[1] * 3)
+        hess = hessian_func(x)
+        # finite differences of the gradient, along v
+        fd_hessp = (grad_func(x + 1e-6 * v) - grad_func(x - 1e-6 * v)) / 2e-6
+
+        fit_obj2 = ns.Ridge2Classifier(n_hidden_features=10).fit(
+            X, y, solver="Newton-CG"
+        )
+        fit_obj3 = ns.Ridge2Classifier(n_hidden_features=10).fit(
+            X, y, solver="trust-exact"
+        )
+
+        self.assertTrue(
+            (hess.shape == (75, 75))
+            & np.allclose(hess, hess.T)
+            & np.allclose(hessian_func(x, v), np.dot(hess, v))
+            & np.allclose(hessian_func(x, v), fd_hessp, atol=1e-6)
+            & (fit_obj2.score(X, y) > 0.9)
+            & (fit_obj3.score(X, y) > 0.9)
+        )
+
+    def test_loglik_and_grad(self):
+
+        X, y = load_wine(return_X_y=True)
+
+        fit_obj = ns.Ridge2Classifier(n_hidden_features=10)
+        _, scaled_Z = fit_obj.cook_training_set(y=y, X=X)
+        loglik_func, grad_func, _ = fit_obj.loglik(X=scaled_Z, Y=np.eye(3)[y])
+        loglik_grad_func = fit_obj.loglik_and_grad(X=scaled_Z, Y=np.eye(3)[y])
+
+        x = np.random.RandomState(123).randn(scaled_Z.shape[1] * 3)
+        x2 = np.random.RandomState(456).randn(scaled_Z.shape[1] * 3)
+        res = loglik_grad_func(x)
+        res2 = loglik_grad_func(x2)  # buffers are reused
+        fd_grad = approx_fprime(x, lambda z: loglik_grad_func(z)[0], 1e-7)
+
+        self.assertTrue(
+            np.allclose(res[0], loglik_func(x))
+            & np.allclose(res[1], grad_func(x))
+            & np.allclose(res2[0], loglik_func(x2))
+            & np.allclose(res2[1], grad_func(x2))
+            & np.allclose(res[1], fd_grad, atol=1e-5)
+        )
+
+    def test_warm_start(self):
+
+        X, y = load_wine(return_X_y=True)
+
+        fit_obj = ns.Ridge2Classifier(n_hidden_features=10).fit(X, y)
+        beta = fit_obj.beta.copy()
+        fit_obj.set_params(warm_start=True, lambda1=0.11).fit(X, y)
+        fit_obj2 = ns.Ridge2Classifier(
+            n_hidden_features=10, warm_start=True
+        ).fit(X, y)
+
+        self.assertTrue(
+            (fit_obj.beta.shape == beta.shape)
+            & (fit_obj.score(X, y) > 0.9)
+            & np.allclose(fit_obj2.beta, beta)  # nothing to warm start from
+        )
+
+    def test_partial_fit(self):
+
+        X, y = load_wine(return_X_y=True)
+        chunks = np.array_split(np.argsort(y, kind="stable"), 4)  # by class
+
+        fit_obj = ns.Ridge2MultitaskClassifier(n_hidden_features=10)
+        fit_obj.partial_fit(X[chunks[0]], y[chunks[0]], classes=[0, 1, 2])
+        for chunk in chunks[1:]:
+            fit_obj.partial_fit(X[chunk], y[chunk])
+        fit_obj.finalize()
+
+        fit_obj2 = ns.Ridge2MultitaskClassifier(n_hidden_features=10)
+        fit_obj2.partial_fit(X[chunks[0]], y[chunks[0]])  # class 0 only
+
+        with self.assertRaises(ValueError):
+            fit_obj2.partial_fit(X[chunks[-1]], y[chunks[-1]])
+
+        with self.assertRaises(ValueError):  # class 2 only
+            ns.Ridge2MultitaskClassifier().partial_fit(
+                X[chunks[-1]], y[chunks[-1]]
+            )
+
+        self.assertTrue(
+            (fit_obj.beta.shape[1] == 3) & (fit_obj.score(X, y) > 0.9)
+        )
+
+    def test_float32(self):
+
+        X, y = load_wine(return_X_y=True)
+
+        with ns.config_context(dtype="float32"):
+            fit_obj = ns.Ridge2Classifier(n_hidden_features=10).fit(X, y)
+            fit_obj2 = ns.Ridge2Classifier(n_hidden_features=10).fit(
+                X, y, solver="Newton-CG"
+            )
+            score = fit_obj.score(X, y)
+            score2 = fit_obj2.score(X, y)
+
+        self.assertTrue(
+            (fit_obj.beta.dtype == np.float32) & (score > 0.9) & (score2 > 0.9)
+        )
+
 
 if __name__ == "__main__":
     ut.main()
@@ -295,6 +295,170 @@ class TestRidge2Regressor(ut.TestCase):
             & np.allclose(fit_obj.score(X, y), 0.22156888076856565)
         )
 
+    def test_sparse(self):
+
+        from scipy import sparse
+
+        X = sparse.random(200, 50, density=0.05, format="csr", random_state=123)
+        y = X @ np.arange(50) + 0.1 * np.random.RandomState(123).randn(200)
+
+        fit_obj = ns.Ridge2Regressor(
+            n_hidden_features=5, n_clusters=2, lambda1=0.01, lambda2=0.01
+        )
+
+        centered_y, scaled_Z = fit_obj.cook_training_set(y=y, X=X)
+        preds_sparse = fit_obj.fit(X, y).predict(X)
+        preds_dense = fit_obj.fit(X.toarray(), y).predict(X.toarray())
+
+        # without direct link, the design matrix is the (dense) hidden layer
+        fit_obj2 = ns.BaseRegressor(
+            n_hidden_features=5, n_clusters=2, direct_link=False
+        )
+        _, scaled_Z2 = fit_obj2.cook_training_set(y=y, X=X)
+        preds_sparse2 = fit_obj2.fit(X, y).predict(X)
+
+        self.assertTrue(
+            sparse.issparse(scaled_Z)
+            & (scaled_Z.shape == (200, 57))
+            & (not sparse.issparse(scaled_Z2))
+            & (scaled_Z2.shape == (200, 5))
+            & np.all(np.isfinite(preds_sparse2))
+            & (preds_sparse2.shape == (200,))
+            & (
+                np.sqrt(np.mean((preds_sparse - y) ** 2))
+                < 2 * np.sqrt(np.mean((preds_dense - y) ** 2))
+            )
+        )
+
+    def test_fit_path(self):
+
+        X, y = datasets.make_regression(
+            n_samples=100, n_features=4, noise=5, random_state=123
+        )
+
+        fit_obj = ns.Ridge2Regressor(n_hidden_features=10, n_clusters=2)
+        path = fit_obj.fit_path(X, y, lambda1s=[0.01, 1], lambda2s=[0.1, 10])
+        fit_obj2 = ns.Ridge2Regressor(
+            n_hidden_features=10, n_clusters=2, lambda1=1, lambda2=0.1
+        ).fit(X, y)
+
+        self.assertTrue(
+            (path["beta"].shape == (2, 2, 16))
+            & (path["GCV"].shape == (2, 2))
+            & np.allclose(path["beta"][1, 0], fit_obj2.beta)
+            & np.allclose(path["GCV"].min(), path["GCV"][
+                list(path["lambda1"]).index(fit_obj.lambda1_),
+                list(path["lambda2"]).index(fit_obj.lambda2_),
+            ])
+            & (fit_obj.lambda1 == 0.1)  # parameters left as is
+            & (fit_obj.lambda2 == 0.1)
+        )
+
+    def test_fit_path_multi_target(self):
+
+        X, Y = datasets.make_regression(
+            n_samples=100, n_features=4, n_targets=3, noise=5, random_state=123
+        )
+
+        fit_obj = ns.Ridge2Regressor(n_hidden_features=10, n_clusters=2)
+        path = fit_obj.fit_path(X, Y, lambda1s=[0.01, 1], lambda2s=[0.1, 10])
+        path2 = ns.Ridge2Regressor(n_hidden_features=10, n_clusters=2).fit_path(
+            X, Y[:, 1], lambda1s=[0.01, 1], lambda2s=[0.1, 10]
+        )
+        i = list(path["lambda1"]).index(fit_obj.lambda1_)
+        j = list(path["lambda2"]).index(fit_obj.lambda2_)
+
+        self.assertTrue(
+            (path["beta"].shape == (2, 2, 16, 3))
+            & (path["GCV"].shape == (2, 2, 3))
+            & (fit_obj.beta.shape == (16, 3))
+            & np.allclose(path["beta"][..., 1], path2["beta"])
+            & np.allclose(path["GCV"][..., 1], path2["GCV"])
+            & np.allclose(path["GCV"].sum(axis=2).min(), path["GCV"][i, j].sum())
+            & (fit_obj.predict(X).shape == (100, 3))
+        )
+
+
+    def test_solvers(self):
+
+        X, y = datasets.make_regression(
+            n_samples=100, n_features=4, noise=5, random_state=123
+        )
+
+        preds = [
+            ns.Ridge2Regressor(n_hidden_features=30, lambda2=lambda2, solver=solver)
+            .fit(X, y)
+            .predict(X)
+            for lambda2 in (0.1, 0)  # lambda2=0: singular system
+            for solver in ("cholesky", "pinv")
+        ]
+
+        # more coefficients than samples: dual system
+        fit_obj = ns.Ridge2Regressor(n_hidden_features=150).fit(X, y)
+        fit_obj2 = ns.Ridge2Regressor(n_hidden_features=150, solver="pinv").fit(
+            X, y
+        )
+
+        self.assertTrue(
+            np.allclose(preds[0], preds[1])
+            & np.allclose(preds[2], preds[3])
+            & np.allclose(fit_obj.beta, fit_obj2.beta)
+        )
+
+    def test_partial_fit(self):
+
+        X, y = datasets.make_regression(
+            n_samples=300, n_features=5, noise=5, random_state=123
+        )
+
+        fit_obj = ns.Ridge2Regressor(n_hidden_features=20).fit(X, y)
+        fit_obj2 = ns.Ridge2Regressor(n_hidden_features=20)
+        fit_obj2.partial_fit(X, y).finalize()
+
+        # preprocessing frozen after the first chunk
+        fit_obj3 = ns.Ridge2Regressor(n_hidden_features=20)
+        for i in range(3):
+            fit_obj3.partial_fit(X[i::3], y[i::3])
+        fit_obj3.finalize()
+        X_, Phi_X_ = fit_obj3.split_design(X, fit_obj3.cook_test_set(X))
+        beta = fit_obj3.solve(X_, Phi_X_, y - np.mean(y))
+
+        # features with a large offset (e.g timestamps)
+        X4 = X + 1e8
+        fit_obj4 = ns.Ridge2Regressor(n_hidden_features=20).fit(X4, y)
+        fit_obj5 = ns.Ridge2Regressor(n_hidden_features=20)
+        fit_obj5.partial_fit(X4, y).finalize()
+
+        self.assertTrue(
+            np.allclose(fit_obj.predict(X), fit_obj2.predict(X))
+            & np.allclose(fit_obj3.y_mean, np.mean(y))
+            & np.allclose(fit_obj3.beta, beta)
+            & np.allclose(fit_obj4.predict(X4), fit_obj5.predict(X4))
+        )
+
+    def test_multi_target(self):
+
+        X, Y = datasets.make_regression(
+            n_samples=100, n_features=4, n_targets=3, noise=5, random_state=123
+        )
+
+        fit_obj = ns.Ridge2Regressor(n_hidden_features=10).fit(X, Y)
+        preds = np.column_stack(
+            [
+                ns.Ridge2Regressor(n_hidden_features=10)
+                .fit(X, Y[:, j])
+                .predict(X)
+                for j in range(3)
+            ]
+        )
+
+        self.assertTrue(
+            (fit_obj.beta.shape == (16, 3))
+            & (fit_obj.predict(X).shape == (100, 3))
+            & (fit_obj.predict(X[0, :]).shape == (3,))
+            & np.allclose(fit_obj.predict(X), preds)
+        )
+
 
 if __name__ == "__main__":
     ut.main()
@@ -235,6 +235,168 @@ class TestRVFL(ut.TestCase):
             & np.allclose(fit_obj4.score(X, y), 0.17517631177933579)
         )
 
+    def test_optimize_hyper(self):
+
+        np.random.seed(123)
+        X, y = datasets.make_regression(n_samples=50, n_features=3, noise=5)
+
+        fit_obj = ns.BayesianRVFLRegressor(n_hidden_features=10, n_clusters=0)
+        fit_obj2 = ns.BayesianRVFL2Regressor(
+            n_hidden_features=10, direct_link=True, n_clusters=0
+        )
+
+        for obj in (fit_obj, fit_obj2):
+            hyper = ("s", "sigma") if obj is fit_obj else ("s1", "s2", "sigma")
+            GCV = obj.fit(X, y).GCV
+            params = [getattr(obj, k) for k in hyper]
+            obj.fit(X, y, optimize_hyper=True)
+            # same posterior as a standard fit with the optimal scales
+            obj_ = obj.__class__(
+                n_hidden_features=10,
+                n_clusters=0,
+                **{k: getattr(obj, k + "_") for k in hyper}
+            ).fit(X, y)
+            self.assertTrue(
+                ([getattr(obj, k) for k in hyper] == params)  # left alone
+                & np.allclose(obj.beta, obj_.beta, atol=1e-4)
+                & np.allclose(obj.Sigma, obj_.Sigma)
+                & np.allclose(obj.GCV, obj_.GCV)
+                & (obj.GCV < GCV)
+            )
+
+        # noiseless data: the evidence keeps increasing when sigma goes to
+        # 0, but sigma is bounded below
+        X, y = datasets.make_regression(n_samples=50, n_features=3)
+
+        for obj in (fit_obj, fit_obj2):
+            obj.fit(X, y, optimize_hyper=True)
+            _, std = obj.predict(X, return_std=True)
+            self.assertTrue(
+                np.all(np.isfinite(std))
+                & np.all(np.isfinite(obj.beta))
+                & (obj.sigma_ > 1e-7 * np.std(y))
+                & (obj.sigma_ < 1e-2 * np.std(y))
+            )
+
+    def test_preds_std(self):
+
+        np.random.seed(123)
+        X, y = datasets.make_regression(n_samples=60, n_features=3, noise=5)
+
+        # same prior on all the coefficients: same model
+        fit_obj = ns.BayesianRVFLRegressor(
+            n_hidden_features=10, n_clusters=0, s=10, sigma=5
+        ).fit(X[:50], y[:50])
+        fit_obj2 = ns.BayesianRVFL2Regressor(
+            n_hidden_features=10, n_clusters=0, s1=10, s2=10, sigma=5
+        ).fit(X[:50], y[:50])
+
+        preds, std = fit_obj.predict(X[50:], return_std=True)
+        preds2, std2 = fit_obj2.predict(X[50:], return_std=True)
+        _, std2_1 = fit_obj2.predict(X[50], return_std=True)
+
+        self.assertTrue(
+            np.allclose(preds, preds2)
+            & np.allclose(std, std2)
+            & np.allclose(std2_1, std2[0])
+            & np.all(std2 > 5)  # includes the residuals' std. dev.
+        )
+
+    def test_update(self):
+
+        np.random.seed(123)
+        X, y = datasets.make_regression(n_samples=60, n_features=3, noise=5)
+
+        fit_obj = ns.BayesianRVFLRegressor(
+            n_hidden_features=10, direct_link=False, n_clusters=0, s=10, sigma=5
+        )
+        fit_obj2 = ns.BayesianRVFL2Regressor(
+            n_hidden_features=10, direct_link=False, n_clusters=0, s2=10, sigma=5
+        )
+
+        for obj in (fit_obj, fit_obj2):
+            obj.fit(X[:40], y[:40])
+            obj.update(X[40:50], y[40:50]).update(X[50], y[50])
+            obj.update(X[51:], y[51:])
+            # same posterior as a fit on all the rows, with frozen preprocessing
+            fit_all = ns.utils.lmfuncs.beta_Sigma_hat_rvfl(
+                X=obj.cook_test_set(X), y=y - obj.y_mean, s=10, sigma=5
+            )
+            beta, Sigma = obj.beta, obj.Sigma
+            obj.update(X[51:], y[51:], forgetting_factor=0.5)
+            self.assertTrue(
+                np.allclose(beta, fit_all["beta_hat"])
+                & np.allclose(Sigma, fit_all["Sigma_hat"])
+                & (np.trace(obj.Sigma) > np.trace(Sigma) / 2)
+            )
+
+    def test_low_rank_cov(self):
+
+        np.random.seed(123)
+        X, y = datasets.make_regression(n_samples=50, n_features=3, noise=5)
+
+        fit_obj = ns.BayesianRVFL2Regressor(
+            n_hidden_features=100, s1=10, s2=3, sigma=5
+        ).fit(X[:30], y[:30])
+        fit_obj2 = ns.BayesianRVFL2Regressor(
+            n_hidden_features=100, s1=10, s2=3, sigma=5, low_rank_cov=True
+        ).fit(X[:30], y[:30])
+        fit_obj3 = ns.BayesianRVFL2Regressor(
+            n_hidden_features=100,
+            s1=10,
+            s2=3,
+            sigma=5,
+            low_rank_cov=True,
+            cov_rank=10,
+        ).fit(X[:30], y[:30])
+
+        preds = fit_obj.predict(X[30:], return_std=True)
+        preds2 = fit_obj2.predict(X[30:], return_std=True)
+        preds3 = fit_obj3.predict(X[30:], return_std=True)
+        fit_obj.update(X[30:], y[30:])
+        fit_obj2.update(X[30:], y[30:])
+
+        self.assertTrue(
+            np.allclose(preds[0], preds2[0])
+            & np.allclose(preds[1], preds2[1])
+            & np.allclose(fit_obj.GCV, fit_obj2.GCV)
+            & np.allclose(fit_obj.beta, fit_obj2.beta)
+            & np.allclose(fit_obj.Sigma, fit_obj2.Sigma.toarray())
+            & (fit_obj2.Sigma.rank == 50)
+            & (fit_obj3.Sigma.rank == 10)
+            & np.all(preds3[1] >= preds2[1] - 1e-8)
+        )
+
+    def test_sample_posterior_predictive(self):
+
+        np.random.seed(123)
+        X, y = datasets.make_regression(n_samples=50, n_features=3, noise=5)
+
+        fit_obj = ns.BayesianRVFL2Regressor(
+            n_hidden_features=20, s1=10, s2=3, sigma=5
+        ).fit(X[:40], y[:40])
+        fit_obj2 = ns.BayesianRVFL2Regressor(
+            n_hidden_features=20, s1=10, s2=3, sigma=5, low_rank_cov=True
+        ).fit(X[:40], y[:40])
+
+        preds = fit_obj.predict(X[40:], return_std=True)
+        # std. dev. of the regression function (without the residuals')
+        std_f = np.sqrt(preds[1] ** 2 - 5 ** 2)
+
+        for obj in (fit_obj, fit_obj2):
+            draws = obj.sample_posterior_predictive(
+                X[40:], n_samples=20000, chunk_size=3
+            )
+            self.assertTrue(
+                (draws.shape == (10, 20000))
+                & np.allclose(draws.mean(axis=1), preds[0], rtol=0.05)
+                & np.allclose(draws.std(axis=1), std_f, rtol=0.05)
+                & np.allclose(
+                    obj.sample_posterior_predictive(X[40:], n_samples=5),
+                    obj.sample_posterior_predictive(X[40:], n_samples=5),
+                )
+            )
+
 
 if __name__ == "__main__":
     ut.main()
@@ -1,4 +1,5 @@
 import nnetsauce.simulation.nodesimulation as nsim
+from nnetsauce.simulator import Simulator, nodes_cache
 import unittest as ut
 
 
@@ -22,6 +23,19 @@ class TestSimul(ut.TestCase):
         res = nsim.generate_uniform(n_dims=3, n_points=10, seed=123)
         self.assertAlmostEqual(res[2, 2], 0.72445532486063524)
 
+    def test_simulator_cache(self):
+        nodes_cache.clear()
+        res1 = Simulator(n_points=7, n_dims=3, type_sim="halton").draw()
+        res2 = Simulator(n_points=7, n_dims=3, type_sim="halton").draw()
+        res3 = Simulator(n_points=7, n_dims=4, type_sim="halton").draw()
+        self.assertTrue(
+            (res1 is res2)
+            & (res3.shape == (4, 7))
+            & (not res1.flags.writeable)
+            & (nodes_cache.hits == 1)
+            & (nodes_cache.misses == 2)
+        )
+
 
 if __name__ == "__main__":
     ut.main()
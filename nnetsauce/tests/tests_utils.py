@@ -1,10 +1,13 @@
 import numpy as np
 from sklearn import datasets
+from scipy import sparse
+import nnetsauce as ns
 import nnetsauce.utils.psdcheck as psdx
 import nnetsauce.utils.matrixops as mo
 import nnetsauce.utils.misc as mx
 import nnetsauce.utils.lmfuncs as lmf
 import nnetsauce.utils.timeseries as ts
+from nnetsauce.utils.lrucache import LRUCache
 import unittest as ut
 
 
@@ -44,6 +47,65 @@ class TestUtils(ut.TestCase):
             )
         )
 
+    def test_center_response(self):
+        # same first and last values: same str() when elided by numpy
+        Y = np.zeros((2000, 2))
+        Y2 = Y.copy()
+        Y2[1000, :] = 2000
+        y_mean, centered_y = mo.center_response(Y)
+        y_mean2, centered_y2 = mo.center_response(Y2)
+        self.assertTrue(
+            np.allclose(y_mean, 0)
+            & np.allclose(y_mean2, 1)
+            & np.allclose(centered_y2, Y2 - 1)
+        )
+
+    def test_scale_covariates_inplace(self):
+        np.random.seed(123)
+        A = np.random.rand(20, 3)
+        for choice in ("std", "minmax"):
+            B = A.copy()
+            scaler, scaled_A = mo.scale_covariates(A, choice=choice)
+            scaler2, scaled_B = mo.scale_covariates(B, choice=choice, copy=False)
+            self.assertTrue(
+                np.allclose(scaled_A, scaled_B)
+                & (scaled_B is B)
+                & np.allclose(scaler.transform(A), scaler2.transform(A))
+            )
+
+    def test_lrucache(self):
+        cache = LRUCache(max_bytes=2 * 80)
+        for key in ("a", "b", "c"):
+            cache.put(key, np.zeros(10))
+        cache.get("b")
+        cache.put("d", np.zeros(10))
+        self.assertTrue(
+            ("b" in cache)
+            & ("d" in cache)
+            & (len(cache) == 2)
+            & (cache.get("a") is None)
+            & (cache.hits == 1)
+            & (cache.misses == 1)
+        )
+
+    def test_cluster_covariates_max_rows(self):
+        X, _ = datasets.make_blobs(
+            n_samples=2000, n_features=3, centers=3, random_state=123
+        )
+        _, labels = mo.cluster_covariates(X, 3, 123, type_clust="kmeans")
+        res = [
+            mo.cluster_covariates(X, 3, 123, type_clust=type_clust, max_rows=100)
+            for type_clust in ("kmeans", "minibatchkmeans", "gmm")
+        ]
+        # same partitions, up to the labels' permutation
+        self.assertTrue(
+            all(
+                (len(labels_) == 2000)
+                & (len(set(zip(labels, labels_))) == 3)
+                for _, labels_ in res
+            )
+        )
+
     # 2 - tests misc
 
     def test_merge_two_dicts(self):
@@ -98,6 +160,97 @@ class TestUtils(ut.TestCase):
             )
         )
 
+    def test_lmf_factorizations(self):
+        np.random.seed(123)
+        X = np.random.randn(20, 4)
+        y = np.random.randn(20)
+        A = np.random.randn(4, 4)
+        Sigma = np.dot(A, A.T) + np.eye(4)  # non-diagonal prior
+        beta, Cn = lmf.beta_inv_penalized_cov(X, y, lam=0.5)
+        Cn_rvfl2 = np.linalg.inv(np.dot(Sigma, X.T @ X) + 0.09 * np.eye(4))
+        self.assertTrue(
+            np.allclose(Cn, np.linalg.inv(X.T @ X + 0.5 * np.eye(4)))
+            & np.allclose(beta, np.dot(Cn, X.T @ y))
+            & np.allclose(
+                lmf.rvfl2_cov(X, Sigma, sigma=0.3), np.dot(Cn_rvfl2, Sigma)
+            )
+            & np.allclose(
+                lmf.rvfl2_cov(X, np.diag([1.0, 2.0, 3.0, 4.0]), sigma=0.3),
+                np.dot(
+                    np.linalg.inv(
+                        np.dot(np.diag([1.0, 2.0, 3.0, 4.0]), X.T @ X)
+                        + 0.09 * np.eye(4)
+                    ),
+                    np.diag([1.0, 2.0, 3.0, 4.0]),
+                ),
+            )
+        )
+
+    def test_lmf_dual(self):
+        np.random.seed(123)
+        X = np.random.randn(10, 30)  # more features than samples
+        y = np.random.randn(10)
+        A = X.T @ X + 0.5 * np.eye(30)
+        beta, Cn = lmf.beta_inv_penalized_cov(X, y, lam=0.5)
+        self.assertTrue(
+            np.allclose(lmf.beta_hat(X, y, lam=0.5), np.linalg.solve(A, X.T @ y))
+            & np.allclose(lmf.beta_hat(X, y), np.linalg.pinv(X) @ y)
+            & np.allclose(lmf.inv_penalized_cov(X, lam=0.5), np.linalg.inv(A))
+            & np.allclose(Cn, np.linalg.inv(A))
+            & np.allclose(
+                lmf.rvfl2_cov(X, np.eye(30), sigma=0.3),
+                np.linalg.inv(X.T @ X + 0.09 * np.eye(30)),
+            )
+        )
+
+    def test_lmf_rank_deficient(self):
+        np.random.seed(123)
+        X = np.random.randn(20, 4)
+        # centered one-hot columns: they sum to zero
+        onehot = np.eye(2)[np.arange(20) % 2]
+        X = np.column_stack((X, onehot - onehot.mean(axis=0)))
+        y = np.random.randn(20)
+        beta = np.linalg.pinv(X) @ y
+        self.assertTrue(
+            np.allclose(lmf.beta_hat(X, y), beta)
+            & np.allclose(lmf.beta_hat(sparse.csr_matrix(X), y), beta)
+            & np.allclose(lmf.beta_hat_cov(X.T @ X, X.T @ y), beta)
+            & np.allclose(
+                lmf.beta_hat(X, y, lam=1e-20), beta, rtol=1e-4, atol=1e-6
+            )
+        )
+
+    def test_lmf_preds_std(self):
+        np.random.seed(123)
+        X = np.random.randn(50, 4)
+        A = np.random.randn(4, 4)
+        Sigma = np.dot(A, A.T)
+        std = np.sqrt(np.diag(X @ Sigma @ X.T) + 0.09)
+        with ns.config_context(working_memory=1e-4):  # blocks of 3 rows
+            std_chunks = lmf.preds_std(X, Sigma, sigma=0.3)
+        self.assertTrue(
+            np.allclose(lmf.preds_std(X, Sigma, sigma=0.3), std)
+            & np.allclose(std_chunks, std)
+            & np.allclose(
+                lmf.preds_std(sparse.csr_matrix(X), Sigma), np.sqrt(std ** 2 - 0.09)
+            )
+        )
+
+    def test_lmf_gcv(self):
+        np.random.seed(123)
+        X = np.random.randn(20, 4)
+        y = np.random.randn(20)
+        M = np.linalg.inv(X.T @ X + 0.5 * np.eye(4))
+        smoothing_matrix = X @ M @ X.T
+        gcv = np.mean(
+            ((y - smoothing_matrix @ y) / (1 - np.trace(smoothing_matrix) / 20))
+            ** 2
+        )
+        self.assertTrue(
+            np.allclose(lmf.effective_df(X, M), np.trace(smoothing_matrix))
+            & np.allclose(lmf.gcv(X, y, M), gcv)
+        )
+
     # 5 - MTS
 
     def test_MTS_train_inputs(self):
@@ -1,4 +1,5 @@
 from .lmfuncs import beta_hat, inv_penalized_cov
+from .lowrankcov import LowRankCov
 from .matrixops import cbind, rbind, crossprod, tcrossprod, to_np_array
 from .memoize import memoize
 from .misc import merge_two_dicts, is_factor
@@ -11,6 +12,7 @@ from .timeseries import create_lags, create_train_inputs, reformat_response
 __all__ = [
     "beta_hat",
     "inv_penalized_cov",
+    "LowRankCov",
     "cbind",
     "rbind",
     "crossprod",
@@ -1,31 +1,45 @@
 import numpy as np
 
 
-def relu(x):
-    return np.maximum(x, 0)
+def relu(x, out=None):
+    return np.maximum(x, 0, out=out)
 
 
-def sigmoid(x):
-    return np.exp(-np.logaddexp(0, -x))
+def sigmoid(x, out=None):
+    # exp(-logaddexp(0, -x)), computed in `out` when provided
+    res = np.negative(x, out=out)
+    np.logaddexp(0, res, out=res)
+    np.negative(res, out=res)
+    return np.exp(res, out=res)
 
 
-def prelu(x, a=None):
+def prelu(x, a=None, out=None):
 
     if a is not None:
-        y = x.copy()
-        index = x < 0
-        y[index] = a * x[index]
+        if out is None:
+            y = x.copy()
+        else:
+            y = out
+            if y is not x:
+                y[...] = x
+        index = y < 0
+        y[index] *= a
         return y
     else:
         raise NotImplementedError
 
 
-def elu(x, a=None):
+def elu(x, a=None, out=None):
 
     if a is not None:
-        y = x.copy()
-        index = x < 0
-        y[index] = a * (np.exp(x[index]) - 1)
+        if out is None:
+            y = x.copy()
+        else:
+            y = out
+            if y is not x:
+                y[...] = x
+        index = y < 0
+        y[index] = a * (np.exp(y[index]) - 1)
         return y
     else:
         raise NotImplementedError
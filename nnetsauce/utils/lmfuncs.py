@@ -1,18 +1,85 @@
 import numpy as np
 import platform
 from numpy import linalg as la
-if platform.system() in ('Linux', 'Darwin'):
-    import jax.numpy as jnp
-    from jax.numpy import linalg as jla
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve, lapack, solve_triangular
+from scipy.optimize import minimize
+from sklearn.utils import gen_batches, get_chunk_n_rows
+from .._config import get_config
+from .lowrankcov import LowRankCov
 
 # import .matrixops as mo
 from . import matrixops as mo
 
 
+# Cholesky factor of the symmetric matrix a, in double precision
+# (None when a is not numerically positive definite)
+def cholesky_factor(a):
+    try:
+        return cho_factor(
+            np.asarray(a, dtype=np.float64), lower=True, check_finite=False
+        )
+    except la.LinAlgError:
+        return None
+
+
+# Cholesky factor of the symmetric matrix a, in double precision, when a is
+# well conditioned: None when its reciprocal condition number (1-norm,
+# estimated from the factor) is below n*eps, since cho_factor succeeds on
+# numerically singular matrices
+def cholesky_factor_cond(a):
+    a = np.asarray(a, dtype=np.float64)
+    c = cholesky_factor(a)
+    if c is None:
+        return None
+    rcond, info = lapack.dpocon(
+        c[0], la.norm(a, 1), uplo="L" if c[1] else "U"
+    )
+    if (info != 0) or (rcond < a.shape[0] * np.finfo(np.float64).eps):
+        return None
+    return c
+
+
+# inverse of a symmetric positive definite matrix, from its Cholesky factor
+def cho_inv(c):
+    inv_, info = lapack.dpotri(c[0], lower=c[1])
+    if info != 0:
+        raise la.LinAlgError("dpotri failed (info=%d)" % info)
+    # dpotri only fills the lower triangle
+    return np.tril(inv_) + np.tril(inv_, -1).T
+
+
+# penalized Gram matrix t(x)%*%x + lam*I, in double precision
+def penalized_cov(x, lam=None):
+    res = mo.crossprod(x).astype(np.float64)
+    if lam is not None:
+        res[np.diag_indices_from(res)] += lam
+    return res
+
+
+# penalized kernel matrix x%*%t(x) + lam*I (dual form), in double precision
+def penalized_kernel(x, lam=None):
+    res = mo.tcrossprod(x).astype(np.float64)
+    if lam is not None:
+        res[np.diag_indices_from(res)] += lam
+    return res
+
+
 # computes beta_hat = (t(x)%*%x + lam*I)^{-1}%*%t(x)%*%y
 def beta_hat(x, y, lam=None, backend="cpu"):
 
     # assert on dimensions
+    if backend == "cpu":
+        if lam is None:  # minimum norm least squares solution
+            return beta_hat_lstsq(x=x, y=y)
+        if x.shape[1] > x.shape[0]:  # more features than samples
+            return beta_hat_dual(x=x, y=y, lam=lam)
+        # solves the normal equations, without forming the inverse (least
+        # squares solution when they are not well conditioned)
+        return beta_hat_cov(
+            cov=penalized_cov(x), xy=mo.crossprod(x=x, y=y), lam=lam
+        ).astype(x.dtype, copy=False)
+
     if lam is None:
         return mo.safe_sparse_dot(
             a=inv_penalized_cov(x=x, backend=backend),
@@ -27,20 +94,377 @@ def beta_hat(x, y, lam=None, backend="cpu"):
     )
 
 
+# minimum norm least squares solution of x%*%beta = y, in double precision,
+# without squaring the condition number of x (but from t(x)%*%x, whose
+# minimum norm solution is the same, when x is sparse)
+def beta_hat_lstsq(x, y):
+    y = np.asarray(y, dtype=np.float64)
+    if sparse.issparse(x):
+        res = la.lstsq(penalized_cov(x), mo.crossprod(x=x, y=y), rcond=None)
+    else:
+        res = la.lstsq(np.asarray(x, dtype=np.float64), y, rcond=None)
+    return res[0].astype(x.dtype, copy=False)
+
+
+# computes beta_hat = t(x)%*%(x%*%t(x) + lam*I)^{-1}%*%y, the dual form of
+# beta_hat (an n x n system, instead of p x p); without penalty, the minimum
+# norm least squares solution
+def beta_hat_dual(x, y, lam=None):
+    kernel = penalized_kernel(x, lam)
+    c = cholesky_factor(kernel)
+    y = np.asarray(y, dtype=np.float64)
+    alpha = (
+        la.lstsq(kernel, y, rcond=None)[0]
+        if c is None
+        else cho_solve(c, y, check_finite=False)
+    )
+    return mo.crossprod(x=x, y=alpha).astype(x.dtype, copy=False)
+
+
+# computes beta_hat = (cov + lam*I)^{-1}%*%xy from the cross-products
+# cov = t(x)%*%x and xy = t(x)%*%y (e.g accumulated over chunks of rows),
+# in double precision; least squares solution when cov + lam*I is not well
+# conditioned
+def beta_hat_cov(cov, xy, lam=None):
+    cov_ = np.array(cov, dtype=np.float64)
+    if lam is not None:
+        cov_[np.diag_indices_from(cov_)] += lam
+    xy = np.asarray(xy, dtype=np.float64)
+    c = cholesky_factor_cond(cov_)
+    if c is None:
+        return la.lstsq(cov_, xy, rcond=None)[0]
+    return cho_solve(c, xy, check_finite=False)
+
+
+# (t(x)%*%x + lam*I)^{-1} = (I - t(x)%*%(x%*%t(x) + lam*I)^{-1}%*%x)/lam 
+# (Woodbury), in O(n^2p + np^2) instead of O(p^3) when x has more columns 
+# than rows; c is the Cholesky factor of x%*%t(x) + lam*I
+def inv_penalized_cov_dual(x, lam, c):
+    res = -mo.crossprod(
+        x=x,
+        y=cho_solve(
+            c,
+            x.toarray() if sparse.issparse(x) else np.asarray(x, np.float64),
+            check_finite=False,
+        ),
+    )
+    res[np.diag_indices_from(res)] += 1
+    return res / lam
+
+
 # computes (t(x)%*%x + lam*I)^{-1}
 def inv_penalized_cov(x, lam=None, backend="cpu"):
     # assert on dimensions
     sys_platform = platform.system()
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
+        import jax.numpy as jnp
+        from jax.numpy import linalg as jla
+
         if lam is None:
             return jla.inv(mo.crossprod(x=x, backend=backend))
         return jla.inv(
             mo.crossprod(x=x, backend=backend) + lam * jnp.eye(x.shape[1])
         )
 
-    if lam is None:
-        return la.inv(mo.crossprod(x))
-    return la.inv(mo.crossprod(x) + lam * np.eye(x.shape[1]))
+    if (lam is not None) and (lam > 0) and (x.shape[1] > x.shape[0]):
+        c = cholesky_factor(penalized_kernel(x, lam))
+        if c is not None:
+            return inv_penalized_cov_dual(x, lam, c).astype(
+                x.dtype, copy=False
+            )
+
+    # the Gram matrix is computed in x's precision, and inverted in double
+    # precision: from its Cholesky factor, or with la.inv when it is not
+    # numerically positive definite
+    cov_ = penalized_cov(x, lam)
+    c = cholesky_factor(cov_)
+    return (la.inv(cov_) if c is None else cho_inv(c)).astype(
+        x.dtype, copy=False
+    )
+
+
+# ridge coefficients and (t(x)%*%x + lam*I)^{-1}, from one factorization of
+# the penalized Gram matrix
+def beta_inv_penalized_cov(x, y, lam=None, backend="cpu"):
+
+    if (
+        (backend == "cpu")
+        and (lam is not None)
+        and (lam > 0)
+        and (x.shape[1] > x.shape[0])
+    ):  # more features than samples: n x n factorization
+        c = cholesky_factor(penalized_kernel(x, lam))
+        if c is not None:
+            alpha = cho_solve(
+                c, np.asarray(y, dtype=np.float64), check_finite=False
+            )
+            return (
+                mo.crossprod(x=x, y=alpha).astype(x.dtype, copy=False),
+                inv_penalized_cov_dual(x, lam, c).astype(x.dtype, copy=False),
+            )
+
+    if backend == "cpu":
+        c = cholesky_factor(penalized_cov(x, lam))
+        if c is not None:
+            return (
+                cho_solve(
+                    c,
+                    mo.crossprod(x=x, y=y).astype(np.float64),
+                    check_finite=False,
+                ).astype(x.dtype, copy=False),
+                cho_inv(c).astype(x.dtype, copy=False),
+            )
+
+    Cn = inv_penalized_cov(x=x, lam=lam, backend=backend)
+    return (
+        mo.safe_sparse_dot(
+            a=Cn, b=mo.crossprod(x=x, y=y, backend=backend), backend=backend
+        ),
+        Cn,
+    )
+
+
+# effective degrees of freedom of the linear smoother y_hat = X%*%M%*%t(X)%*%y,
+# trace(X%*%M%*%t(X)) = trace(M%*%t(X)%*%X), without the n x n smoothing matrix
+def effective_df(X, M, backend="cpu"):
+    return np.sum(M * mo.crossprod(x=X, backend=backend).T)
+
+
+# generalized cross-validation error of the linear smoother
+# y_hat = X%*%M%*%t(X)%*%y (M is p x p), in O(np^2) time and O(p^2) memory
+def gcv(X, y, M, backend="cpu"):
+    n = X.shape[0]
+    y_hat = mo.safe_sparse_dot(
+        a=X,
+        b=mo.safe_sparse_dot(
+            a=M, b=mo.crossprod(x=X, y=y, backend=backend), backend=backend
+        ),
+        backend=backend,
+    )
+    # one GCV per response, for several responses
+    return np.mean(
+        ((y - y_hat) / (1 - effective_df(X, M, backend=backend) / n)) ** 2,
+        axis=0,
+    )
+
+
+# predictive standard deviations sqrt(diag(x_star%*%Sigma_hat%*%t(x_star))
+# (+ sigma^2)), row by row, without the m x m matrix: O(m*p^2) time, and blocks
+# of rows of x_star%*%Sigma_hat sized by the `working_memory` setting
+def preds_std(X_star, Sigma_hat_, sigma=None, backend="cpu"):
+    n_rows, p = X_star.shape
+    chunk_n_rows = get_chunk_n_rows(
+        row_bytes=2 * 8 * p,
+        max_n_rows=n_rows,
+        working_memory=get_config()["working_memory"],
+    )
+    res = np.empty(n_rows)
+    for batch in gen_batches(n_rows, chunk_n_rows):
+        X_batch = X_star[batch]
+        if isinstance(Sigma_hat_, LowRankCov):
+            res[batch] = Sigma_hat_.quad_diag(X_batch)
+            continue
+        X_Sigma = np.asarray(
+            mo.safe_sparse_dot(a=X_batch, b=Sigma_hat_, backend=backend)
+        )
+        if sparse.issparse(X_batch):
+            res[batch] = np.asarray(X_batch.multiply(X_Sigma).sum(axis=1)).ravel()
+        else:
+            res[batch] = np.einsum("ij,ij->i", np.asarray(X_batch), X_Sigma)
+    if sigma is not None:
+        res += sigma ** 2
+    return np.sqrt(res)
+
+
+# spectral decomposition t(x)%*%x = V%*%diag(d)%*%t(V) (positive eigenvalues
+# only), from the smaller of t(x)%*%x and x%*%t(x), with z = t(U)%*%y where
+# U = x%*%V%*%diag(1/sqrt(d)): (d, V, z) are all the ridge regressions of y on x
+# need, whatever the penalty
+def eigen_cov(x, y, tol=1e-10):
+    if x.shape[1] > x.shape[0]:  # more features than samples: n x n problem
+        d, U = la.eigh(penalized_kernel(x))
+        keep = d > tol * max(d[-1], 0)
+        d, U = d[keep], U[:, keep]
+        V = np.asarray(mo.crossprod(x=x, y=U), dtype=np.float64) / np.sqrt(d)
+        return d, V, np.dot(U.T, np.asarray(y, dtype=np.float64))
+    d, V = la.eigh(penalized_cov(x))
+    keep = d > tol * max(d[-1], 0)
+    d, V = d[keep], V[:, keep]
+    xy = np.asarray(mo.crossprod(x=x, y=y), dtype=np.float64)
+    return d, V, np.dot(V.T, xy) / np.sqrt(d)
+
+
+# log-marginal likelihood of y in y = x%*%beta + eps, beta ~ N(0, s^2*I),
+# eps ~ N(0, sigma^2*I), i.e y ~ N(0, s^2*x%*%t(x) + sigma^2*I), from
+# (d, _, z) = eigen_cov(x, y), n = len(y) and yty = t(y)%*%y: O(len(d)).
+# With return_grad, also its gradient with respect to (log(s), log(sigma))
+def log_evidence(d, z, n, yty, s, sigma, return_grad=False):
+    s2, sigma2 = s ** 2, sigma ** 2
+    ev = s2 * d + sigma2
+    z2 = z ** 2
+    rss0 = yty - np.sum(z2)  # part of y orthogonal to the columns of x
+    res = -0.5 * (
+        n * np.log(2 * np.pi)
+        + np.sum(np.log(ev))
+        + (n - len(d)) * np.log(sigma2)
+        + rss0 / sigma2
+        + np.sum(z2 / ev)
+    )
+    if return_grad == False:
+        return res
+    w = z2 / ev ** 2
+    return (
+        res,
+        np.array(
+            [
+                -s2 * np.sum(d / ev - d * w),
+                -sigma2 * np.sum(1 / ev - w)
+                - (n - len(d))
+                + rss0 / sigma2,
+            ]
+        ),
+    )
+
+
+# (s, sigma) maximizing log_evidence (empirical Bayes), searched on the log
+# scale from (s0, sigma0). Both are bounded relatively to the scale of y,
+# sqrt(yty/n) (and of x, for s): sigma within [rel_tol, 10] times it, since the
+# evidence of noiseless data keeps increasing when sigma goes to 0
+def max_log_evidence(d, z, n, yty, s0=0.1, sigma0=0.05, rel_tol=1e-6):
+    def obj(log_scales):
+        res, grad = log_evidence(
+            d, z, n, yty, *np.exp(log_scales), return_grad=True
+        )
+        return -res, -grad
+
+    tiny = np.finfo(np.float64).tiny
+    log_sy = 0.5 * np.log(max(yty / n, tiny))
+    # s for which t(beta)%*%t(x)%*%x%*%beta/n and yty/n match, on average
+    log_s_ref = log_sy + 0.5 * np.log(n / max(np.sum(d), tiny))
+    bounds = [
+        (log_s_ref + np.log(rel_tol), log_s_ref - np.log(rel_tol)),
+        (log_sy + np.log(rel_tol), log_sy + np.log(10)),
+    ]
+    x0 = np.clip(
+        np.log([s0, sigma0]), [b[0] for b in bounds], [b[1] for b in bounds]
+    )
+
+    res = minimize(obj, x0=x0, jac=True, method="L-BFGS-B", bounds=bounds)
+    s, sigma = np.exp(res.x)
+    return s, sigma, -res.fun
+
+
+# ridge coefficients and (t(x)%*%x + lam*I)^{-1}, from (d, V, z) = eigen_cov(x, y):
+# (t(x)%*%x + lam*I)^{-1} = V%*%diag(1/(d + lam))%*%t(V) + (I - V%*%t(V))/lam
+def beta_inv_penalized_cov_eigen(d, V, z, lam):
+    Cn = np.dot(V * (1 / (d + lam) - 1 / lam), V.T)
+    Cn[np.diag_indices_from(Cn)] += 1 / lam
+    return np.dot(V, np.sqrt(d) * z / (d + lam)), Cn
+
+
+# posterior (beta_hat, Sigma_hat) of y = x%*%beta + eps, eps ~ N(0, sigma^2*I),
+# updated with k new observations (x, y) (Woodbury, O(k*p^2), or O(k*r*p) for
+# a LowRankCov of rank r): Sigma_hat_ is first divided by forgetting_factor
+# (in (0, 1]) to discount the older ones
+def update_beta_Sigma_hat(
+    beta_hat_, Sigma_hat_, x, y, sigma=0.05, forgetting_factor=1
+):
+    dtype = Sigma_hat_.dtype
+    x = x.toarray() if sparse.issparse(x) else np.asarray(x, dtype=np.float64)
+    low_rank = isinstance(Sigma_hat_, LowRankCov)
+    if low_rank:
+        Sigma_hat = Sigma_hat_.scale(1 / forgetting_factor)
+        x_Sigma = Sigma_hat.dot(x.T).T
+    else:
+        Sigma_hat = (
+            np.asarray(Sigma_hat_, dtype=np.float64) / forgetting_factor
+        )
+        x_Sigma = np.dot(x, Sigma_hat)
+    S = np.dot(x_Sigma, x.T)  # k x k predictive covariance of y
+    S[np.diag_indices_from(S)] += sigma ** 2
+    beta_hat = np.asarray(beta_hat_, dtype=np.float64)
+    residuals = np.asarray(y, dtype=np.float64) - np.dot(x, beta_hat)
+
+    if low_rank:  # S = L%*%t(L), G = L^{-1}%*%x%*%Sigma_hat
+        L = la.cholesky(S)
+        G = solve_triangular(L, x_Sigma, lower=True)
+        beta_hat = beta_hat + np.dot(
+            G.T, solve_triangular(L, residuals, lower=True)
+        )
+        return beta_hat.astype(dtype, copy=False), Sigma_hat.downdate(G)
+
+    c = cholesky_factor(S)
+    # gain t(K) = S^{-1}%*%x%*%Sigma_hat
+    K_t = (
+        la.solve(S, x_Sigma)
+        if c is None
+        else cho_solve(c, x_Sigma, check_finite=False)
+    )
+    beta_hat = beta_hat + np.dot(K_t.T, residuals)
+    Sigma_hat -= np.dot(x_Sigma.T, K_t)
+    Sigma_hat = 0.5 * (Sigma_hat + Sigma_hat.T)
+    return (
+        beta_hat.astype(dtype, copy=False),
+        Sigma_hat.astype(dtype, copy=False),
+    )
+
+
+# beta_hat, Sigma_hat and GCV of y = X%*%beta + eps, eps ~ N(0, sigma^2*I),
+# beta ~ N(0, diag(prior_var)), with Sigma_hat stored as a LowRankCov: with
+# X%*%diag(prior_var)%*%t(X) + sigma^2*I = L%*%t(L) and
+# W = L^{-1}%*%X%*%diag(prior_var) (Woodbury), Sigma_hat = diag(prior_var) -
+# t(W)%*%W and beta_hat = t(W)%*%L^{-1}%*%y. O(n^2*p) time, O(n*p) memory
+def beta_Sigma_hat_low_rank(X, y, prior_var, sigma=0.05, max_rank=None):
+    dtype = X.dtype
+    prior_var = np.asarray(prior_var, dtype=np.float64)
+    if sparse.issparse(X):
+        X_prior = X.multiply(prior_var).toarray()
+    else:
+        X_prior = np.asarray(X, dtype=np.float64) * prior_var
+    K = np.asarray(X.dot(X_prior.T), dtype=np.float64)
+    K[np.diag_indices_from(K)] += sigma ** 2
+    L = la.cholesky(K)
+    W = solve_triangular(L, X_prior, lower=True)
+    beta_hat = np.dot(
+        W.T,
+        solve_triangular(L, np.asarray(y, dtype=np.float64), lower=True),
+    )
+    Sigma_hat = LowRankCov(prior_var.astype(dtype), W.astype(dtype))
+    # linear smoother X%*%Sigma_hat%*%t(X)%*%y/sigma^2 (gcv, with
+    # M = Sigma_hat/sigma^2)
+    n = X.shape[0]
+    df = np.sum(Sigma_hat.quad_diag(X)) / sigma ** 2
+    GCV = np.mean(
+        ((y - mo.safe_sparse_dot(a=X, b=beta_hat)) / (1 - df / n)) ** 2
+    )
+    if max_rank is not None:  # truncated after GCV
+        Sigma_hat = LowRankCov(Sigma_hat.diag, Sigma_hat.factor, max_rank)
+    return {
+        "beta_hat": beta_hat.astype(dtype, copy=False),
+        "Sigma_hat": Sigma_hat,
+        "GCV": GCV,
+    }
+
+
+# square root S of the covariance Sigma_hat_ = S%*%t(S), for sampling: lower
+# Cholesky factor (from the eigendecomposition when Sigma_hat_ is only
+# semi-definite), or Sigma_hat_ itself for a LowRankCov (see sqrt_dot)
+def cov_sqrt(Sigma_hat_):
+    if isinstance(Sigma_hat_, LowRankCov):
+        return Sigma_hat_
+    c = cholesky_factor(Sigma_hat_)
+    if c is not None:
+        return np.tril(c[0])
+    d, V = la.eigh(np.asarray(Sigma_hat_, dtype=np.float64))
+    return V * np.sqrt(np.clip(d, 0, None))
+
+
+# n_samples draws from N(beta_hat_, S%*%t(S)) (S from cov_sqrt), as the
+# columns of a p x n_samples matrix
+def sample_beta(beta_hat_, S, n_samples, random_state):
+    E = random_state.standard_normal((S.shape[0], n_samples))
+    E = S.sqrt_dot(E) if isinstance(S, LowRankCov) else np.dot(S, E)
+    return np.asarray(beta_hat_, dtype=np.float64)[:, None] + E
 
 
 # linear regression with no regularization
@@ -73,156 +497,43 @@ def beta_Sigma_hat(
                     x=np.ones(X_star.shape[0]), y=X_star, backend=backend
                 )
 
-        Cn = inv_penalized_cov(x=X, backend=backend)
+        if (X_star is None) or (beta_hat_ is None):
+            # in dual form when X has more columns than rows
+            beta_hat_ = beta_hat(x=X, y=y, backend=backend)
 
-        if return_cov == True:
-
-            if X_star is None:
-
-                beta_hat_ = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.crossprod(x=X, y=y, backend=backend),
+        if (X_star is not None) and (Sigma_hat_ is not None):
+            GCV = gcv(
+                X=X,
+                y=y,
+                M=mo.safe_sparse_dot(
+                    a=inv_penalized_cov(x=X, backend=backend),
+                    b=Sigma_hat_,
                     backend=backend,
-                )
-
-                Sigma_hat_ = np.eye(X.shape[1]) - mo.safe_sparse_dot(
-                    a=Cn, b=mo.crossprod(x=X, backend=backend), backend=backend
-                )
-                temp = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
-                    backend=backend,
-                )
-                smoothing_matrix = mo.safe_sparse_dot(
-                    a=X, b=temp, backend=backend
-                )
-                y_hat = mo.safe_sparse_dot(
-                    a=smoothing_matrix, b=y, backend=backend
-                )
+                ),
+                backend=backend,
+            )
+        else:
+            # Sigma_hat_ = I - Cn%*%t(X)%*%X is null without regularization,
+            # and so is the smoothing matrix X%*%Cn%*%Sigma_hat_%*%t(X) in GCV
+            if return_cov == True:
+                Sigma_hat_ = np.zeros((X.shape[1], X.shape[1]), dtype=X.dtype)
+            GCV = np.mean(y ** 2, axis=0)
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "Sigma_hat": Sigma_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                }
+        res = {"beta_hat": beta_hat_, "GCV": GCV}
 
-            else:
-
-                if beta_hat_ is None:
-                    beta_hat_ = mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.crossprod(X, y, backend=backend),
-                        backend=backend,
-                    )
-
-                if Sigma_hat_ is None:
-                    Sigma_hat_ = np.eye(X.shape[1]) - mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend=backend,
-                    )
-
-                temp = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.tcrossprod(Sigma_hat_, X, backend=backend),
-                    backend=backend,
-                )
-                smoothing_matrix = mo.safe_sparse_dot(
-                    a=X, b=temp, backend=backend
-                )
-                y_hat = mo.safe_sparse_dot(
-                    a=smoothing_matrix, b=y, backend=backend
-                )
+        if return_cov == True:
+            res["Sigma_hat"] = Sigma_hat_
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "Sigma_hat": Sigma_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                    "preds": mo.safe_sparse_dot(
-                        a=X_star, b=beta_hat_, backend=backend
-                    ),
-                    "preds_std": np.sqrt(
-                        np.diag(
-                            mo.safe_sparse_dot(
-                                a=X_star,
-                                b=mo.tcrossprod(
-                                    x=Sigma_hat_, y=X_star, backend=backend
-                                ),
-                                backend=backend,
-                            )
-                        )
-                    ),
-                }
-
-        else:  # return_cov == False
-
-            if X_star is None:
-
-                beta_hat_ = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.crossprod(x=X, y=y, backend=backend),
-                    backend=backend,
-                )
-                Sigma_hat_ = np.eye(X.shape[1]) - mo.safe_sparse_dot(
-                    a=Cn, b=mo.crossprod(x=X, backend=backend), backend=backend
-                )
-                temp = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
-                    backend=backend,
-                )
-                smoothing_matrix = mo.safe_sparse_dot(
-                    a=X, b=temp, backend=backend
-                )
-                y_hat = mo.safe_sparse_dot(
-                    a=smoothing_matrix, b=y, backend=backend
+        if X_star is not None:
+            res["preds"] = mo.safe_sparse_dot(
+                a=X_star, b=beta_hat_, backend=backend
+            )
+            if return_cov == True:
+                res["preds_std"] = preds_std(
+                    X_star=X_star, Sigma_hat_=Sigma_hat_, backend=backend
                 )
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                }
-
-            else:
-
-                if beta_hat_ is None:
-                    beta_hat_ = beta_hat(X, y)
-                    Sigma_hat_ = np.eye(X.shape[1]) - mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend=backend,
-                    )
-                    temp = mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
-                        backend=backend,
-                    )
-                    smoothing_matrix = mo.safe_sparse_dot(
-                        a=X, b=temp, backend=backend
-                    )
-                    y_hat = mo.safe_sparse_dot(
-                        a=smoothing_matrix, b=y, backend=backend
-                    )
-
-                return {
-                    "beta_hat": beta_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                    "preds": mo.safe_sparse_dot(
-                        a=X_star, b=beta_hat_, backend=backend
-                    ),
-                }
+        return res
 
     else:  # X is None | y is None  # predict
 
@@ -236,16 +547,8 @@ def beta_Sigma_hat(
                 "preds": mo.safe_sparse_dot(
                     a=X_star, b=beta_hat_, backend=backend
                 ),
-                "preds_std": np.sqrt(
-                    np.diag(
-                        mo.safe_sparse_dot(
-                            a=X_star,
-                            b=mo.tcrossprod(
-                                x=Sigma_hat_, y=X_star, backend=backend
-                            ),
-                            backend=backend,
-                        )
-                    )
+                "preds_std": preds_std(
+                    X_star=X_star, Sigma_hat_=Sigma_hat_, backend=backend
                 ),
             }
 
@@ -293,170 +596,46 @@ def beta_Sigma_hat_rvfl(
 
         s2 = s ** 2
         lambda_ = (sigma ** 2) / s2
-        Cn = inv_penalized_cov(X, lam=lambda_)
 
-        if return_cov == True:
+        # one factorization of t(X)%*%X + lambda_*I, for beta_hat, Sigma_hat
+        # and GCV
+        beta_fit, Cn = beta_inv_penalized_cov(
+            x=X, y=y, lam=lambda_, backend=backend
+        )
 
-            if X_star is None:
+        if (X_star is None) or (beta_hat_ is None):
+            beta_hat_ = beta_fit
 
-                beta_hat_ = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.crossprod(x=X, y=y, backend=backend),
-                    backend=backend,
-                )
-                Sigma_hat_ = s2 * (
-                    np.eye(X.shape[1])
-                    - mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend=backend,
-                    )
-                )
-                temp = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
-                    backend=backend,
-                )
-                smoothing_matrix = mo.safe_sparse_dot(
-                    a=X, b=temp, backend=backend
-                )
-                y_hat = mo.safe_sparse_dot(
-                    a=smoothing_matrix, b=y, backend=backend
-                )
+        if (X_star is None) or (Sigma_hat_ is None):
+            # s2*(I - Cn%*%t(X)%*%X) = s2*lambda_*Cn
+            Sigma_hat_ = (sigma ** 2) * Cn
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "Sigma_hat": Sigma_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                }
-
-            else:
+        res = {
+            "beta_hat": beta_hat_,
+            "GCV": gcv(
+                X=X,
+                y=y,
+                M=mo.safe_sparse_dot(a=Cn, b=Sigma_hat_, backend=backend),
+                backend=backend,
+            ),
+        }
 
-                if beta_hat_ is None:
-                    beta_hat_ = mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.crossprod(x=X, y=y, backend=backend),
-                        backend=backend,
-                    )
-
-                if Sigma_hat_ is None:
-                    Sigma_hat_ = s2 * (
-                        np.eye(X.shape[1])
-                        - mo.safe_sparse_dot(
-                            a=Cn,
-                            b=mo.crossprod(x=X, backend=backend),
-                            backend=backend,
-                        )
-                    )
-
-                temp = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
-                    backend=backend,
-                )
-                smoothing_matrix = mo.safe_sparse_dot(
-                    a=X, b=temp, backend=backend
-                )
-                y_hat = mo.safe_sparse_dot(
-                    a=smoothing_matrix, b=y, backend=backend
-                )
+        if return_cov == True:
+            res["Sigma_hat"] = Sigma_hat_
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "Sigma_hat": Sigma_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                    "preds": mo.safe_sparse_dot(
-                        a=X_star, b=beta_hat_, backend=backend
-                    ),
-                    "preds_std": np.sqrt(
-                        np.diag(
-                            mo.safe_sparse_dot(
-                                a=X_star,
-                                b=mo.tcrossprod(
-                                    x=Sigma_hat_, y=X_star, backend=backend
-                                ),
-                                backend=backend,
-                            )
-                            + (sigma ** 2) * np.eye(X_star.shape[0])
-                        )
-                    ),
-                }
-
-        else:  # return_cov == False
-
-            if X_star is None:
-
-                beta_hat_ = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.crossprod(x=X, y=y, backend=backend),
-                    backend=backend,
-                )
-                Sigma_hat_ = s2 * (
-                    np.eye(X.shape[1])
-                    - mo.safe_sparse_dot(
-                        a=Cn, b=mo.crossprod(X), backend=backend
-                    )
-                )
-                temp = mo.safe_sparse_dot(
-                    a=Cn,
-                    b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
+        if X_star is not None:
+            res["preds"] = mo.safe_sparse_dot(
+                a=X_star, b=beta_hat_, backend=backend
+            )
+            if return_cov == True:
+                res["preds_std"] = preds_std(
+                    X_star=X_star,
+                    Sigma_hat_=Sigma_hat_,
+                    sigma=sigma,
                     backend=backend,
                 )
-                smoothing_matrix = mo.safe_sparse_dot(
-                    a=X, b=temp, backend=backend
-                )
-                y_hat = mo.safe_sparse_dot(
-                    a=smoothing_matrix, b=y, backend=backend
-                )
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                }
-
-            else:
-
-                if beta_hat_ is None:
-                    beta_hat_ = beta_hat(X, y, lam=lambda_, backend=backend)
-                    Sigma_hat_ = s2 * (
-                        np.eye(X.shape[1])
-                        - mo.safe_sparse_dot(
-                            a=Cn,
-                            b=mo.crossprod(x=X, backend=backend),
-                            backend=backend,
-                        )
-                    )
-                    temp = mo.safe_sparse_dot(
-                        a=Cn,
-                        b=mo.tcrossprod(x=Sigma_hat_, y=X, backend=backend),
-                        backend=backend,
-                    )
-                    smoothing_matrix = mo.safe_sparse_dot(
-                        a=X, b=temp, backend=backend
-                    )
-                    y_hat = mo.safe_sparse_dot(
-                        a=smoothing_matrix, b=y, backend=backend
-                    )
-
-                return {
-                    "beta_hat": beta_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                    "preds": mo.safe_sparse_dot(
-                        a=X_star, b=beta_hat_, backend=backend
-                    ),
-                }
+        return res
 
     else:  # X is None | y is None  # predict
 
@@ -468,17 +647,11 @@ def beta_Sigma_hat_rvfl(
 
             return {
                 "preds": mo.safe_sparse_dot(X_star, beta_hat_, backend=backend),
-                "preds_std": np.sqrt(
-                    np.diag(
-                        mo.safe_sparse_dot(
-                            a=X_star,
-                            b=mo.tcrossprod(
-                                x=Sigma_hat_, y=X_star, backend=backend
-                            ),
-                            backend=backend,
-                        )
-                        + (sigma ** 2) * np.eye(X_star.shape[0])
-                    )
+                "preds_std": preds_std(
+                    X_star=X_star,
+                    Sigma_hat_=Sigma_hat_,
+                    sigma=sigma,
+                    backend=backend,
                 ),
             }
 
@@ -491,6 +664,78 @@ def beta_Sigma_hat_rvfl(
             }
 
 
+# (Sigma%*%t(X)%*%X + sigma^2*I)^{-1}%*%Sigma, symmetric, with
+# Sigma = L%*%t(L) (Cholesky): L%*%(t(L)%*%t(X)%*%X%*%L + sigma^2*I)^{-1}%*%t(L)
+def rvfl2_cov(X, Sigma, sigma=0.05, backend="cpu"):
+
+    if backend in ("gpu", "tpu"):
+        from jax.numpy import linalg as jla
+
+        return mo.safe_sparse_dot(
+            a=jla.inv(
+                mo.safe_sparse_dot(
+                    a=Sigma,
+                    b=mo.crossprod(x=X, backend=backend),
+                    backend=backend,
+                )
+                + (sigma ** 2) * np.eye(X.shape[1])
+            ),
+            b=Sigma,
+            backend=backend,
+        )
+
+    Sigma = np.asarray(Sigma, dtype=np.float64)
+
+    if (X.shape[1] > X.shape[0]) and (sigma > 0):
+        # more features than samples, n x n system (Woodbury): (Sigma -
+        # Sigma%*%t(X)%*%(X%*%Sigma%*%t(X) + sigma^2*I)^{-1}%*%X%*%Sigma)/sigma^2
+        X_Sigma = np.asarray(mo.safe_sparse_dot(a=X, b=Sigma), np.float64)
+        kernel = mo.tcrossprod(x=X_Sigma, y=X).astype(np.float64)
+        kernel[np.diag_indices_from(kernel)] += sigma ** 2
+        c = cholesky_factor(kernel)
+        if c is not None:
+            res = Sigma - mo.crossprod(
+                x=X_Sigma, y=cho_solve(c, X_Sigma, check_finite=False)
+            )
+            return (res / sigma ** 2).astype(X.dtype, copy=False)
+
+    cov_ = penalized_cov(X)
+    sigma_diag = np.diag(Sigma)
+    res = None
+
+    if np.all(sigma_diag > 0) and (
+        np.count_nonzero(Sigma) == np.count_nonzero(sigma_diag)
+    ):  # diagonal prior, L = sqrt(Sigma)
+        L = np.sqrt(sigma_diag)
+        cov_ *= L[:, None] * L[None, :]
+        cov_[np.diag_indices_from(cov_)] += sigma ** 2
+        c = cholesky_factor(cov_)
+        if c is not None:
+            res = cho_inv(c)
+            res *= L[:, None] * L[None, :]
+
+    else:
+        c = cholesky_factor(Sigma)
+        if c is not None:
+            L = np.tril(c[0])
+            cov_ = np.dot(L.T, np.dot(cov_, L))
+            cov_[np.diag_indices_from(cov_)] += sigma ** 2
+            c = cholesky_factor(cov_)
+            if c is not None:
+                res = np.dot(L, np.dot(cho_inv(c), L.T))
+
+    if res is None:  # Sigma or the system is not positive definite
+        res = np.dot(
+            la.inv(
+                np.dot(Sigma, penalized_cov(X))
+                + (sigma ** 2) * np.eye(X.shape[1])
+            ),
+            Sigma,
+        )
+
+    return res.astype(X.dtype, copy=False)
+
+
 # beta and Sigma in Bayesian Ridge Regression 2
 # without intercept! without intercept! without intercept!
 def beta_Sigma_hat_rvfl2(
@@ -515,156 +760,57 @@ def beta_Sigma_hat_rvfl2(
 
         if Sigma is None:
             if fit_intercept == True:
-                Sigma = np.eye(p + 1)
+                Sigma = np.eye(p + 1, dtype=X.dtype)
             else:
-                Sigma = np.eye(p)
+                Sigma = np.eye(p, dtype=X.dtype)
 
         if X_star is not None:
             if len(X_star.shape) == 1:
                 X_star = X_star.reshape(-1, 1)
 
         if fit_intercept == True:
-
             X = mo.cbind(np.ones(n), X)
-            Cn = (
-                la.inv(
-                    mo.safe_sparse_dot(
-                        a=Sigma,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend="cpu",
-                    )
-                    + (sigma ** 2) * np.eye(p + 1)
-                )
-                if backend == "cpu"
-                else jla.inv(
-                    mo.safe_sparse_dot(
-                        a=Sigma,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend=backend,
-                    )
-                    + (sigma ** 2) * np.eye(p + 1)
-                )
-            )
-
             if X_star is not None:
                 X_star = mo.cbind(
                     x=np.ones(X_star.shape[0]), y=X_star, backend=backend
                 )
-        else:
-            # rename to invCn
-            Cn = (
-                la.inv(
-                    mo.safe_sparse_dot(
-                        a=Sigma,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend="cpu",
-                    )
-                    + (sigma ** 2) * np.eye(p)
-                )
-                if backend == "cpu"
-                else jla.inv(
-                    mo.safe_sparse_dot(
-                        a=Sigma,
-                        b=mo.crossprod(x=X, backend=backend),
-                        backend=backend,
-                    )
-                    + (sigma ** 2) * np.eye(p)
-                )
+
+        # one factorization, for beta_hat, Sigma_hat and GCV:
+        # Sigma_hat = Sigma - Cn%*%Sigma%*%t(X)%*%X%*%Sigma = sigma^2*Cn%*%Sigma
+        # with Cn = (Sigma%*%t(X)%*%X + sigma^2*I)^{-1}
+        Cn_Sigma = rvfl2_cov(X=X, Sigma=Sigma, sigma=sigma, backend=backend)
+        if (X_star is None) or (beta_hat_ is None):
+            beta_hat_ = mo.safe_sparse_dot(
+                a=Cn_Sigma,
+                b=mo.crossprod(x=X, y=y, backend=backend),
+                backend=backend,
             )
 
-        temp = mo.safe_sparse_dot(
-            a=Cn,
-            b=mo.tcrossprod(x=Sigma, y=X, backend=backend),
-            backend=backend,
-        )
-        smoothing_matrix = mo.safe_sparse_dot(a=X, b=temp, backend=backend)
-        y_hat = mo.safe_sparse_dot(a=smoothing_matrix, b=y, backend=backend)
+        res = {
+            "beta_hat": beta_hat_,
+            "GCV": gcv(X=X, y=y, M=Cn_Sigma, backend=backend),
+        }
 
         if return_cov == True:
 
-            if X_star is None:
-
-                return {
-                    "beta_hat": mo.safe_sparse_dot(
-                        a=temp, b=y, backend=backend
-                    ),
-                    "Sigma_hat": Sigma
-                    - mo.safe_sparse_dot(
-                        a=temp,
-                        b=mo.safe_sparse_dot(a=X, b=Sigma, backend=backend),
-                        backend=backend,
-                    ),
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                }
+            if (X_star is None) or (Sigma_hat_ is None):
+                Sigma_hat_ = (sigma ** 2) * Cn_Sigma
 
-            else:
-
-                if beta_hat_ is None:
-                    beta_hat_ = mo.safe_sparse_dot(a=temp, b=y, backend=backend)
-
-                if Sigma_hat_ is None:
-                    Sigma_hat_ = Sigma - mo.safe_sparse_dot(
-                        a=temp,
-                        b=mo.safe_sparse_dot(a=X, b=Sigma, backend=backend),
-                        backend=backend,
-                    )
-
-                return {
-                    "beta_hat": beta_hat_,
-                    "Sigma_hat": Sigma_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                    "preds": mo.safe_sparse_dot(
-                        a=X_star, b=beta_hat_, backend=backend
-                    ),
-                    "preds_std": np.sqrt(
-                        np.diag(
-                            mo.safe_sparse_dot(
-                                a=X_star,
-                                b=mo.tcrossprod(
-                                    x=Sigma_hat_, y=X_star, backend=backend
-                                ),
-                                backend=backend,
-                            )
-                            + (sigma ** 2) * np.eye(X_star.shape[0])
-                        )
-                    ),
-                }
-
-        else:  # return_cov == False
-
-            if X_star is None:
-
-                return {
-                    "beta_hat": mo.safe_sparse_dot(
-                        a=temp, b=y, backend=backend
-                    ),
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                }
+            res["Sigma_hat"] = Sigma_hat_
 
-            else:
-
-                if beta_hat_ is None:
-                    beta_hat_ = mo.safe_sparse_dot(a=temp, b=y, backend=backend)
+        if X_star is not None:
+            res["preds"] = mo.safe_sparse_dot(
+                a=X_star, b=beta_hat_, backend=backend
+            )
+            if return_cov == True:
+                res["preds_std"] = preds_std(
+                    X_star=X_star,
+                    Sigma_hat_=Sigma_hat_,
+                    sigma=sigma,
+                    backend=backend,
+                )
 
-                return {
-                    "beta_hat": beta_hat_,
-                    "GCV": np.mean(
-                        ((y - y_hat) / (1 - np.trace(smoothing_matrix) / n))
-                        ** 2
-                    ),
-                    "preds": mo.safe_sparse_dot(
-                        a=X_star, b=beta_hat_, backend=backend
-                    ),
-                }
+        return res
 
     else:  # (X is None) | (y is None) # predict
 
@@ -678,17 +824,11 @@ def beta_Sigma_hat_rvfl2(
                 "preds": mo.safe_sparse_dot(
                     a=X_star, b=beta_hat_, backend=backend
                 ),
-                "preds_std": np.sqrt(
-                    np.diag(
-                        mo.safe_sparse_dot(
-                            a=X_star,
-                            b=mo.tcrossprod(
-                                Sigma_hat_, X_star, backend=backend
-                            ),
-                            backend=backend,
-                        )
-                        + (sigma ** 2) * np.eye(X_star.shape[0])
-                    )
+                "preds_std": preds_std(
+                    X_star=X_star,
+                    Sigma_hat_=Sigma_hat_,
+                    sigma=sigma,
+                    backend=backend,
                 ),
             }
 
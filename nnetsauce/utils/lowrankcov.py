@@ -0,0 +1,104 @@
+import numpy as np
+from numpy import linalg as la
+from scipy import sparse
+
+
+class LowRankCov:
+    """Covariance matrix stored as a diagonal minus a low-rank term,
+    diag(diag) - t(factor)%*%factor: O(r*p) memory (and O(r*p) per quadratic
+    form) instead of O(p^2), for a p x p matrix and a factor of rank r.
+
+    Attributes:
+
+        diag: array-like, shape = [p]
+            diagonal term (e.g a diagonal prior covariance)
+
+        factor: array-like, shape = [r, p]
+            low-rank term (e.g from the observations, via Woodbury)
+
+        max_rank: int
+            maximum rank of the factor (None: no truncation). Truncating
+            drops the smallest directions of the subtracted term, so that the
+            covariance is overestimated, never underestimated
+
+    """
+
+    def __init__(self, diag, factor, max_rank=None):
+        self.diag = diag
+        self.factor = factor
+        self.max_rank = max_rank
+        self._sqrt = None  # see sqrt_dot
+        if (max_rank is not None) and (factor.shape[0] > max_rank):
+            self.truncate(max_rank)
+
+    @property
+    def shape(self):
+        return (self.diag.shape[0], self.diag.shape[0])
+
+    @property
+    def dtype(self):
+        return self.factor.dtype
+
+    @property
+    def rank(self):
+        return self.factor.shape[0]
+
+    def toarray(self):
+        """Dense p x p matrix."""
+        res = -np.dot(self.factor.T, self.factor)
+        res[np.diag_indices_from(res)] += self.diag
+        return res
+
+    def dot(self, b):
+        """Matrix product with b, an array of shape [p] or [p, k]."""
+        diag = self.diag if b.ndim == 1 else self.diag[:, None]
+        return diag * b - np.dot(self.factor.T, np.dot(self.factor, b))
+
+    def quad_diag(self, X):
+        """diag(X%*%Sigma%*%t(X)) for X of shape [m, p], in O(m*r*p)."""
+        if sparse.issparse(X):
+            X_factor = np.asarray(X.dot(self.factor.T))
+            res = np.asarray(X.multiply(X).dot(self.diag)).ravel()
+        else:
+            X_factor = np.dot(X, self.factor.T)
+            res = np.dot(np.square(X), self.diag)
+        return res - np.einsum("ij,ij->i", X_factor, X_factor)
+
+    def sqrt_dot(self, E):
+        """S%*%E, with S the symmetric square root of Sigma and E of shape
+        [p, k] (e.g for sampling): O(r*p*k), after an SVD of the factor
+        (O(r^2*p), computed once)."""
+        if self._sqrt is None:
+            # Sigma = D^{1/2}%*%(I - V%*%diag(s^2)%*%t(V))%*%D^{1/2}, with
+            # factor%*%D^{-1/2} = U%*%diag(s)%*%t(V) and D = diag(diag): S =
+            # D^{1/2}%*%(I - V%*%diag(1 - sqrt(1 - s^2))%*%t(V))
+            sqrt_diag = np.sqrt(self.diag)
+            _, s, Vt = la.svd(self.factor / sqrt_diag, full_matrices=False)
+            shrink = 1 - np.sqrt(np.clip(1 - s ** 2, 0, None))
+            self._sqrt = (sqrt_diag, Vt, shrink)
+        sqrt_diag, Vt, shrink = self._sqrt
+        return sqrt_diag[:, None] * (
+            E - np.dot(Vt.T, shrink[:, None] * np.dot(Vt, E))
+        )
+
+    def scale(self, c):
+        """c*Sigma, with c > 0."""
+        return LowRankCov(
+            c * self.diag, np.sqrt(c) * self.factor, self.max_rank
+        )
+
+    def downdate(self, G):
+        """Sigma - t(G)%*%G, with G of shape [k, p]: rank r + k (before
+        truncation to max_rank)."""
+        return LowRankCov(
+            self.diag,
+            np.vstack((self.factor, G.astype(self.dtype, copy=False))),
+            self.max_rank,
+        )
+
+    def truncate(self, rank):
+        """Keeps the `rank` largest directions of the factor (SVD)."""
+        _, s, Vt = la.svd(self.factor, full_matrices=False)
+        self.factor = s[:rank, None] * Vt[:rank]
+        self._sqrt = None
+        return self
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import numpy as np
+from scipy import sparse
+
+
+def nbytes(obj):
+    """Size in bytes of the arrays contained in obj (an array, or a
+    tuple/list/dict of arrays); other objects count for 0."""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if sparse.issparse(obj):
+        return sum(
+            getattr(obj, name).nbytes
+            for name in ("data", "indices", "indptr", "row", "col")
+            if hasattr(obj, name)
+        )
+    if isinstance(obj, (tuple, list)):
+        return sum(nbytes(x) for x in obj)
+    if isinstance(obj, dict):
+        return sum(nbytes(x) for x in obj.values())
+    return 0
+
+
+class LRUCache:
+    """Least Recently Used cache, bounded by the total size of its values.
+
+    Attributes:
+
+        max_bytes: int
+            maximum total size (in bytes) of the cached values; the least
+            recently used entries are evicted first. 0 disables the cache
+
+    """
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the value stored at key (None if absent)"""
+        try:
+            value, _ = self.cache[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.cache.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value at key, evicting the least recently used entries
+        when the size bound is exceeded"""
+        size = nbytes(value)
+
+        if key in self.cache:
+            self.current_bytes -= self.cache.pop(key)[1]
+
+        # values larger than the whole budget are not cached
+        if size > self.max_bytes:
+            self.evict()
+            return
+
+        self.cache[key] = (value, size)
+        self.current_bytes += size
+        self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries until the size bound is met"""
+        while self.current_bytes > self.max_bytes:
+            _, (_, size) = self.cache.popitem(last=False)
+            self.current_bytes -= size
+
+    def clear(self):
+        """Empty the cache, and reset the counters"""
+        self.cache.clear()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __contains__(self, key):
+        return key in self.cache
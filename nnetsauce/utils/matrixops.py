@@ -1,13 +1,10 @@
 import numpy as np
 import platform
-from .memoize import memoize
-from jax import device_put
 from scipy import sparse
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.cluster import KMeans
-from sklearn.mixture import GaussianMixture
-if platform.system() in ('Linux', 'Darwin'):
-    import jax.numpy as jnp
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, MaxAbsScaler
+from sklearn.utils import gen_batches, get_chunk_n_rows
+from sklearn.utils.extmath import row_norms
+from .._config import get_config
 
 
 # column bind
@@ -15,23 +12,56 @@ def cbind(x, y, backend="cpu"):
     # if len(x.shape) == 1 or len(y.shape) == 1:
     sys_platform = platform.system()
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
+        import jax.numpy as jnp
+
         return jnp.column_stack((x, y))
+    if sparse.issparse(x) or sparse.issparse(y):  # stays sparse
+        return sparse.hstack(
+            [a.reshape(-1, 1) if a.ndim == 1 else a for a in (x, y)],
+            format="csr",
+        )
     return np.column_stack((x, y))
 
 
 # center... response
-@memoize
+# (column-wise, for several responses)
 def center_response(y):
-    y_mean = np.mean(y)
+    y_mean = np.mean(y, axis=0)
     return y_mean, (y - y_mean)
 
 
 # cluster the covariates
-def cluster_covariates(X, n_clusters, seed, type_clust="kmeans", **kwargs):
+# (max_rows: the clustering is fitted on at most max_rows rows, a coreset of X 
+# for k-means, a uniform subsample for gmm; all the rows of X are labelled)
+def cluster_covariates(
+    X, n_clusters, seed, type_clust="kmeans", max_rows=None, **kwargs
+):
+
+    # sklearn.cluster and sklearn.mixture are slow to import
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.mixture import GaussianMixture
+
+    n = X.shape[0]
+    X_fit, sample_weight = X, None
+
+    if (max_rows is not None) and (max_rows > 0) and (n > max_rows):
+        if type_clust == "gmm":  # no sample weights in GaussianMixture
+            np.random.seed(seed)
+            X_fit = X[np.sort(np.random.choice(n, size=max_rows, replace=False))]
+        else:
+            X_fit, sample_weight = coreset(X, max_rows, seed)
 
     if type_clust == "kmeans":
         kmeans = KMeans(n_clusters=n_clusters, random_state=seed, **kwargs)
-        kmeans.fit(X)
+        kmeans.fit(X_fit, sample_weight=sample_weight)
+
+        return kmeans, kmeans.predict(X)
+
+    elif type_clust == "minibatchkmeans":
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters, random_state=seed, **kwargs
+        )
+        kmeans.fit(X_fit, sample_weight=sample_weight)
 
         return kmeans, kmeans.predict(X)
 
@@ -39,21 +69,61 @@ def cluster_covariates(X, n_clusters, seed, type_clust="kmeans", **kwargs):
         gmm = GaussianMixture(
             n_components=n_clusters, random_state=seed, **kwargs
         )
-        gmm.fit(X)
+        gmm.fit(X_fit)
 
         return gmm, gmm.predict(X)
 
 
+# lightweight coreset of X, for k-means (Bachem, Lucic, Krause, 2018)
+def coreset(X, n_rows, seed=123):
+    """Sample n_rows rows of X, with probabilities mixing the uniform 
+    distribution and the squared distances to the mean of X. 
+    
+    Returns the rows and their weights, for a weighted k-means.
+    """
+
+    n = X.shape[0]
+
+    mean_X = np.asarray(X.mean(axis=0)).ravel()
+
+    # squared distances to the mean (no densification when X is sparse)
+    dist = (
+        row_norms(X, squared=True)
+        - 2 * safe_sparse_dot(X, mean_X)
+        + np.dot(mean_X, mean_X)
+    )
+    dist = np.maximum(dist, 0)
+    total_dist = dist.sum()
+
+    probs = (
+        0.5 / n + 0.5 * dist / total_dist
+        if total_dist > 0
+        else np.repeat(1.0 / n, n)
+    )
+    probs /= probs.sum()
+
+    np.random.seed(seed)
+    index = np.random.choice(n, size=n_rows, replace=True, p=probs)
+
+    return X[index], 1 / (n_rows * probs[index])
+
+
 # computes t(x)%*%y
 def crossprod(x, y=None, backend="cpu"):
     # assert on dimensions
     sys_platform = platform.system()
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
+        import jax.numpy as jnp
+        from jax import device_put
+
         x = device_put(x)
         if y is None:
             return jnp.dot(x.T, x).block_until_ready()
         y = device_put(y)
         return jnp.dot(x.T, y).block_until_ready()
+    if sparse.issparse(x) or sparse.issparse(y):  # dense result
+        res = x.transpose() @ (x if y is None else y)
+        return res.toarray() if sparse.issparse(res) else res
     if y is None:
         return np.dot(x.transpose(), x)
     return np.dot(x.transpose(), y)
@@ -64,23 +134,34 @@ def crossprod(x, y=None, backend="cpu"):
 # Obtain this for JAX
 # Obtain this for JAX
 # Obtain this for JAX
-# dropout
-def dropout(x, drop_prob=0, seed=123):
+# dropout (in `out` when provided, which can be x itself)
+def dropout(x, drop_prob=0, seed=123, out=None):
 
     assert 0 <= drop_prob <= 1
 
     n, p = x.shape
 
     if drop_prob == 0:
-        return x
+        if (out is None) or (out is x):
+            return x
+        out[...] = x
+        return out
 
     if drop_prob == 1:
-        return np.zeros_like(x)
+        if out is None:
+            return np.zeros_like(x)
+        out[...] = 0
+        return out
 
     np.random.seed(seed)
     dropped_indices = np.random.rand(n, p) > drop_prob
 
-    return dropped_indices * x / (1 - drop_prob)
+    if out is None:
+        return dropped_indices * x / (1 - drop_prob)
+
+    np.multiply(x, dropped_indices, out=out)
+    out /= 1 - drop_prob
+    return out
 
 
 # one-hot encoding
@@ -116,6 +197,8 @@ def rbind(x, y, backend="cpu"):
     # if len(x.shape) == 1 or len(y.shape) == 1:
     sys_platform = platform.system()
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
+        import jax.numpy as jnp
+
         return jnp.row_stack((x, y))
     return np.row_stack((x, y))
 
@@ -141,6 +224,9 @@ def safe_sparse_dot(a, b, backend="cpu", dense_output=False):
 
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
         # modif when jax.scipy.sparse available
+        import jax.numpy as jnp
+        from jax import device_put
+
         return jnp.dot(device_put(a), device_put(b)).block_until_ready()
 
     #    if backend == "cpu":
@@ -194,18 +280,52 @@ def safe_sparse_dot(a, b, backend="cpu", dense_output=False):
 # Obtain this for JAX
 # Obtain this for JAX
 # scale... covariates
-def scale_covariates(X, choice="std", training=True, scaler=None):
-
-    scaling_options = {
-        "std": StandardScaler(copy=True, with_mean=True, with_std=True),
-        "minmax": MinMaxScaler(),
-    }
+# (copy=False: X is scaled in place and the scaler is fitted by blocks of rows)
+# (sparse X: no centering, which would densify X; 'minmax' is max-abs scaling)
+def scale_covariates(X, choice="std", training=True, scaler=None, copy=True):
+
+    if sparse.issparse(X):
+        scaling_options = {
+            "std": StandardScaler(copy=True, with_mean=False, with_std=True),
+            "minmax": MaxAbsScaler(),
+        }
+    else:
+        scaling_options = {
+            "std": StandardScaler(copy=True, with_mean=True, with_std=True),
+            "minmax": MinMaxScaler(),
+        }
 
     if training == True:
         # scaler must be not None
         scaler = scaling_options[choice]
-        scaled_X = scaler.fit_transform(X)
-        return scaler, scaled_X
+
+        if copy == True:
+            scaled_X = scaler.fit_transform(X)
+            return scaler, scaled_X
+
+        # partial_fit makes a few temporary copies of each block
+        n, p = X.shape
+        chunk_n_rows = get_chunk_n_rows(
+            row_bytes=3 * 8 * p,
+            max_n_rows=n,
+            working_memory=get_config()["working_memory"],
+        )
+        for batch in gen_batches(n, chunk_n_rows):
+            scaler.partial_fit(X[batch])
+
+        if sparse.issparse(X):  # scale the nonzeros of each column
+            if X.format == "csc":
+                X.data /= np.repeat(scaler.scale_, np.diff(X.indptr))
+            else:  # X.format == "csr"
+                X.data /= scaler.scale_[X.indices]
+        elif choice == "std":
+            X -= scaler.mean_
+            X /= scaler.scale_
+        else:  # choice == "minmax"
+            X *= scaler.scale_
+            X += scaler.min_
+
+        return scaler, X
 
     # training == False:
     # scaler must be not None
@@ -230,6 +350,9 @@ def squared_norm(x, backend="cpu"):
     """
     sys_platform = platform.system()
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
+        import jax.numpy as jnp
+        from jax import device_put
+
         x = np.ravel(x, order="K")
         x = device_put(x)        
         return jnp.dot(x, x).block_until_ready()
@@ -243,11 +366,17 @@ def tcrossprod(x, y=None, backend="cpu"):
     # assert on dimensions
     sys_platform = platform.system()
     if backend in ("gpu", "tpu") and (sys_platform in ('Linux', 'Darwin')):
+        import jax.numpy as jnp
+        from jax import device_put
+
         x = device_put(x)
         if y is None:
             return jnp.dot(x, x.T).block_until_ready()
         y = device_put(y)
         return jnp.dot(x, y.T).block_until_ready()
+    if sparse.issparse(x) or sparse.issparse(y):  # dense result
+        res = x @ (x if y is None else y).transpose()
+        return res.toarray() if sparse.issparse(res) else res
     if y is None:
         return np.dot(x, x.transpose())
     return np.dot(x, y.transpose())
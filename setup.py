@@ -89,6 +89,11 @@ if SETUPTOOLS_COMMANDS.intersection(sys.argv):
                 'numpy >= {}'.format(NUMPY_MIN_VERSION),
                 'scipy >= {}'.format(SCIPY_MIN_VERSION),
             ),
+            # JAX is only needed (and imported) for backend='gpu' or 'tpu'
+            'jax': (
+                'jax >= {}'.format(JAX_MIN_VERSION),
+                'jaxlib >= {}'.format(JAXLIB_MIN_VERSION),
+            ) if platform.system() in ('Linux', 'Darwin') else (),
         },
     )
         
@@ -244,12 +249,8 @@ def setup_package():
                         'threadpoolctl>={}'.format(THREADPOOLCTL_MIN_VERSION),
                     ]
 
-    install_jax_requires = [
-                            'jax>={}'.format(JAX_MIN_VERSION), 
-                            'jaxlib>={}'.format(JAXLIB_MIN_VERSION)
-                            ] if platform.system() in ('Linux', 'Darwin') else []                        
-
-    install_requires = [item for sublist in [install_all_requires, install_jax_requires, OTHER_REQUIREMENTS] for item in sublist]
+    # JAX (backend='gpu' or 'tpu') is an optional dependency: pip install nnetsauce[jax]
+    install_requires = [item for sublist in [install_all_requires, OTHER_REQUIREMENTS] for item in sublist]
 
     metadata = dict(name=DISTNAME,
                     maintainer=MAINTAINER,
@@ -263,13 +264,11 @@ def setup_package():
                                  'License :: OSI Approved :: BSD License',
                                  'Natural Language :: English',
                                  'Programming Language :: Python :: 3',
-                                  'Programming Language :: Python :: 3.5',
-                                 'Programming Language :: Python :: 3.6',
                                  'Programming Language :: Python :: 3.7',
                                  'Programming Language :: Python :: 3.8',
                                  ],
                     cmdclass=cmdclass,
-                    python_requires=">=3.5",
+                    python_requires=">=3.7",  # module __getattr__ (PEP 562)
                     install_requires=install_requires,
                     package_data={'': ['*.pxd']},
                     **extra_setuptools_args)